@@ -4,17 +4,23 @@ Daily Abnormal Sector Analysis for KRX (Korean Stock Market)
 
 Identifies sectors showing unusual Fiedler eigenvalue patterns compared to weekly baseline.
 
+Theme correlations come from a persistent daily state (cohesion/daily_state.py):
+each run advances it by the trading days since its last run (one output file
+per day, so missed days are caught up) instead of recomputing 60-day
+correlations from raw prices. Each run first re-reads the window's closes and
+rebuilds the state when they changed (late or corrected rows) or new theme
+tickers were listed. --full rebuilds the state from price history.
+
 Author: Claude Code (SuperClaude Framework)
 Date: 2025-10-29
 """
 
+import argparse
 import pandas as pd
 import numpy as np
 from pathlib import Path
 from datetime import datetime, timedelta
 import json
-from scipy.sparse import csr_matrix
-from scipy.sparse.linalg import eigsh
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -24,13 +30,17 @@ warnings.filterwarnings('ignore')
 
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from config import PRICE_DATA_DIR, THEME_TO_TICKERS_FILE, DATA_DIR, REPORTS_DIR
+from config import (PRICE_DATA_DIR, THEME_TO_TICKERS_FILE, DATA_DIR, REPORTS_DIR, CORRELATION_THRESHOLD,
+                    DAILY_STATE_FILE)
+from cohesion.price_store import open_price_store, read_price_tails
+from cohesion.fiedler import compute_fiedler
+from cohesion.daily_state import DailyThemeState
+from cohesion.spectral_cache import SpectralCache
 
 NAVER_THEME_FILE = THEME_TO_TICKERS_FILE
 
 # Use today's date dynamically for daily runs
 TODAY = pd.Timestamp.now().normalize()  # Today at midnight
-TODAY_STR = TODAY.strftime('%Y%m%d')
 
 # Find most recent weekly baseline file
 def find_latest_baseline():
@@ -42,11 +52,19 @@ def find_latest_baseline():
     return DATA_DIR / "weekly_cohesion_change_20251027.csv"
 
 WEEKLY_BASELINE_FILE = find_latest_baseline()
-OUTPUT_FILE = DATA_DIR / f"abnormal_sectors_{TODAY_STR}.csv"
-REPORT_FILE = REPORTS_DIR / f"ABNORMAL_SECTORS_{TODAY_STR}.md"
 LOOKBACK_DAYS = 60  # Rolling window for correlation calculation
-CORRELATION_THRESHOLD = 0.25  # Minimum correlation for edge creation
 MIN_STOCKS_PER_THEME = 3  # Minimum stocks required for theme analysis
+MIN_RETURNS = 40  # Returns a stock needs inside the window to be included
+TAIL_ROWS = LOOKBACK_DAYS + 30  # CSV rows to read per stock (covers the calendar-day buffer)
+BUILD_CALENDAR_DAYS = LOOKBACK_DAYS * 2  # Price history read when (re)building the state
+
+def output_file_for(date):
+    """CSV of abnormal sectors for one trading day."""
+    return DATA_DIR / f"abnormal_sectors_{date.strftime('%Y%m%d')}.csv"
+
+def report_file_for(date):
+    """Markdown report for one trading day."""
+    return REPORTS_DIR / f"ABNORMAL_SECTORS_{date.strftime('%Y%m%d')}.md"
 
 # Abnormality thresholds
 LARGE_INCREASE_THRESHOLD = 0.20  # +20% change is unusual strengthening
@@ -58,183 +76,99 @@ NEW_CONNECTION_THRESHOLD = 3.0  # Fiedler > 3.0 from previous 0.0 is new connect
 # Helper Functions
 # ================================================================================
 
-def load_stock_price(csv_file):
-    """Load Korean stock price from CSV file."""
-    try:
-        df = pd.read_csv(csv_file)
-        if df.columns[0] != 'Unnamed: 0':
-            return None
-
-        df = df.rename(columns={'Unnamed: 0': 'Date'})
-        df['Date'] = pd.to_datetime(df['Date'])
-        df = df.set_index('Date')
-
-        if 'close' not in df.columns:
-            return None
-
-        prices = df['close'].dropna()
-        return prices if len(prices) > 0 else None
-    except Exception as e:
-        return None
-
-def calculate_returns(prices, start_date, end_date):
-    """Calculate returns for the specified date range."""
-    prices = prices[(prices.index >= start_date) & (prices.index <= end_date)]
-    if len(prices) < 2:
-        return None
-    return prices.pct_change().dropna()
-
-def calculate_fiedler_eigenvalue(correlation_matrix, threshold=0.25):
+def load_close_panel(start_date, end_date, tickers=None):
     """
-    Calculate Fiedler eigenvalue (second smallest eigenvalue) of graph Laplacian.
+    [dates x tickers] close panel (NaN where a stock has no row).
 
-    Graph Laplacian: L = D - A
-    where D is degree matrix and A is adjacency matrix (thresholded correlations)
+    Reads a date-sliced panel from the price store when it has been built,
+    otherwise falls back to tail-reading the last TAIL_ROWS rows of each CSV
+    in PRICE_DATA_DIR (concurrently), so the run does not scale with how much
+    history each file holds.
     """
-    n = len(correlation_matrix)
-    if n < 2:
-        return 0.0
-
-    # Create adjacency matrix (edges for |correlation| >= threshold)
-    adj_matrix = np.zeros((n, n))
-    for i in range(n):
-        for j in range(i+1, n):
-            if abs(correlation_matrix.iloc[i, j]) >= threshold:
-                adj_matrix[i, j] = 1
-                adj_matrix[j, i] = 1
-
-    # Check if graph is disconnected
-    degrees = adj_matrix.sum(axis=1)
-    if np.any(degrees == 0):
-        return 0.0  # Disconnected graph
-
-    # Degree matrix
-    degree_matrix = np.diag(degrees)
-
-    # Graph Laplacian
-    laplacian = degree_matrix - adj_matrix
-
-    # Calculate eigenvalues
-    try:
-        # Use sparse matrix for efficiency
-        laplacian_sparse = csr_matrix(laplacian)
-        eigenvalues = eigsh(laplacian_sparse, k=min(n-1, 10), which='SM', return_eigenvectors=False)
-        eigenvalues = np.sort(eigenvalues)
-
-        # Fiedler eigenvalue is the second smallest (first is always ~0)
-        if len(eigenvalues) >= 2:
-            return float(eigenvalues[1])
+    store = open_price_store()
+    if store is not None:
+        panel = store.panel('close', tickers=tickers, start=start_date, end=end_date)
+    else:
+        if tickers is None:
+            csv_files = sorted(PRICE_DATA_DIR.glob('*.csv'))
         else:
-            return 0.0
-    except:
-        return 0.0
-
-def calculate_theme_fiedler(theme_stocks, all_returns, lookback_days):
-    """Calculate Fiedler eigenvalue for a theme (sector)."""
-    # Filter returns to only include theme stocks
-    theme_returns = all_returns[theme_stocks]
-
-    # Calculate correlation matrix
-    correlation_matrix = theme_returns.corr()
-
-    # Calculate Fiedler eigenvalue
-    fiedler = calculate_fiedler_eigenvalue(correlation_matrix, CORRELATION_THRESHOLD)
-
-    # Count edges (number of significant correlations)
-    n = len(correlation_matrix)
-    edges = 0
-    for i in range(n):
-        for j in range(i+1, n):
-            if abs(correlation_matrix.iloc[i, j]) >= CORRELATION_THRESHOLD:
-                edges += 1
-
-    return fiedler, edges, correlation_matrix.mean().mean()
-
-# ================================================================================
-# Main Analysis
-# ================================================================================
-
-def main():
-    print("="*80)
-    print("KRX DAILY ABNORMAL SECTOR ANALYSIS")
-    print("="*80)
-    print(f"Analysis Date: {TODAY.strftime('%Y-%m-%d')}")
-    print(f"Lookback Window: {LOOKBACK_DAYS} days")
-    print(f"Correlation Threshold: {CORRELATION_THRESHOLD}")
-    print(f"Price Data: {PRICE_DATA_DIR}")
-    print("="*80)
-    print()
-
-    # Load Naver theme structure
-    print("1. Loading Naver theme structure...")
-    with open(NAVER_THEME_FILE, 'r', encoding='utf-8') as f:
-        naver_themes = json.load(f)
-    print(f"   Loaded {len(naver_themes)} themes")
-    print()
-
-    # Load weekly baseline
-    baseline_date = WEEKLY_BASELINE_FILE.stem.split('_')[-1] if '_' in WEEKLY_BASELINE_FILE.stem else "unknown"
-    print(f"2. Loading weekly baseline ({baseline_date})...")
-    if not WEEKLY_BASELINE_FILE.exists():
-        print(f"   ERROR: Baseline file not found: {WEEKLY_BASELINE_FILE}")
-        print(f"   Please run weekly analysis first to generate baseline data.")
-        return
-    baseline = pd.read_csv(WEEKLY_BASELINE_FILE)
-    baseline = baseline.rename(columns={'Theme': 'theme', 'Last_Week_Fiedler': 'baseline_fiedler'})
-    baseline_dict = baseline.set_index('theme')['baseline_fiedler'].to_dict()
-    print(f"   Loaded baseline for {len(baseline_dict)} themes")
-    print()
-
-    # Load price data
-    print("3. Loading daily price data...")
-    start_date = TODAY - timedelta(days=LOOKBACK_DAYS + 30)  # Extra buffer
-    end_date = TODAY
-
-    all_returns = {}
-    price_files = list(PRICE_DATA_DIR.glob('*.csv'))
-
-    loaded_stocks = 0
-    for csv_file in price_files:
-        stock_name = csv_file.stem
-        prices = load_stock_price(csv_file)
-
-        if prices is not None:
-            returns = calculate_returns(prices, start_date, end_date)
-            if returns is not None and len(returns) >= 40:  # Need sufficient data
-                all_returns[stock_name] = returns
-                loaded_stocks += 1
-
-    print(f"   Loaded {loaded_stocks} stocks with valid data")
-    print()
-
-    # Align all returns to common dates
-    print("4. Aligning returns to common dates...")
-    returns_df = pd.DataFrame(all_returns)
-    returns_df = returns_df.dropna(axis=1, how='all')  # Drop columns with all NaN
-
-    # Use last 60 trading days
-    if len(returns_df) > LOOKBACK_DAYS:
-        returns_df = returns_df.tail(LOOKBACK_DAYS)
-
-    print(f"   Using {len(returns_df)} trading days")
-    print(f"   Date range: {returns_df.index.min().strftime('%Y-%m-%d')} to {returns_df.index.max().strftime('%Y-%m-%d')}")
-    print()
+            csv_files = [PRICE_DATA_DIR / f"{t}.csv" for t in tickers]
+            csv_files = [f for f in csv_files if f.exists()]
+        frames = read_price_tails(csv_files, TAIL_ROWS)
+        panel = pd.DataFrame({name: df['close'] for name, df in frames.items()}).sort_index()
+        panel = panel[(panel.index >= start_date) & (panel.index <= end_date)]
+    if tickers is not None:
+        panel = panel.reindex(columns=list(tickers))
+    return panel
+
+def build_state(naver_themes):
+    """Build the daily correlation state from the last LOOKBACK_DAYS + 1 trading days."""
+    close_panel = load_close_panel(TODAY - timedelta(days=BUILD_CALENDAR_DAYS), TODAY)
+    return DailyThemeState.from_close_panel(close_panel, naver_themes, LOOKBACK_DAYS)
+
+def new_trading_days(state, naver_themes):
+    """
+    (closes for the trading days after the state's last date, None), or
+    (None, reason) when the state has to be rebuilt: it is empty, its last
+    date is no longer in the recent price rows, more than a full window was
+    missed, or the price data changed under it (closes inside the window
+    landed or were corrected after they were applied, or new theme tickers
+    were listed - see DailyThemeState.stale_reason).
+    """
+    if not state.dates:
+        return None, 'empty window'
+    close_panel = load_close_panel(state.dates[0], TODAY)
+    if state.last_date not in close_panel.index:
+        return None, f"{state.last_date.strftime('%Y-%m-%d')} is no longer in the recent price rows"
+    reason = state.stale_reason(close_panel, naver_themes)
+    if reason is not None:
+        return None, reason
+    new_rows = close_panel[close_panel.index > state.last_date].reindex(columns=state.tickers)
+    if len(new_rows) >= LOOKBACK_DAYS:
+        return None, f"{len(new_rows)} trading days behind (more than a full window)"
+    return new_rows, None
+
+def calculate_theme_fiedler(theme_stocks, correlation_matrix, cache=None, closes=None):
+    """
+    Calculate Fiedler eigenvalue for a theme (sector).
 
-    # Calculate today's Fiedler values
-    print("5. Calculating today's Fiedler values by theme...")
+    The theme's correlation matrix comes from the daily state's running sums
+    instead of a fresh corr() over the price history. Themes with the same
+    stock set and the same window closes (closes = dates x theme_stocks) are
+    answered from the spectral cache.
+    """
+    key = None
+    if cache is not None and closes is not None:
+        key = cache.key('daily', theme_stocks, closes.index[0], closes.index[-1],
+                        {'lookback_days': LOOKBACK_DAYS, 'threshold': CORRELATION_THRESHOLD,
+                         'min_returns': MIN_RETURNS}, cache.fingerprint(closes))
+        cached = cache.get(key)
+        if cached is not None:
+            return cached['fiedler'], cached['n_edges'], cached['avg_correlation']
+
+    # Calculate Fiedler eigenvalue and edge count (significant correlations)
+    result = compute_fiedler(correlation_matrix, CORRELATION_THRESHOLD)
+    avg_corr = pd.DataFrame(correlation_matrix).mean().mean()
+
+    if key is not None:
+        cache.put(key, {'fiedler': result['fiedler'], 'n_edges': result['n_edges'],
+                        'avg_correlation': avg_corr})
+    return result['fiedler'], result['n_edges'], avg_corr
+
+def calculate_theme_table(state, naver_themes, baseline_dict, cache):
+    """Fiedler value and change vs the weekly baseline for every theme in the state's window."""
     today_fiedler = []
 
-    for theme_name, stock_list in naver_themes.items():
-        # Find stocks that exist in our data
-        available_stocks = [s for s in stock_list if s in returns_df.columns]
+    for theme_name in naver_themes:
+        # Stocks with enough returns in the window
+        available_stocks, correlation_matrix = state.theme_corr(theme_name, MIN_RETURNS)
 
         if len(available_stocks) < MIN_STOCKS_PER_THEME:
             continue
 
         # Calculate Fiedler eigenvalue
-        fiedler, edges, avg_corr = calculate_theme_fiedler(
-            available_stocks, returns_df, LOOKBACK_DAYS
-        )
+        fiedler, edges, avg_corr = calculate_theme_fiedler(available_stocks, correlation_matrix,
+                                                           cache, state.theme_closes(available_stocks))
 
         # Get baseline value
         baseline_fiedler = baseline_dict.get(theme_name, np.nan)
@@ -258,12 +192,10 @@ def main():
             'pct_change': pct_change
         })
 
-    today_df = pd.DataFrame(today_fiedler)
-    print(f"   Calculated Fiedler for {len(today_df)} themes")
-    print()
+    return pd.DataFrame(today_fiedler)
 
-    # Identify abnormal sectors
-    print("6. Identifying abnormal sectors...")
+def find_abnormal_sectors(today_df, naver_themes):
+    """Themes whose Fiedler value moved abnormally against the weekly baseline."""
     abnormal_sectors = []
 
     for idx, row in today_df.iterrows():
@@ -302,18 +234,116 @@ def main():
                 'stock_list': ', '.join(naver_themes[theme][:10])  # First 10 stocks
             })
 
-    abnormal_df = pd.DataFrame(abnormal_sectors)
-    print(f"   Found {len(abnormal_df)} abnormal sectors")
+    return pd.DataFrame(abnormal_sectors)
+
+# ================================================================================
+# Main Analysis
+# ================================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description='Daily abnormal sector analysis')
+    parser.add_argument('--full', action='store_true',
+                        help='Rebuild the daily correlation state from price history '
+                             'instead of advancing the saved state')
+    args = parser.parse_args()
+
+    print("="*80)
+    print("KRX DAILY ABNORMAL SECTOR ANALYSIS")
+    print("="*80)
+    print(f"Analysis Date: {TODAY.strftime('%Y-%m-%d')}")
+    print(f"Lookback Window: {LOOKBACK_DAYS} days")
+    print(f"Correlation Threshold: {CORRELATION_THRESHOLD}")
+    print(f"Price Data: {PRICE_DATA_DIR}")
+    print(f"Daily State: {DAILY_STATE_FILE}")
+    print("="*80)
+    print()
+
+    # Load Naver theme structure
+    print("1. Loading Naver theme structure...")
+    with open(NAVER_THEME_FILE, 'r', encoding='utf-8') as f:
+        naver_themes = json.load(f)
+    print(f"   Loaded {len(naver_themes)} themes")
     print()
 
-    # Save results
-    print("7. Saving results...")
-    abnormal_df.to_csv(OUTPUT_FILE, index=False, encoding='utf-8-sig')
-    print(f"   CSV saved: {OUTPUT_FILE}")
+    # Load weekly baseline
+    baseline_date = WEEKLY_BASELINE_FILE.stem.split('_')[-1] if '_' in WEEKLY_BASELINE_FILE.stem else "unknown"
+    print(f"2. Loading weekly baseline ({baseline_date})...")
+    if not WEEKLY_BASELINE_FILE.exists():
+        print(f"   ERROR: Baseline file not found: {WEEKLY_BASELINE_FILE}")
+        print(f"   Please run weekly analysis first to generate baseline data.")
+        return
+    baseline = pd.read_csv(WEEKLY_BASELINE_FILE)
+    baseline = baseline.rename(columns={'Theme': 'theme', 'Last_Week_Fiedler': 'baseline_fiedler'})
+    baseline_dict = baseline.set_index('theme')['baseline_fiedler'].to_dict()
+    print(f"   Loaded baseline for {len(baseline_dict)} themes")
+    print()
+
+    # Load the saved state and collect the trading days it has not seen yet
+    print("3. Updating daily correlation state...")
+    state = None if args.full else DailyThemeState.load(naver_themes, LOOKBACK_DAYS)
+    new_rows = None
+    if state is None:
+        print("   No usable saved state (missing, --full, or theme mapping/window changed)")
+    else:
+        new_rows, reason = new_trading_days(state, naver_themes)
+        if new_rows is None:
+            print(f"   Saved state ends {state.last_date.strftime('%Y-%m-%d') if state.dates else '-'}: "
+                  f"rebuilding ({reason})")
+            state = None
+
+    if state is None:
+        state = build_state(naver_themes)
+        print(f"   Built state from price history: {len(state.tickers)} stocks, "
+              f"{len(state.members)} themes")
+        new_rows = None
+    elif len(new_rows) == 0:
+        print(f"   State already at {state.last_date.strftime('%Y-%m-%d')} (no new trading days)")
+    else:
+        print(f"   Catching up {len(new_rows)} trading day(s): "
+              f"{new_rows.index[0].strftime('%Y-%m-%d')} to {new_rows.index[-1].strftime('%Y-%m-%d')}")
+    print()
 
-    # Generate markdown report
-    generate_report(abnormal_df, today_df)
-    print(f"   Report saved: {REPORT_FILE}")
+    if len(state.dates) == 0:
+        print("   ERROR: No trading days in the price data window.")
+        return
+
+    # Calculate each new day's Fiedler values (one output file per trading day)
+    print("4. Calculating Fiedler values by theme...")
+    spectral_cache = SpectralCache()
+    days = [] if new_rows is None else list(new_rows.index)
+    written = []  # files this run wrote (echoed by run_daily_abnormal_sectors.sh)
+
+    def analyze_window():
+        today_df = calculate_theme_table(state, naver_themes, baseline_dict, spectral_cache)
+        abnormal_df = find_abnormal_sectors(today_df, naver_themes)
+        output_file = output_file_for(state.last_date)
+        abnormal_df.to_csv(output_file, index=False, encoding='utf-8-sig')
+        written.append(output_file)
+        print(f"   {state.last_date.strftime('%Y-%m-%d')} "
+              f"({state.dates[0].strftime('%Y-%m-%d')} to {state.last_date.strftime('%Y-%m-%d')}, "
+              f"{len(state.dates)} days): {len(today_df)} themes, "
+              f"{len(abnormal_df)} abnormal -> {output_file.name}")
+        return today_df, abnormal_df
+
+    if days:
+        for date in days:
+            state.advance(date, new_rows.loc[date].to_numpy(dtype=np.float64))
+            today_df, abnormal_df = analyze_window()
+    else:
+        today_df, abnormal_df = analyze_window()
+
+    spectral_cache.flush()
+    state.save(DAILY_STATE_FILE)
+    print(f"   Spectral cache: {spectral_cache.summary()}")
+    print(f"   State saved through {state.last_date.strftime('%Y-%m-%d')}")
+    print()
+
+    # Generate markdown report for the latest day
+    print("5. Saving report...")
+    report_file = report_file_for(state.last_date)
+    generate_report(abnormal_df, today_df, state.last_date, report_file)
+    written.append(report_file)
+    print(f"   Report saved: {report_file}")
     print()
 
     # Print summary
@@ -337,13 +367,18 @@ def main():
             print(f"  {row['theme']}: {row['fiedler_change']:.2f} ({row['pct_change']:.1f}%) - {row['abnormality']}")
 
     print("="*80)
+    print()
+
+    # One line per written file, for the shell runner to list
+    for path in written:
+        print(f"GENERATED: {path}")
 
-def generate_report(abnormal_df, all_themes_df):
+def generate_report(abnormal_df, all_themes_df, analysis_date, report_file):
     """Generate markdown report of abnormal sectors."""
-    with open(REPORT_FILE, 'w', encoding='utf-8') as f:
+    with open(report_file, 'w', encoding='utf-8') as f:
         f.write("# KRX Abnormal Sector Analysis\n\n")
         baseline_date = WEEKLY_BASELINE_FILE.stem.split('_')[-1] if '_' in WEEKLY_BASELINE_FILE.stem else "unknown"
-        f.write(f"**Analysis Date**: {TODAY.strftime('%Y-%m-%d')}\n")
+        f.write(f"**Analysis Date**: {analysis_date.strftime('%Y-%m-%d')}\n")
         f.write(f"**Baseline Date**: {baseline_date} (Weekly Fiedler)\n")
         f.write(f"**Total Themes Analyzed**: {len(all_themes_df)}\n")
         f.write(f"**Abnormal Sectors Found**: {len(abnormal_df)}\n\n")
@@ -5,14 +5,21 @@ Build comprehensive Fiedler value database for all Naver themes.
 Weekly: Monday-Friday windows
 Monthly: Day 1-30 windows
 Period: 2025-01-01 onwards
+
+Usage:
+    python Jobs/build_fiedler_database.py
+    python Jobs/build_fiedler_database.py --batched   # one universe corr() per window
+    python Jobs/build_fiedler_database.py --workers 8 # process pool, same output as serial
+    python Jobs/build_fiedler_database.py --incremental  # recompute only new/partial periods
+    python Jobs/build_fiedler_database.py --min-overlap 0.5  # opt-in pairwise-complete correlations
 """
 
 import pandas as pd
-import numpy as np
 from pathlib import Path
-from scipy.sparse import csr_matrix
-from scipy.sparse.linalg import eigsh
+import os
 import json
+import hashlib
+import argparse
 import warnings
 from matplotlib import font_manager, rc
 
@@ -29,23 +36,85 @@ except:
 # Configuration - use config module for self-contained project
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from config import PRICE_DATA_DIR, THEME_TO_TICKERS_FILE, DATA_DIR
+from config import (PRICE_DATA_DIR, THEME_TO_TICKERS_FILE, DATA_DIR, SPECTRAL_CACHE_FILE,
+                    CORRELATION_THRESHOLD)
+from cohesion.price_store import open_price_store, read_price_csv
+from cohesion.theme_windows import compute_periods
+from cohesion.spectral_cache import SpectralCache, RESULT_VERSION
+from cohesion.trading_calendar import TradingCalendar
 
 THEME_FILE = THEME_TO_TICKERS_FILE
 OUTPUT_DIR = DATA_DIR
+WEEKLY_FILE = OUTPUT_DIR / "naver_themes_weekly_fiedler_2025.csv"
+MONTHLY_FILE = OUTPUT_DIR / "naver_themes_monthly_fiedler_2025.csv"
+META_FILE = OUTPUT_DIR / "naver_themes_fiedler_2025.meta.json"
+WEEKLY_SWEEP_FILE = OUTPUT_DIR / "naver_themes_weekly_fiedler_sweep_2025.csv"
+MONTHLY_SWEEP_FILE = OUTPUT_DIR / "naver_themes_monthly_fiedler_sweep_2025.csv"
 
 START_DATE = pd.Timestamp('2025-01-01')
 LOOKBACK_DAYS = 60
-CORRELATION_THRESHOLD = 0.25
 MIN_STOCKS = 3
+MIN_OVERLAP = 0  # 0 = listwise dropna (published numbers); --min-overlap 0.5 opts into pairwise-complete
+
+parser = argparse.ArgumentParser(description='Build Naver theme Fiedler database')
+parser.add_argument('--batched', action='store_true',
+                    help='Compute one universe-wide correlation matrix per window and '
+                         'slice it per theme (pairwise-complete instead of per-theme dropna)')
+parser.add_argument('--workers', type=int, default=int(os.environ.get('FIEDLER_WORKERS', 1)),
+                    help='Worker processes for the per-period calculation '
+                         '(default: $FIEDLER_WORKERS or 1 = serial)')
+parser.add_argument('--incremental', action='store_true',
+                    help='Keep stored periods and recompute only from the last stored '
+                         'period onwards (full rebuild if the parameters changed)')
+parser.add_argument('--thresholds', type=str, default=None,
+                    help='Threshold sweep, e.g. 0.2,0.25,0.3,0.35: one correlation per '
+                         '(theme, window), Fiedler for every cutoff, written as a long table '
+                         'to the *_sweep_2025.csv files (the main database is not touched)')
+parser.add_argument('--min-overlap', type=float, default=MIN_OVERLAP,
+                    help='Minimum observations per ticker and pair in a window, in rows or '
+                         f'as a fraction of the window if < 1 (default: {MIN_OVERLAP} = listwise '
+                         'dropna, as before). Opt-in, e.g. --min-overlap 0.5: per-theme mode '
+                         'then correlates pairwise-complete, which changes the Fiedler values')
+parser.add_argument('--no-cache', action='store_true',
+                    help='Recompute every window instead of reusing cached results for '
+                         'identical (ticker set, window, window closes)')
+args = parser.parse_args()
+
+SWEEP_THRESHOLDS = ([float(t) for t in args.thresholds.split(',') if t.strip()]
+                    if args.thresholds else None)
+if SWEEP_THRESHOLDS and args.incremental:
+    print("Note: --incremental is ignored in threshold sweep mode (sweeps are always full)")
+    args.incremental = False
+
+# Anything that changes historical values; a different fingerprint forces a full rebuild
+BUILD_PARAMS = {
+    'start_date': START_DATE.strftime('%Y-%m-%d'),
+    'lookback_days': LOOKBACK_DAYS,
+    'correlation_threshold': CORRELATION_THRESHOLD,
+    'min_stocks': MIN_STOCKS,
+    'mode': 'batched' if args.batched else 'per-theme',
+    'min_overlap': args.min_overlap,
+    'result_version': RESULT_VERSION
+}
+PARAMS_FINGERPRINT = hashlib.sha256(
+    json.dumps(BUILD_PARAMS, sort_keys=True).encode('utf-8')
+).hexdigest()[:16]
 
 print("="*80)
 print("NAVER THEME FIEDLER DATABASE BUILDER")
 print("="*80)
 print(f"Start date: {START_DATE.strftime('%Y-%m-%d')}")
 print(f"Lookback window: {LOOKBACK_DAYS} days")
-print(f"Correlation threshold: {CORRELATION_THRESHOLD}")
+if SWEEP_THRESHOLDS:
+    print(f"Correlation thresholds (sweep): {', '.join(str(t) for t in SWEEP_THRESHOLDS)}")
+else:
+    print(f"Correlation threshold: {CORRELATION_THRESHOLD}")
 print(f"Minimum stocks per theme: {MIN_STOCKS}")
+print(f"Minimum overlap: {args.min_overlap if args.min_overlap else 'listwise (complete rows only)'}")
+print(f"Mode: {'batched (universe correlation per window)' if args.batched else 'per-theme'}")
+print(f"Workers: {args.workers}")
+print(f"Spectral cache: {'off' if args.no_cache else SPECTRAL_CACHE_FILE}")
+print(f"Update: {'incremental' if args.incremental else 'full rebuild'} (params {PARAMS_FINGERPRINT})")
 print("="*80)
 
 # Load Naver themes
@@ -65,211 +134,195 @@ print(f"   Total unique tickers: {len(all_tickers)}")
 
 price_data = {}
 loaded = 0
-for ticker in all_tickers:
-    file_path = PRICE_DATA_DIR / f"{ticker}.csv"
-    if not file_path.exists():
-        continue
-
-    try:
-        df = pd.read_csv(file_path)
-
-        # Handle date column (case-insensitive)
-        date_col = next((c for c in df.columns if c.lower() == 'date'), None)
-        if date_col:
-            df[date_col] = pd.to_datetime(df[date_col])
-            df = df.set_index(date_col)
-            df.index.name = 'Date'
-        elif 'Unnamed: 0' in df.columns:
-            df['Unnamed: 0'] = pd.to_datetime(df['Unnamed: 0'])
-            df = df.set_index('Unnamed: 0')
-            df.index.name = 'Date'
-        else:
-            continue  # Skip files without a recognizable date column
-
-        # Handle close column (case-insensitive)
-        close_col = next((c for c in df.columns if c.lower() == 'close'), None)
-        if close_col:
-            df = df[[close_col]].rename(columns={close_col: 'Close'})
-            df = df[df.index >= START_DATE - pd.Timedelta(days=LOOKBACK_DAYS*2)]
-            price_data[ticker] = df.sort_index()
-            loaded += 1
-
-            if loaded % 500 == 0:
-                print(f"   Loaded {loaded} stocks...")
-    except Exception as e:
-        continue
-
-print(f"   Successfully loaded {loaded} stocks")
-
-def calculate_fiedler_eigenvalue(returns_df):
-    """Calculate Fiedler eigenvalue from returns dataframe."""
-    if len(returns_df) < 2 or len(returns_df.columns) < MIN_STOCKS:
-        return None, 0, 0
-
-    # Calculate correlation matrix
-    corr_matrix = returns_df.corr()
-
-    # Build adjacency matrix
-    n = len(corr_matrix)
-    adj_matrix = np.zeros((n, n))
-    edge_count = 0
-
-    for i in range(n):
-        for j in range(i+1, n):
-            if abs(corr_matrix.iloc[i, j]) >= CORRELATION_THRESHOLD:
-                adj_matrix[i, j] = 1
-                adj_matrix[j, i] = 1
-                edge_count += 1
-
-    # Check if connected
-    degrees = adj_matrix.sum(axis=1)
-    if np.any(degrees == 0):
-        return 0.0, edge_count, False
-
-    # Graph Laplacian
-    degree_matrix = np.diag(degrees)
-    laplacian = degree_matrix - adj_matrix
-
-    # Calculate eigenvalues
-    try:
-        laplacian_sparse = csr_matrix(laplacian)
-        eigenvalues = eigsh(laplacian_sparse, k=min(n-1, 10), which='SM', return_eigenvectors=False)
-        eigenvalues = np.sort(eigenvalues)
-
-        fiedler = float(eigenvalues[1]) if len(eigenvalues) >= 2 else 0.0
-        return fiedler, edge_count, True
-    except:
-        return 0.0, edge_count, False
-
-def calculate_theme_fiedler(theme_tickers, start_date, end_date):
-    """Calculate Fiedler value for a theme over date range."""
-    # Filter tickers with data
-    valid_tickers = [t for t in theme_tickers if t in price_data]
-
-    if len(valid_tickers) < MIN_STOCKS:
-        return None
-
-    # Calculate returns for lookback period
-    lookback_start = start_date - pd.Timedelta(days=LOOKBACK_DAYS)
-
-    returns_dict = {}
-    for ticker in valid_tickers:
-        df = price_data[ticker]
-        period_data = df[(df.index >= lookback_start) & (df.index <= end_date)]
-
-        if len(period_data) < 2:
+price_store = open_price_store()
+if price_store is not None:
+    print(f"   Reading from price store: {price_store.store_dir}")
+    # Date x ticker close panel straight from the memory-mapped store
+    # (no per-ticker frames); tickers without data in the window are dropped
+    close_panel = price_store.panel(
+        'close', tickers=sorted(all_tickers),
+        start=START_DATE - pd.Timedelta(days=LOOKBACK_DAYS*2)
+    )
+    close_panel = close_panel.loc[:, close_panel.notna().any().to_numpy()]
+    loaded = close_panel.shape[1]
+else:
+    failed = {}
+    for ticker in all_tickers:
+        file_path = PRICE_DATA_DIR / f"{ticker}.csv"
+        if not file_path.exists():
             continue
 
-        returns = period_data['Close'].pct_change().dropna()
-        if len(returns) >= 2:
-            returns_dict[ticker] = returns
+        try:
+            df = read_price_csv(file_path)
+        except Exception as e:
+            failed[file_path.name] = f"{type(e).__name__}: {e}"
+            continue
+        if df is None:
+            failed[file_path.name] = 'no date/close column'
+            continue
 
-    if len(returns_dict) < MIN_STOCKS:
-        return None
+        df = df[['close']].rename(columns={'close': 'Close'})
+        price_data[ticker] = df[df.index >= START_DATE - pd.Timedelta(days=LOOKBACK_DAYS*2)]
+        loaded += 1
 
-    # Align returns
-    returns_df = pd.DataFrame(returns_dict)
-    returns_df = returns_df.dropna()
+        if loaded % 500 == 0:
+            print(f"   Loaded {loaded} stocks...")
 
-    if len(returns_df) < 2 or len(returns_df.columns) < MIN_STOCKS:
-        return None
+    if failed:
+        print(f"   {len(failed)} price files failed to parse:")
+        for name, reason in list(failed.items())[:20]:
+            print(f"     {name}: {reason}")
 
-    # Calculate Fiedler
-    fiedler, n_edges, is_connected = calculate_fiedler_eigenvalue(returns_df)
+print(f"   Successfully loaded {loaded} stocks")
 
-    mean_corr = returns_df.corr().values[np.triu_indices_from(returns_df.corr().values, k=1)].mean()
+# Date x ticker close panel shared by the serial and parallel paths
+if price_store is None:
+    close_panel = pd.DataFrame({
+        t: df['Close'][~df.index.duplicated(keep='last')] for t, df in price_data.items()
+    }).sort_index()
+
+FIEDLER_PARAMS = {
+    'lookback_days': LOOKBACK_DAYS,
+    'threshold': CORRELATION_THRESHOLD,
+    'min_stocks': MIN_STOCKS,
+    'batched': args.batched,
+    'min_overlap': args.min_overlap
+}
+if SWEEP_THRESHOLDS:
+    FIEDLER_PARAMS['thresholds'] = SWEEP_THRESHOLDS
+
+spectral_cache = SpectralCache(enabled=not args.no_cache)
+
+def load_stored_results():
+    """Stored (weekly_df, monthly_df) if they were built with the same parameters."""
+    if not (META_FILE.exists() and WEEKLY_FILE.exists() and MONTHLY_FILE.exists()):
+        print("   No stored database found - full rebuild")
+        return None, None
 
-    return {
-        'fiedler': fiedler,
-        'n_stocks': len(returns_df.columns),
-        'n_edges': n_edges,
-        'mean_correlation': mean_corr,
-        'is_connected': is_connected
+    try:
+        with open(META_FILE, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        print("   Unreadable metadata - full rebuild")
+        return None, None
+
+    if meta.get('fingerprint') != PARAMS_FINGERPRINT:
+        print(f"   Parameters changed ({meta.get('params')} -> {BUILD_PARAMS}) - full rebuild")
+        return None, None
+
+    # round_trip: kept rows must be written back bit-for-bit
+    weekly_df = pd.read_csv(WEEKLY_FILE, parse_dates=['date'], float_precision='round_trip')
+    monthly_df = pd.read_csv(MONTHLY_FILE, parse_dates=['date'], float_precision='round_trip')
+    print(f"   Stored: {len(weekly_df)} weekly rows, {len(monthly_df)} monthly rows")
+    return weekly_df, monthly_df
+
+def split_periods(periods, stored_df):
+    """
+    Periods to (re)compute and stored rows to keep.
+
+    Every period ending on or after the last stored date is recomputed: that
+    covers the last stored period (possibly partial when it was built) and all
+    new ones. Stored rows from the recomputed periods onwards are dropped.
+    """
+    if stored_df is None or stored_df.empty:
+        return periods, None
+
+    last_date = stored_df['date'].max()
+    todo = [p for p in periods if p['end'] >= last_date]
+    if not todo:
+        return [], stored_df
+
+    return todo, stored_df[stored_df['date'] < todo[0]['start']]
+
+def write_csv_atomic(df, path):
+    """Write to a temp file in the same directory, then rename over the target."""
+    tmp_path = path.with_name(path.name + '.tmp')
+    df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+def result_rows(period, label_key, theme, result):
+    """Output rows for one theme/period (one per threshold in sweep mode)."""
+    rows = []
+    for res in (result if isinstance(result, list) else [result]):
+        row = {'date': period['end'], label_key: period['label'], 'theme': theme}
+        if SWEEP_THRESHOLDS:
+            row['threshold'] = res['threshold']
+        row.update({
+            'fiedler': res['fiedler'],
+            'n_stocks': res['n_stocks'],
+            'n_edges': res['n_edges'],
+            'mean_correlation': res['mean_correlation'],
+            'is_connected': res['is_connected'],
+            'n_components': res['n_components'],
+            'largest_component': res['largest_component'],
+            'component_fiedler': res['component_fiedler'],
+            'disconnect_reason': res.get('disconnect_reason')
+        })
+        rows.append(row)
+    return rows
+
+def write_meta(weekly_df, monthly_df):
+    meta = {
+        'fingerprint': PARAMS_FINGERPRINT,
+        'params': BUILD_PARAMS,
+        'weekly_last_date': weekly_df['date'].max().strftime('%Y-%m-%d') if len(weekly_df) else None,
+        'monthly_last_date': monthly_df['date'].max().strftime('%Y-%m-%d') if len(monthly_df) else None,
+        'updated_at': pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')
     }
+    tmp_path = META_FILE.with_name(META_FILE.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_path, META_FILE)
 
 # Get all trading dates from 2025-01-01
 print("\n3. Identifying trading dates...")
-all_dates = set()
-for df in price_data.values():
-    all_dates.update(df.index)
+if price_store is not None:
+    calendar = TradingCalendar(close_panel.index[close_panel.notna().any(axis=1).to_numpy()])
+else:
+    calendar = TradingCalendar.from_frames(price_data.values())
+calendar = calendar.subset(start=START_DATE)
 
-all_dates = sorted([d for d in all_dates if d >= START_DATE])
-
-if len(all_dates) == 0:
+if len(calendar) == 0:
     print(f"   ERROR: No trading dates found >= {START_DATE.strftime('%Y-%m-%d')}")
     print("   Exiting...")
     exit(1)
 
-print(f"   Found {len(all_dates)} trading days from {all_dates[0].strftime('%Y-%m-%d')} to {all_dates[-1].strftime('%Y-%m-%d')}")
+print(f"   Found {len(calendar)} trading days from {calendar.first.strftime('%Y-%m-%d')} to {calendar.last.strftime('%Y-%m-%d')}")
 
-# Generate weekly periods (Monday-Friday)
+# Generate weekly periods (7-day windows from the first trading day)
 print("\n4. Generating weekly periods (M-F)...")
-weekly_periods = []
-current_date = all_dates[0]
-
-while current_date <= all_dates[-1]:
-    # Find week end (next Friday or last available day)
-    week_dates = [d for d in all_dates if d >= current_date and d < current_date + pd.Timedelta(days=7)]
-
-    if len(week_dates) >= 3:  # At least 3 trading days
-        weekly_periods.append({
-            'start': week_dates[0],
-            'end': week_dates[-1],
-            'label': f"{week_dates[-1].strftime('%Y-%m-%d')}"
-        })
-
-    current_date = current_date + pd.Timedelta(days=7)
+weekly_periods = calendar.week_windows(min_days=3)  # At least 3 trading days
 
 print(f"   Generated {len(weekly_periods)} weekly periods")
 
 # Generate monthly periods (Day 1-30)
 print("\n5. Generating monthly periods (1-30)...")
-monthly_periods = []
-
-for year in range(2025, 2027):
-    for month in range(1, 13):
-        month_start = pd.Timestamp(f'{year}-{month:02d}-01')
-        if month == 12:
-            month_end = pd.Timestamp(f'{year+1}-01-01') - pd.Timedelta(days=1)
-        else:
-            month_end = pd.Timestamp(f'{year}-{month+1:02d}-01') - pd.Timedelta(days=1)
+monthly_periods = calendar.month_windows(min_days=5)  # At least 5 trading days
 
-        if month_start > all_dates[-1]:
-            break
-
-        month_dates = [d for d in all_dates if d >= month_start and d <= month_end]
+print(f"   Generated {len(monthly_periods)} monthly periods")
 
-        if len(month_dates) >= 5:  # At least 5 trading days
-            monthly_periods.append({
-                'start': month_dates[0],
-                'end': month_dates[-1],
-                'label': f"{year}-{month:02d}"
-            })
+stored_weekly, stored_monthly = None, None
+if args.incremental:
+    print("\n   Checking stored database...")
+    stored_weekly, stored_monthly = load_stored_results()
 
-print(f"   Generated {len(monthly_periods)} monthly periods")
+weekly_todo, kept_weekly = split_periods(weekly_periods, stored_weekly)
+monthly_todo, kept_monthly = split_periods(monthly_periods, stored_monthly)
+if args.incremental and stored_weekly is not None:
+    print(f"   Recomputing {len(weekly_todo)}/{len(weekly_periods)} weeks, "
+          f"{len(monthly_todo)}/{len(monthly_periods)} months")
 
 # Calculate weekly Fiedler values
 print("\n6. Calculating weekly Fiedler values for all themes...")
 weekly_results = []
 
-for i, period in enumerate(weekly_periods):
-    if (i+1) % 5 == 0:
-        print(f"   Processing week {i+1}/{len(weekly_periods)}...")
-
-    for theme, tickers in theme_to_tickers.items():
-        result = calculate_theme_fiedler(tickers, period['start'], period['end'])
-
-        if result is not None:
-            weekly_results.append({
-                'date': period['end'],
-                'week_label': period['label'],
-                'theme': theme,
-                'fiedler': result['fiedler'],
-                'n_stocks': result['n_stocks'],
-                'n_edges': result['n_edges'],
-                'mean_correlation': result['mean_correlation'],
-                'is_connected': result['is_connected']
-            })
+weekly_period_results = compute_periods(close_panel, theme_to_tickers, weekly_todo,
+                                        FIEDLER_PARAMS, workers=args.workers, label='week',
+                                        cache=spectral_cache)
+
+for period, period_results in zip(weekly_todo, weekly_period_results):
+    for theme, result in period_results.items():
+        weekly_results.extend(result_rows(period, 'week_label', theme, result))
 
 print(f"   Calculated {len(weekly_results)} weekly data points")
 
@@ -277,40 +330,54 @@ print(f"   Calculated {len(weekly_results)} weekly data points")
 print("\n7. Calculating monthly Fiedler values for all themes...")
 monthly_results = []
 
-for i, period in enumerate(monthly_periods):
-    print(f"   Processing month {i+1}/{len(monthly_periods)}: {period['label']}...")
-
-    for theme, tickers in theme_to_tickers.items():
-        result = calculate_theme_fiedler(tickers, period['start'], period['end'])
+monthly_period_results = compute_periods(close_panel, theme_to_tickers, monthly_todo,
+                                         FIEDLER_PARAMS, workers=args.workers, label='month',
+                                         progress_every=1, cache=spectral_cache)
 
-        if result is not None:
-            monthly_results.append({
-                'date': period['end'],
-                'month_label': period['label'],
-                'theme': theme,
-                'fiedler': result['fiedler'],
-                'n_stocks': result['n_stocks'],
-                'n_edges': result['n_edges'],
-                'mean_correlation': result['mean_correlation'],
-                'is_connected': result['is_connected']
-            })
+for period, period_results in zip(monthly_todo, monthly_period_results):
+    for theme, result in period_results.items():
+        monthly_results.extend(result_rows(period, 'month_label', theme, result))
 
 print(f"   Calculated {len(monthly_results)} monthly data points")
 
 # Save to CSV
 print("\n8. Saving results...")
 
-weekly_df = pd.DataFrame(weekly_results)
-monthly_df = pd.DataFrame(monthly_results)
-
-weekly_file = OUTPUT_DIR / "naver_themes_weekly_fiedler_2025.csv"
-monthly_file = OUTPUT_DIR / "naver_themes_monthly_fiedler_2025.csv"
-
-weekly_df.to_csv(weekly_file, index=False)
-monthly_df.to_csv(monthly_file, index=False)
-
-print(f"   Weekly data: {weekly_file}")
-print(f"   Monthly data: {monthly_file}")
+weekly_df = pd.concat([kept_weekly, pd.DataFrame(weekly_results)], ignore_index=True)
+monthly_df = pd.concat([kept_monthly, pd.DataFrame(monthly_results)], ignore_index=True)
+
+if SWEEP_THRESHOLDS:
+    write_csv_atomic(weekly_df, WEEKLY_SWEEP_FILE)
+    write_csv_atomic(monthly_df, MONTHLY_SWEEP_FILE)
+    print(f"   Weekly sweep: {WEEKLY_SWEEP_FILE}")
+    print(f"   Monthly sweep: {MONTHLY_SWEEP_FILE}")
+
+    print("\n" + "="*80)
+    print("THRESHOLD SWEEP SUMMARY")
+    print("="*80)
+    sweep_summary = weekly_df.groupby('threshold').agg(
+        records=('fiedler', 'size'),
+        mean_fiedler=('fiedler', 'mean'),
+        median_fiedler=('fiedler', 'median'),
+        connected_pct=('is_connected', 'mean'),
+        mean_edges=('n_edges', 'mean')
+    )
+    sweep_summary['connected_pct'] *= 100
+    print("\nWeekly (by threshold):")
+    print(sweep_summary.round(3).to_string())
+    print(f"\nSpectral cache: {spectral_cache.summary()}")
+    print("\n" + "="*80)
+    print("THRESHOLD SWEEP COMPLETE")
+    print("="*80)
+    exit(0)
+
+# Full file rewrite via rename: readers never see a half-written CSV
+write_csv_atomic(weekly_df, WEEKLY_FILE)
+write_csv_atomic(monthly_df, MONTHLY_FILE)
+write_meta(weekly_df, monthly_df)
+
+print(f"   Weekly data: {WEEKLY_FILE}")
+print(f"   Monthly data: {MONTHLY_FILE}")
 
 # Print summary statistics
 print("\n" + "="*80)
@@ -323,6 +390,9 @@ print(f"  Themes covered: {weekly_df['theme'].nunique()}")
 print(f"  Date range: {weekly_df['date'].min().strftime('%Y-%m-%d')} to {weekly_df['date'].max().strftime('%Y-%m-%d')}")
 print(f"  Mean Fiedler: {weekly_df['fiedler'].mean():.3f}")
 print(f"  Median Fiedler: {weekly_df['fiedler'].median():.3f}")
+reasons = weekly_df['disconnect_reason'].value_counts()
+if len(reasons):
+    print("  Disconnected: " + ", ".join(f"{reason} {count}" for reason, count in reasons.items()))
 
 print(f"\nMonthly Database:")
 print(f"  Total records: {len(monthly_df)}")
@@ -348,6 +418,8 @@ print(f"\nMonthly data points: {len(monthly_5g)}")
 if len(monthly_5g) > 0:
     print(monthly_5g[['date', 'fiedler', 'n_stocks', 'is_connected']].to_string(index=False))
 
+print(f"\nSpectral cache: {spectral_cache.summary()}")
+
 print("\n" + "="*80)
 print("DATABASE BUILD COMPLETE")
 print("="*80)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Build the consolidated price panel store from the per-ticker CSVs.
+
+Input: PRICE_DATA_DIR/*.csv (one file per stock)
+Output: PRICE_STORE_DIR (per-build dates/close/high/low/volume .npy set, index.json)
+        RETURNS_CUBE_DIR (float32 close/returns cube, cube.json)
+
+Run after the daily price update; every job then reads date-sliced panels
+from the store instead of re-parsing thousands of CSVs. Only CSVs whose size
+or mtime changed since the last build are parsed again (PRICE_STORE_DIR/ingest).
+
+Usage:
+    python Jobs/build_price_store.py
+    python Jobs/build_price_store.py --start-date 2023-01-01
+    python Jobs/build_price_store.py --full --workers 16
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config import PRICE_DATA_DIR, PRICE_STORE_DIR, RETURNS_CUBE_DIR
+from cohesion.price_store import build_price_store, PriceStore, INGEST_WORKERS
+from cohesion.returns_cube import build_returns_cube
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build consolidated price panel store')
+    parser.add_argument('--price-dir', type=str, default=str(PRICE_DATA_DIR),
+                        help='Directory of per-ticker price CSVs')
+    parser.add_argument('--store-dir', type=str, default=str(PRICE_STORE_DIR),
+                        help='Output directory for the panel store')
+    parser.add_argument('--start-date', type=str, default=None,
+                        help='Drop rows before this date (YYYY-MM-DD, default: keep all)')
+    parser.add_argument('--cube-dir', type=str, default=str(RETURNS_CUBE_DIR),
+                        help='Output directory for the float32 close/returns cube')
+    parser.add_argument('--workers', type=int, default=INGEST_WORKERS,
+                        help=f'CSV parser processes (default: {INGEST_WORKERS})')
+    parser.add_argument('--full', action='store_true',
+                        help='Re-parse every CSV, ignoring the ingest manifest')
+    args = parser.parse_args()
+
+    print("="*80)
+    print("PRICE PANEL STORE BUILDER")
+    print("="*80)
+
+    if not Path(args.price_dir).exists():
+        print(f"ERROR: Price data directory not found: {args.price_dir}")
+        sys.exit(1)
+
+    started = time.time()
+    summary = build_price_store(args.price_dir, args.store_dir, start_date=args.start_date,
+                                workers=args.workers, full=args.full)
+    build_returns_cube(PriceStore(args.store_dir), args.cube_dir)
+
+    print(f"\nStore: {args.store_dir}")
+    print(f"Tickers: {summary['n_tickers']}, Dates: {summary['n_dates']}")
+    print(f"Files: {summary['parsed']} parsed, {summary['skipped']} unchanged, "
+          f"{len(summary['failed'])} failed")
+    print(f"Elapsed: {time.time() - started:.1f}s")
+    print("="*80)
+
+
+if __name__ == "__main__":
+    main()
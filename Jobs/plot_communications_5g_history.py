@@ -14,13 +14,14 @@ from datetime import datetime
 # File paths - use config module for self-contained project
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from config import DATA_DIR, REPORTS_DIR
+from config import REPORTS_DIR
+from cohesion.timeseries_store import open_fiedler_timeseries
 
 OUTPUT_DIR = REPORTS_DIR
 OUTPUT_DIR.mkdir(exist_ok=True)
 
-THEME_5G_FILE = DATA_DIR / "theme_5G5세대_이동통신_timeseries.csv"
-THEME_COMM_FILE = DATA_DIR / "theme_통신_timeseries.csv"
+THEME_5G = "5G(5세대 이동통신)"
+THEME_COMM = "통신"
 
 # Oct 27 and 29 baseline values
 OCT_27_5G = 29.70
@@ -32,11 +33,13 @@ print("="*80)
 
 # Load data
 print("\n1. Loading historical data...")
-df_5g = pd.read_csv(THEME_5G_FILE)
-df_comm = pd.read_csv(THEME_COMM_FILE)
+timeseries = open_fiedler_timeseries()
+if timeseries is None:
+    print("   ERROR: No Fiedler timeseries found")
+    sys.exit(1)
 
-df_5g['date'] = pd.to_datetime(df_5g['date'])
-df_comm['date'] = pd.to_datetime(df_comm['date'])
+df_5g = timeseries.theme(THEME_5G)
+df_comm = timeseries.theme(THEME_COMM)
 
 print(f"   5G theme: {len(df_5g)} data points from {df_5g['date'].min()} to {df_5g['date'].max()}")
 print(f"   Communications: {len(df_comm)} data points from {df_comm['date'].min()} to {df_comm['date'].max()}")
@@ -32,6 +32,17 @@ echo -e "Project: ${GREEN}$PROJECT_ROOT${NC}"
 echo -e "Log File: ${GREEN}$LOG_FILE${NC}"
 echo ""
 
+# Refresh the price store (only changed CSVs are re-parsed); a stale or missing
+# store makes the analysis read the CSVs, so a failure here is not fatal
+STORE_LOG="logs/build_price_store_$(date +%Y%m%d).log"
+echo -e "${YELLOW}Refreshing price store...${NC}"
+if python3 "$SCRIPT_DIR/build_price_store.py" > "$STORE_LOG" 2>&1; then
+    echo -e "${GREEN}✓${NC}  Price store up to date"
+else
+    echo -e "${YELLOW}⚠${NC}  Price store build failed (see $STORE_LOG); reading CSVs"
+fi
+echo ""
+
 # Run the analysis
 echo -e "${YELLOW}Running daily abnormal sector analysis...${NC}"
 if python3 "$SCRIPT_DIR/analyze_daily_abnormal_sectors.py" 2>&1 | tee "$LOG_FILE"; then
@@ -39,10 +50,9 @@ if python3 "$SCRIPT_DIR/analyze_daily_abnormal_sectors.py" 2>&1 | tee "$LOG_FILE
     echo -e "${GREEN}✓${NC}  Daily analysis complete"
     echo ""
     echo -e "${GREEN}Generated Files:${NC}"
-    DATE_STR=$(date +%Y%m%d)
-    echo -e "  • CSV: data/abnormal_sectors_${DATE_STR}.csv"
-    echo -e "  • Report: reports/ABNORMAL_SECTORS_${DATE_STR}.md"
-    echo -e "  • Log: logs/daily_abnormal_sectors_${DATE_STR}.log"
+    # The job prints one GENERATED line per file it wrote (one CSV per trading day caught up)
+    sed -n 's/^GENERATED: /  • /p' "$LOG_FILE"
+    echo -e "  • Log: $LOG_FILE"
     echo ""
     echo -e "${BLUE}======================================${NC}"
     exit 0
@@ -5,10 +5,7 @@ Includes Korean font support for matplotlib.
 """
 
 import pandas as pd
-import numpy as np
 from pathlib import Path
-from scipy.sparse import csr_matrix
-from scipy.sparse.linalg import eigsh
 import json
 import warnings
 import matplotlib.pyplot as plt
@@ -27,6 +24,7 @@ plt.rcParams['axes.unicode_minus'] = False  # Fix minus sign display
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from config import PRICE_DATA_DIR, THEME_TO_TICKERS_FILE, DATA_DIR
+from cohesion.fiedler import compute_fiedler
 
 THEME_FILE = THEME_TO_TICKERS_FILE
 OUTPUT_DIR = DATA_DIR
@@ -87,40 +85,6 @@ for ticker in all_tickers:
 
 print(f"   Loaded {len(price_data)} stocks")
 
-def calculate_fiedler_eigenvalue(returns_df):
-    """Calculate Fiedler eigenvalue."""
-    if len(returns_df) < 2 or len(returns_df.columns) < MIN_STOCKS:
-        return None, 0, 0, 0.0
-
-    corr_matrix = returns_df.corr()
-    n = len(corr_matrix)
-    adj_matrix = np.zeros((n, n))
-    edge_count = 0
-
-    for i in range(n):
-        for j in range(i+1, n):
-            if abs(corr_matrix.iloc[i, j]) >= CORRELATION_THRESHOLD:
-                adj_matrix[i, j] = 1
-                adj_matrix[j, i] = 1
-                edge_count += 1
-
-    degrees = adj_matrix.sum(axis=1)
-    if np.any(degrees == 0):
-        return 0.0, edge_count, False, corr_matrix.values[np.triu_indices_from(corr_matrix.values, k=1)].mean()
-
-    degree_matrix = np.diag(degrees)
-    laplacian = degree_matrix - adj_matrix
-
-    try:
-        laplacian_sparse = csr_matrix(laplacian)
-        eigenvalues = eigsh(laplacian_sparse, k=min(n-1, 10), which='SM', return_eigenvectors=False)
-        eigenvalues = np.sort(eigenvalues)
-        fiedler = float(eigenvalues[1]) if len(eigenvalues) >= 2 else 0.0
-        mean_corr = corr_matrix.values[np.triu_indices_from(corr_matrix.values, k=1)].mean()
-        return fiedler, edge_count, True, mean_corr
-    except:
-        return 0.0, edge_count, False, corr_matrix.values[np.triu_indices_from(corr_matrix.values, k=1)].mean()
-
 def calculate_theme_fiedler(theme_tickers, start_date, end_date):
     """Calculate Fiedler for a theme over date range."""
     valid_tickers = [t for t in theme_tickers if t in price_data]
@@ -151,15 +115,7 @@ def calculate_theme_fiedler(theme_tickers, start_date, end_date):
     if len(returns_df) < 2 or len(returns_df.columns) < MIN_STOCKS:
         return None
 
-    fiedler, n_edges, is_connected, mean_corr = calculate_fiedler_eigenvalue(returns_df)
-
-    return {
-        'fiedler': fiedler,
-        'n_stocks': len(returns_df.columns),
-        'n_edges': n_edges,
-        'mean_correlation': mean_corr,
-        'is_connected': is_connected
-    }
+    return compute_fiedler(returns_df.corr(), CORRELATION_THRESHOLD)
 
 # Get trading dates
 print("\n3. Identifying trading dates...")
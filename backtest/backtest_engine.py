@@ -10,6 +10,11 @@ import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from cohesion.trading_calendar import TradingCalendar
+from cohesion.returns_cube import CubeFrames
 
 try:
     from .data_loader import DataLoader
@@ -88,6 +93,10 @@ class BacktestEngine:
             start_date=start_date,
             end_date=(pd.to_datetime(end_date) + timedelta(weeks=holding_period_weeks)).strftime('%Y-%m-%d')
         )
+        if isinstance(self.price_data, CubeFrames):
+            self.calendar = TradingCalendar(self.price_data.trading_dates())
+        else:
+            self.calendar = TradingCalendar.from_frames(self.price_data.values())
         
         self.return_calc = ReturnCalculator(self.price_data, self.theme_mapping)
         
@@ -96,6 +105,38 @@ class BacktestEngine:
         self.returns = []
         self.signal_return_pairs = []
     
+    def resolve_theme(self, theme_name: str) -> Optional[str]:
+        """
+        Actual theme name for a Fiedler timeseries key
+        
+        Timeseries table keys are exact theme names; the fuzzy match is kept
+        for keys derived from legacy per-theme file names.
+        """
+        if theme_name in self.theme_mapping:
+            return theme_name
+        
+        for actual in self.theme_name_mapping:
+            if theme_name.replace(' ', '_') in actual.replace(' ', '_') or \
+               actual.replace(' ', '_') in theme_name.replace(' ', '_'):
+                return actual
+        return None
+    
+    def evaluation_dates(self, start_date, end_date, evaluation_frequency: str = 'weekly'):
+        """
+        Trading days to evaluate signals on
+
+        Weekly: last trading day of each calendar week (same data as the
+        week-ending Sunday, without weekend or holiday-only dates).
+        Daily: every trading day. Falls back to calendar dates without prices.
+        """
+        if len(self.calendar) == 0:
+            freq = 'W' if evaluation_frequency == 'weekly' else 'D'
+            return pd.date_range(start_date, end_date, freq=freq)
+
+        if evaluation_frequency == 'weekly':
+            return self.calendar.week_ends(start_date, end_date, freq='W')
+        return self.calendar.between(start_date, end_date)
+    
     def run_backtest(self, evaluation_frequency: str = 'weekly'):
         """
         Run walk-forward backtest
@@ -122,18 +163,7 @@ class BacktestEngine:
             print(f"  Need at least {self.holding_period_weeks} weeks between start and end dates.")
             return pd.DataFrame()
         
-        if evaluation_frequency == 'weekly':
-            eval_dates = pd.date_range(
-                self.start_date,
-                eval_end_date,
-                freq='W'
-            )
-        else:
-            eval_dates = pd.date_range(
-                self.start_date,
-                eval_end_date,
-                freq='D'
-            )
+        eval_dates = self.evaluation_dates(self.start_date, eval_end_date, evaluation_frequency)
         
         print(f"Evaluating {len(eval_dates)} dates...")
         
@@ -145,19 +175,9 @@ class BacktestEngine:
             # For each theme with Fiedler data
             for safe_theme_name, fiedler_ts in self.fiedler_timeseries.items():
                 # Find actual theme name
-                actual_theme = None
-                for actual, safe in self.theme_name_mapping.items():
-                    if safe_theme_name.replace(' ', '_') in actual.replace(' ', '_') or \
-                       actual.replace(' ', '_') in safe_theme_name.replace(' ', '_'):
-                        actual_theme = actual
-                        break
-                
+                actual_theme = self.resolve_theme(safe_theme_name)
                 if actual_theme is None:
-                    # Try direct match
-                    if safe_theme_name in self.theme_mapping:
-                        actual_theme = safe_theme_name
-                    else:
-                        continue
+                    continue
                 
                 # Calculate all individual signals
                 all_signals = self.signal_calc.calculate_all_signals_for_date(
@@ -143,7 +143,7 @@ def main():
     start_dt = pd.to_datetime(args.start_date)
     end_dt = pd.to_datetime(end_date)
     eval_end_date = end_dt - timedelta(weeks=args.max_weeks)
-    eval_dates = pd.date_range(start_dt, eval_end_date, freq='W')
+    eval_dates = engine.evaluation_dates(start_dt, eval_end_date, 'weekly')
     
     print(f"Evaluating {len(eval_dates)} dates...")
     
@@ -159,18 +159,9 @@ def main():
         # For each theme
         for safe_theme_name, fiedler_ts in engine.fiedler_timeseries.items():
             # Find actual theme name
-            actual_theme = None
-            for actual, safe in engine.theme_name_mapping.items():
-                if safe_theme_name.replace(' ', '_') in actual.replace(' ', '_') or \
-                   actual.replace(' ', '_') in safe_theme_name.replace(' ', '_'):
-                    actual_theme = actual
-                    break
-            
+            actual_theme = engine.resolve_theme(safe_theme_name)
             if actual_theme is None:
-                if safe_theme_name in engine.theme_mapping:
-                    actual_theme = safe_theme_name
-                else:
-                    continue
+                continue
             
             # Calculate signals
             signals = signal_calc.calculate_all_signals_for_date(
@@ -14,8 +14,6 @@ import numpy as np
 from pathlib import Path
 from datetime import datetime, timedelta
 import json
-import ast
-import glob
 import sys
 
 # Add parent directory to path
@@ -24,6 +22,10 @@ from config import (
     DATA_DIR, PRICE_DATA_DIR, DB_FILE, REGIME_DIR,
     THEME_TO_TICKERS_FILE, AUTOGLUON_BASE_DIR
 )
+from cohesion.price_store import open_price_store
+from cohesion.returns_cube import open_returns_cube
+from cohesion.timeseries_store import open_fiedler_timeseries
+from cohesion.theme_index import open_theme_index
 
 class DataLoader:
     """Load historical data for backtesting"""
@@ -37,33 +39,19 @@ class DataLoader:
         
     def load_fiedler_timeseries(self):
         """
-        Load all theme Fiedler timeseries from data/theme_*_timeseries.csv files
+        Load all theme Fiedler timeseries from the consolidated timeseries table
+        (data/fiedler_timeseries/, falling back to legacy theme_*_timeseries.csv files)
         
         Returns:
             dict: {theme_name: DataFrame with columns [date, fiedler, n_stocks, ...]}
         """
         print("Loading Fiedler timeseries data...")
-        timeseries_files = glob.glob(str(self.data_dir / "theme_*_timeseries.csv"))
-        
-        theme_timeseries = {}
-        for file_path in timeseries_files:
-            try:
-                df = pd.read_csv(file_path, parse_dates=['date'])
-                df['date'] = pd.to_datetime(df['date'])
-                
-                # Extract theme name from filename
-                # Format: theme_OLED유기_발광_다이오드_timeseries.csv
-                filename = Path(file_path).stem
-                theme_name = filename.replace('theme_', '').replace('_timeseries', '')
-                # Try to reconstruct original theme name (approximate)
-                theme_name = theme_name.replace('_', ' ')
-                
-                # Store with original theme name if we can find it
-                theme_timeseries[theme_name] = df.sort_values('date')
-            except Exception as e:
-                print(f"  Warning: Could not load {file_path}: {e}")
-                continue
+        table = open_fiedler_timeseries(legacy_dir=self.data_dir)
+        if table is None:
+            print("  Warning: No Fiedler timeseries found")
+            return {}
         
+        theme_timeseries = table.by_theme()
         print(f"  Loaded {len(theme_timeseries)} theme timeseries")
         return theme_timeseries
     
@@ -87,26 +75,12 @@ class DataLoader:
         return theme_data
     
     def _load_theme_mapping_from_db(self):
-        """Load theme mapping from database as fallback"""
+        """Load theme mapping from the database's parsed theme index as fallback"""
         print("  Loading from database...")
-        db_df = pd.read_csv(self.db_file)
-        
-        theme_stocks = {}
-        for _, row in db_df.iterrows():
-            ticker = row['tickers']
-            themes_str = row.get('naverTheme', '[]')
-            
-            try:
-                themes = ast.literal_eval(themes_str) if isinstance(themes_str, str) else themes_str
-                if isinstance(themes, list):
-                    for theme in themes:
-                        if theme not in theme_stocks:
-                            theme_stocks[theme] = []
-                        theme_stocks[theme].append(ticker)
-            except:
-                continue
-        
-        return theme_stocks
+        index = open_theme_index(self.db_file)
+        if index is None:
+            return {}
+        return index.theme_members(index.tickers)
     
     def load_stock_prices(self, tickers=None, start_date=None, end_date=None):
         """
@@ -118,10 +92,24 @@ class DataLoader:
             end_date: End date (YYYY-MM-DD)
         
         Returns:
-            dict: {ticker: DataFrame with price data}
+            dict: {ticker: DataFrame with price data}. With the returns cube
+            built this is a lazy CubeFrames mapping of 'close' frames read
+            from the shared memory-mapped cube.
         """
         print("Loading stock price data...")
         
+        cube = open_returns_cube()
+        if cube is not None:
+            price_data = cube.frames(tickers, start=start_date, end=end_date, column='close')
+            print(f"  Mapped {len(price_data)} stock price series (returns cube)")
+            return price_data
+        
+        store = open_price_store()
+        if store is not None:
+            price_data = store.frames(tickers, start=start_date, end=end_date)
+            print(f"  Loaded {len(price_data)} stock price series (price store)")
+            return price_data
+        
         if not self.price_data_dir.exists():
             print(f"  Warning: Price data directory not found: {self.price_data_dir}")
             return {}
@@ -231,6 +219,11 @@ class DataLoader:
         # Map timeseries themes to actual themes
         result = {}
         for safe_theme_name, ts_df in theme_timeseries.items():
+            # Timeseries table keys are exact theme names
+            if safe_theme_name in theme_mapping:
+                result[safe_theme_name] = theme_mapping[safe_theme_name]
+                continue
+            
             # Try to find matching actual theme
             actual_theme = None
             for safe, actual in safe_to_actual.items():
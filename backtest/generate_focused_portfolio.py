@@ -133,18 +133,9 @@ def generate_focused_portfolio(start_date, output_file=None, use_meta_labeling=T
     
     for safe_theme_name, fiedler_ts in engine.fiedler_timeseries.items():
         # Find actual theme name
-        actual_theme = None
-        for actual, safe in engine.theme_name_mapping.items():
-            if safe_theme_name.replace(' ', '_') in actual.replace(' ', '_') or \
-               actual.replace(' ', '_') in safe_theme_name.replace(' ', '_'):
-                actual_theme = actual
-                break
-        
+        actual_theme = engine.resolve_theme(safe_theme_name)
         if actual_theme is None:
-            if safe_theme_name in engine.theme_mapping:
-                actual_theme = safe_theme_name
-            else:
-                continue
+            continue
         
         if actual_theme not in engine.theme_mapping:
             continue
@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+Spectral Cohesion Pipeline Benchmarks
+
+Times every stage of the three batch workloads on a synthetic KRX-scale market
+(benchmarks/synthetic_market.py) and writes the timings as JSON:
+
+- load:             per-ticker CSV parsing vs price store build/open/panel
+- weekly_builder:   Jobs/build_fiedler_database.py (per-theme windows), plus the
+                    real compute_periods() end to end, per-theme and batched
+- rolling_cohesion: scripts/analyze_naver_theme_cohesion.py (rolling windows,
+                    weighted graphs, warm-started solves)
+- daily_abnormal:   Jobs/analyze_daily_abnormal_sectors.py (one universe
+                    correlation, per-theme slices; state_build / state_advance
+                    time the streaming daily state it now runs on)
+
+Each pipeline reports returns_alignment / correlation / adjacency / eigen_solve /
+file_output seconds built from the same cohesion.* primitives the jobs call.
+Compare two runs with --compare to track regressions or prove a kernel speedup.
+
+Usage:
+    python benchmarks/run_benchmarks.py                       # KRX scale
+    python benchmarks/run_benchmarks.py --scale small         # quick smoke run
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/old.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import scipy
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+from cohesion.price_store import PriceStore, build_price_store, read_price_csv
+from cohesion.fiedler import (threshold_adjacency, laplacian_from_adjacency,
+                              smallest_laplacian_eigenvalues, fiedler_pair)
+from cohesion.correlation import UniverseCorrelation, rolling_corr
+from cohesion.daily_state import DailyThemeState
+from cohesion.theme_windows import compute_periods
+from cohesion.timeseries_store import FiedlerTimeseriesStore
+from cohesion.trading_calendar import TradingCalendar
+from synthetic_market import generate_market, write_price_csvs
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+SCALES = {
+    'krx': {'n_tickers': 2500, 'n_days': 500, 'n_themes': 400, 'min_members': 3, 'max_members': 200},
+    'small': {'n_tickers': 300, 'n_days': 300, 'n_themes': 40, 'min_members': 3, 'max_members': 60},
+}
+
+# Job parameters (mirroring the job scripts)
+THRESHOLD = 0.25
+MIN_STOCKS = 3
+WEEKLY_LOOKBACK_DAYS = 60
+MIN_OVERLAP = 0.5
+ROLLING_WINDOW = 20
+ROLLING_STEP = 5
+DAILY_LOOKBACK_DAYS = 60
+
+
+class StageTimer:
+    """Accumulates wall-clock seconds and call counts per named stage"""
+
+    def __init__(self):
+        self.seconds = {}
+        self.calls = {}
+        self.counts = {}
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] = self.seconds.get(name, 0.0) + time.perf_counter() - start
+            self.calls[name] = self.calls.get(name, 0) + 1
+
+    def count(self, name, n=1):
+        self.counts[name] = self.counts.get(name, 0) + n
+
+    def as_dict(self):
+        return {
+            'stages': {name: {'seconds': round(sec, 4), 'calls': self.calls[name]}
+                       for name, sec in self.seconds.items()},
+            'total_seconds': round(sum(self.seconds.values()), 4),
+            'counts': self.counts
+        }
+
+
+def _fiedler_from_laplacian(laplacian, adj):
+    """Kernel eigen step as in compute_fiedler (isolated node => 0)."""
+    if laplacian.shape[0] < 2 or np.any(adj.sum(axis=1) == 0):
+        return 0.0
+    return max(float(smallest_laplacian_eigenvalues(laplacian, k=2)[1]), 0.0)
+
+
+def bench_load(close_panel, work_dir):
+    timer = StageTimer()
+    price_dir = work_dir / "prices"
+    store_dir = work_dir / "price_store"
+    n_files = write_price_csvs(close_panel, price_dir)
+    timer.count('files', n_files)
+
+    with timer.stage('csv_read'):
+        for csv_file in sorted(price_dir.glob('*.csv')):
+            read_price_csv(csv_file)
+
+    with timer.stage('store_build'):
+        build_price_store(price_dir, store_dir, verbose=False)
+
+    with timer.stage('store_open'):
+        store = PriceStore(store_dir)
+
+    with timer.stage('store_panel'):
+        panel = store.panel('close')
+
+    return timer, panel
+
+
+def bench_weekly_builder(panel, themes, work_dir, n_weeks, workers):
+    timer = StageTimer()
+    start = panel.index[-1] - pd.Timedelta(days=365)
+    periods = TradingCalendar.from_frames([panel]).week_windows(start=start)
+    if n_weeks:
+        periods = periods[-n_weeks:]
+    timer.count('periods', len(periods))
+
+    rows = []
+    for period in periods:
+        lookback_start = period['start'] - pd.Timedelta(days=WEEKLY_LOOKBACK_DAYS)
+        window = panel.loc[lookback_start:period['end']]
+
+        for theme, tickers in themes.items():
+            with timer.stage('returns_alignment'):
+                returns_dict = {}
+                for ticker in tickers:
+                    prices = window[ticker].dropna()
+                    if len(prices) >= 2:
+                        returns = prices.pct_change().dropna()
+                        if len(returns) >= 2:
+                            returns_dict[ticker] = returns
+                returns_df = pd.DataFrame(returns_dict).dropna()
+            if len(returns_df) < 2 or returns_df.shape[1] < MIN_STOCKS:
+                continue
+
+            with timer.stage('correlation'):
+                corr = returns_df.corr().to_numpy()
+            with timer.stage('adjacency'):
+                adj = threshold_adjacency(corr, THRESHOLD)
+                laplacian = laplacian_from_adjacency(adj)
+            with timer.stage('eigen_solve'):
+                fiedler = _fiedler_from_laplacian(laplacian, adj)
+            timer.count('theme_windows')
+            rows.append({'date': period['end'], 'theme': theme, 'fiedler': fiedler,
+                         'n_stocks': corr.shape[0]})
+
+    with timer.stage('file_output'):
+        pd.DataFrame(rows).to_csv(work_dir / "weekly_fiedler.csv", index=False)
+
+    params = {'lookback_days': WEEKLY_LOOKBACK_DAYS, 'threshold': THRESHOLD,
+              'min_stocks': MIN_STOCKS, 'batched': False}
+    with contextlib.redirect_stdout(io.StringIO()):
+        with timer.stage('end_to_end_per_theme'):
+            compute_periods(panel, themes, periods, params, workers=workers)
+        with timer.stage('end_to_end_batched'):
+            compute_periods(panel, themes, periods, dict(params, batched=True), workers=workers)
+        with timer.stage('end_to_end_pairwise'):
+            compute_periods(panel, themes, periods, dict(params, min_overlap=MIN_OVERLAP),
+                            workers=workers)
+
+    return timer
+
+
+def bench_rolling_cohesion(panel, themes, work_dir):
+    timer = StageTimer()
+    start = panel.index[-1] - pd.Timedelta(days=365)
+    series = {}
+
+    for theme, tickers in themes.items():
+        with timer.stage('returns_alignment'):
+            returns_dict = {}
+            for ticker in tickers:
+                returns = panel[ticker].dropna().pct_change().dropna()
+                if len(returns) >= 30:
+                    returns_dict[ticker] = returns
+            returns_df = pd.DataFrame(returns_dict).dropna()
+            returns_df = returns_df[returns_df.index >= start]
+        if returns_df.shape[1] < MIN_STOCKS or len(returns_df) < ROLLING_WINDOW:
+            continue
+
+        windows = rolling_corr(returns_df.to_numpy(), ROLLING_WINDOW, ROLLING_STEP)
+        vector = None
+        rows = []
+        while True:
+            with timer.stage('correlation'):
+                item = next(windows, None)
+            if item is None:
+                break
+            end_pos, corr = item
+
+            with timer.stage('adjacency'):
+                adj = threshold_adjacency(corr, THRESHOLD, weighted=True)
+                laplacian = laplacian_from_adjacency(adj)
+            with timer.stage('eigen_solve'):
+                if np.any(adj.sum(axis=1) == 0):
+                    fiedler = 0.0
+                else:
+                    fiedler, vector, n_iter, _ = fiedler_pair(laplacian, vector)
+                    timer.count('solver_iterations', n_iter)
+            timer.count('theme_windows')
+            rows.append({'date': returns_df.index[end_pos], 'fiedler': max(fiedler, 0.0),
+                         'n_stocks': corr.shape[0]})
+        series[theme] = pd.DataFrame(rows)
+
+    with timer.stage('file_output'):
+        FiedlerTimeseriesStore(work_dir / "fiedler_timeseries").write(series)
+
+    return timer
+
+
+def bench_daily_abnormal(panel, themes, work_dir):
+    timer = StageTimer()
+    end = panel.index[-1]
+
+    with timer.stage('returns_alignment'):
+        window = panel.loc[end - pd.Timedelta(days=DAILY_LOOKBACK_DAYS + 30):end]
+        all_returns = {}
+        for ticker in window.columns:
+            returns = window[ticker].dropna().pct_change().dropna()
+            if len(returns) >= 40:
+                all_returns[ticker] = returns
+        returns_df = pd.DataFrame(all_returns).dropna(axis=1, how='all').tail(DAILY_LOOKBACK_DAYS)
+
+    with timer.stage('correlation'):
+        universe = UniverseCorrelation(returns_df)
+
+    rows = []
+    for theme, tickers in themes.items():
+        members = universe.members(tickers)
+        if len(members) < MIN_STOCKS:
+            continue
+        with timer.stage('adjacency'):
+            corr = universe.sub_matrix(members)
+            adj = threshold_adjacency(corr, THRESHOLD)
+            laplacian = laplacian_from_adjacency(adj)
+        with timer.stage('eigen_solve'):
+            fiedler = _fiedler_from_laplacian(laplacian, adj)
+        timer.count('themes')
+        rows.append({'theme': theme, 'num_stocks': len(members), 'fiedler_today': fiedler})
+
+    with timer.stage('file_output'):
+        pd.DataFrame(rows).to_csv(work_dir / "abnormal_sectors.csv", index=False)
+
+    # Streaming daily state: build through the previous day, then add the last one
+    with timer.stage('state_build'):
+        history = panel.loc[:end].iloc[:-1].tail(DAILY_LOOKBACK_DAYS * 2)
+        state = DailyThemeState.from_close_panel(history, themes, DAILY_LOOKBACK_DAYS)
+    with timer.stage('state_advance'):
+        state.advance(end, panel.loc[end].reindex(state.tickers).to_numpy(dtype=np.float64))
+
+    return timer
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=Path(__file__).parent,
+            stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(old_file, new_results):
+    """Print per-stage old/new seconds and speedup."""
+    with open(old_file, 'r', encoding='utf-8') as f:
+        old_results = json.load(f)
+
+    print(f"\nComparison vs {old_file} ({old_results['meta'].get('git_commit')})")
+    print(f"{'pipeline':<18} {'stage':<22} {'old s':>9} {'new s':>9} {'speedup':>8}")
+    for pipeline, new in new_results['pipelines'].items():
+        old = old_results['pipelines'].get(pipeline)
+        if old is None:
+            continue
+        for stage, timing in new['stages'].items():
+            old_timing = old['stages'].get(stage)
+            if old_timing is None:
+                continue
+            speedup = old_timing['seconds'] / timing['seconds'] if timing['seconds'] > 0 else float('inf')
+            print(f"{pipeline:<18} {stage:<22} {old_timing['seconds']:>9.3f} "
+                  f"{timing['seconds']:>9.3f} {speedup:>7.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the spectral cohesion pipeline')
+    parser.add_argument('--scale', choices=sorted(SCALES), default='krx',
+                        help='Synthetic market size (default: krx)')
+    parser.add_argument('--seed', type=int, default=0, help='Synthetic market seed')
+    parser.add_argument('--weeks', type=int, default=26,
+                        help='Weekly builder periods to time (0 = all of the last year)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Workers for the end-to-end compute_periods runs')
+    parser.add_argument('--pipelines', nargs='+',
+                        default=['load', 'weekly_builder', 'rolling_cohesion', 'daily_abnormal'],
+                        help='Pipelines to run')
+    parser.add_argument('--output', type=Path, default=None,
+                        help='JSON output file (default: benchmarks/results/cohesion_<timestamp>.json)')
+    parser.add_argument('--compare', type=Path, default=None,
+                        help='Previous results JSON to compare against')
+    args = parser.parse_args()
+
+    scale = SCALES[args.scale]
+    print(f"Generating synthetic market ({args.scale}: {scale})...")
+    start = time.perf_counter()
+    close_panel, themes = generate_market(seed=args.seed, **scale)
+    print(f"  {close_panel.shape[1]} tickers x {close_panel.shape[0]} days, "
+          f"{len(themes)} themes in {time.perf_counter() - start:.1f}s")
+
+    results = {
+        'meta': {
+            'timestamp': pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'git_commit': _git_commit(),
+            'scale': args.scale,
+            'synthetic': dict(scale, seed=args.seed),
+            'weeks': args.weeks,
+            'workers': args.workers,
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'scipy': scipy.__version__,
+            'cpu_count': os.cpu_count()
+        },
+        'pipelines': {}
+    }
+
+    with tempfile.TemporaryDirectory(prefix='cohesion_bench_') as tmp:
+        work_dir = Path(tmp)
+        panel = close_panel
+
+        if 'load' in args.pipelines:
+            print("Benchmarking load...")
+            timer, panel = bench_load(close_panel, work_dir)
+            results['pipelines']['load'] = timer.as_dict()
+
+        if 'weekly_builder' in args.pipelines:
+            print("Benchmarking weekly builder...")
+            timer = bench_weekly_builder(panel, themes, work_dir, args.weeks, args.workers)
+            results['pipelines']['weekly_builder'] = timer.as_dict()
+
+        if 'rolling_cohesion' in args.pipelines:
+            print("Benchmarking rolling cohesion...")
+            timer = bench_rolling_cohesion(panel, themes, work_dir)
+            results['pipelines']['rolling_cohesion'] = timer.as_dict()
+
+        if 'daily_abnormal' in args.pipelines:
+            print("Benchmarking daily abnormal sectors...")
+            timer = bench_daily_abnormal(panel, themes, work_dir)
+            results['pipelines']['daily_abnormal'] = timer.as_dict()
+
+    for pipeline, timing in results['pipelines'].items():
+        print(f"\n{pipeline}: {timing['total_seconds']:.2f}s  {timing['counts']}")
+        for stage, stage_timing in timing['stages'].items():
+            print(f"  {stage:<22} {stage_timing['seconds']:>9.3f}s  ({stage_timing['calls']} calls)")
+
+    output = args.output
+    if output is None:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        output = RESULTS_DIR / f"cohesion_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"\nResults: {output}")
+
+    if args.compare:
+        compare(args.compare, results)
+
+
+if __name__ == '__main__':
+    main()
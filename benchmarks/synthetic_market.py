@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Synthetic KRX-like Market Generator
+
+Factor-model prices and overlapping themes at KRX scale, for benchmarking the
+spectral cohesion pipeline without the NAS price data.
+
+    r_it = beta_i * market_t + sum_k w_ik * sector_kt + sigma_i * eps_it
+
+- every ticker loads on the market and on 1-3 of N_SECTORS sector factors
+- themes draw most members from one sector (so they are genuinely cohesive)
+  and the rest from the whole universe, so themes overlap like Naver themes
+- late listings (leading NaN) and sparse trading halts (isolated NaN) mimic
+  the gaps the real loaders have to handle
+"""
+
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+N_SECTORS = 30
+
+
+def generate_market(n_tickers: int = 2500, n_days: int = 500, n_themes: int = 400,
+                    min_members: int = 3, max_members: int = 200,
+                    seed: int = 0, end_date: str = '2025-12-30') -> Tuple[pd.DataFrame, Dict[str, List[str]]]:
+    """
+    Generate a close-price panel and a theme mapping.
+
+    Args:
+        n_tickers: Universe size
+        n_days: Business days of history ending at end_date
+        n_themes: Number of themes
+        min_members / max_members: Theme size range (log-uniform)
+        seed: Random seed (same seed => same market)
+        end_date: Last business day
+
+    Returns:
+        (close_panel, theme_to_tickers): [dates x tickers] closes with NaN gaps,
+        {theme: [tickers]}
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end=end_date, periods=n_days)
+    tickers = [f"T{i:05d}" for i in range(n_tickers)]
+
+    market = rng.normal(0.0003, 0.010, n_days)
+    sectors = rng.normal(0.0, 0.008, (n_days, N_SECTORS))
+
+    beta = rng.uniform(0.5, 1.5, n_tickers)
+    loadings = np.zeros((n_tickers, N_SECTORS))
+    home_sector = rng.integers(0, N_SECTORS, n_tickers)
+    loadings[np.arange(n_tickers), home_sector] = rng.uniform(0.6, 1.4, n_tickers)
+    for extra in range(2):
+        chosen = rng.random(n_tickers) < 0.35
+        idx = np.flatnonzero(chosen)
+        loadings[idx, rng.integers(0, N_SECTORS, len(idx))] += rng.uniform(0.2, 0.6, len(idx))
+    sigma = rng.uniform(0.012, 0.035, n_tickers)
+
+    returns = (np.outer(market, beta) + sectors @ loadings.T
+               + rng.standard_normal((n_days, n_tickers)) * sigma)
+    closes = 1000.0 * np.exp(np.cumsum(returns, axis=0))
+
+    # Late listings: ~10% of tickers start somewhere in the history
+    late = np.flatnonzero(rng.random(n_tickers) < 0.10)
+    for i in late:
+        closes[:rng.integers(1, n_days - 30), i] = np.nan
+
+    # Trading halts: isolated missing days
+    halts = rng.random((n_days, n_tickers)) < 0.002
+    closes[halts] = np.nan
+
+    close_panel = pd.DataFrame(closes, index=dates, columns=tickers)
+    close_panel.index.name = 'Date'
+
+    # Themes: log-uniform sizes, ~70% members from one sector
+    by_sector = [np.flatnonzero(home_sector == k) for k in range(N_SECTORS)]
+    sizes = np.exp(rng.uniform(np.log(min_members), np.log(max_members), n_themes)).astype(int)
+    theme_to_tickers = {}
+    for t, size in enumerate(np.clip(sizes, min_members, min(max_members, n_tickers))):
+        pool = by_sector[rng.integers(0, N_SECTORS)]
+        n_core = min(len(pool), int(round(size * 0.7)))
+        core = rng.choice(pool, n_core, replace=False) if n_core else np.array([], dtype=int)
+        rest = rng.choice(n_tickers, size - n_core, replace=False)
+        members = list(dict.fromkeys(np.concatenate([core, rest]).tolist()))
+        theme_to_tickers[f"테마{t:03d}"] = [tickers[i] for i in members]
+
+    return close_panel, theme_to_tickers
+
+
+def write_price_csvs(close_panel: pd.DataFrame, price_dir: Path) -> int:
+    """
+    Write one CSV per ticker in the PRICE_DATA_DIR layout
+    (unnamed date index column, lowercase open/high/low/close/volume).
+
+    Returns:
+        int: Files written
+    """
+    price_dir = Path(price_dir)
+    price_dir.mkdir(parents=True, exist_ok=True)
+    written = 0
+    for ticker in close_panel.columns:
+        close = close_panel[ticker].dropna()
+        if close.empty:
+            continue
+        df = pd.DataFrame({
+            'open': close.values,
+            'high': close.values * 1.01,
+            'low': close.values * 0.99,
+            'close': close.values,
+            'volume': 1000
+        }, index=close.index.strftime('%Y-%m-%d'))
+        df.to_csv(price_dir / f"{ticker}.csv")
+        written += 1
+    return written
@@ -0,0 +1,17 @@
+"""
+Shared data and spectral-cohesion components for the KRX sector rotation jobs.
+
+Modules:
+- price_store: consolidated date x ticker price panel (replaces per-ticker CSV reads)
+- fiedler: shared vectorized graph-Laplacian Fiedler kernel
+- correlation: NaN-aware universe-wide correlation, sliced per theme
+- theme_windows: per-period theme Fiedler computation, serial or process-pool
+- trading_calendar: sorted trading-day index with week/month/N-day window queries
+- timeseries_store: consolidated (theme_id, date) rolling Fiedler timeseries table and per-stock roles
+- returns_cube: shared memory-mapped float32 close/returns cube
+- spectral_cache: persistent per-window result cache keyed by ticker set, window and data fingerprint
+- knn_graph: market-wide sparse kNN correlation graph, global Fiedler and spectral clusters
+- theme_index: persistent parsed ticker x theme membership index (CSR incidence) of db_final.csv
+- search_index: Hangul-aware (n-gram / jamo / 초성) name search index for the dashboard
+- daily_state: streaming per-theme correlation sums for the daily job (rank-one day updates)
+"""
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Batched Correlation Engine
+
+Computes one universe-wide correlation matrix per window and hands out theme
+sub-matrices by integer index, instead of calling returns_df.corr() once per
+theme (~400 heavily overlapping themes => the same stock pairs correlated
+hundreds of times per window).
+
+The correlation is NaN-aware: with M the validity mask and X0 the centred
+returns with NaN set to 0, every pairwise-complete sum comes from a matrix
+product over the returns panel:
+
+    n_ij   = M^T M           (overlap count)
+    sx_ij  = X0^T M          (sum of x_i over rows where j is valid)
+    sxx_ij = (X0^2)^T M
+    sxy_ij = X0^T X0
+
+which reproduces pandas' pairwise-complete DataFrame.corr() in a few BLAS calls.
+
+pairwise_corr() applies this to one theme's ragged returns frame in place of
+listwise dropna() alignment, with a minimum-overlap rule: tickers with too few
+observations in the window are dropped, and pairs overlapping on too few rows
+get no correlation (no edge). A newly listed or halted name then costs its
+own pairs, not every other stock's rows.
+
+rolling_corr() covers sliding windows: it keeps running sums of x and x x^T,
+adding the rows that enter and subtracting the rows that leave at each step,
+so every emitted window costs O(step * n^2) instead of O(window * n^2).
+rolling_nan_corr() does the same with the four masked sums above.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Iterable, Iterator, List, Tuple
+
+
+def nan_corr(values: np.ndarray, min_periods: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pairwise-complete Pearson correlation of the columns of values.
+
+    Args:
+        values: [n_days x n_stocks] returns, NaN = missing
+        min_periods: Minimum overlapping observations for a pair (else NaN)
+
+    Returns:
+        (corr, counts): [n_stocks x n_stocks] correlation and overlap count matrices
+    """
+    x, m = _centred_masked(values)
+    return _nan_corr_from_sums(m.T @ m, x.T @ m, (x * x).T @ m, x.T @ x, min_periods)
+
+
+def _centred_masked(values: np.ndarray):
+    """(x, m): returns centred by column mean with NaN set to 0, and the validity mask."""
+    values = np.asarray(values, dtype=np.float64)
+    mask = ~np.isnan(values)
+    m = mask.astype(np.float64)
+
+    # Centre by the column mean first: correlation is unchanged, cancellation is not
+    with np.errstate(invalid='ignore', divide='ignore'):
+        col_mean = np.nansum(values, axis=0) / m.sum(axis=0)
+    return np.where(mask, values - col_mean, 0.0), m
+
+
+def _nan_corr_from_sums(counts, sx, sxx, sxy, min_periods: int):
+    """Pairwise-complete correlation and int overlap counts from the masked sums."""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cov = sxy - sx * sx.T / counts
+        var_i = sxx - sx * sx / counts
+        var_j = var_i.T
+        corr = cov / np.sqrt(var_i * var_j)
+
+    corr[(counts < max(min_periods, 2)) | (var_i <= 0) | (var_j <= 0)] = np.nan
+    np.clip(corr, -1.0, 1.0, out=corr)
+    return corr, np.rint(counts).astype(np.int64)
+
+
+def min_overlap_rows(min_overlap: float, n_rows: int) -> int:
+    """Overlap requirement in rows: min_overlap itself, or that fraction of n_rows if < 1."""
+    if min_overlap < 1:
+        return max(int(np.ceil(min_overlap * n_rows)), 2)
+    return max(int(min_overlap), 2)
+
+
+def pairwise_corr(returns_df: pd.DataFrame, min_overlap: float = 2) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Pairwise-complete correlation of a ragged returns frame (NaN = no observation).
+
+    Tickers with fewer than min_overlap observations are dropped; each remaining
+    pair is correlated over the rows both have, and pairs sharing fewer than
+    min_overlap rows are NaN (no edge in threshold_adjacency).
+
+    Args:
+        returns_df: [days x tickers] returns, outer-aligned
+        min_overlap: Minimum observations, in rows (>= 1) or as a fraction of the rows (< 1)
+
+    Returns:
+        (corr, counts): labelled correlation and overlap-count DataFrames over the kept tickers
+    """
+    need = min_overlap_rows(min_overlap, len(returns_df))
+    returns_df = returns_df.loc[:, returns_df.notna().sum().to_numpy() >= need]
+    corr, counts = nan_corr(returns_df.to_numpy(dtype=np.float64), need)
+    columns = returns_df.columns
+    return (pd.DataFrame(corr, index=columns, columns=columns),
+            pd.DataFrame(counts, index=columns, columns=columns))
+
+
+class UniverseCorrelation:
+    """Universe-wide correlation for one window, sliced per theme"""
+
+    def __init__(self, returns_df: pd.DataFrame, min_periods: int = 1):
+        """
+        Args:
+            returns_df: [days x tickers] returns for the window (NaN = missing)
+            min_periods: Minimum overlapping observations for a pair
+        """
+        self.columns = list(returns_df.columns)
+        self.col_index = {t: i for i, t in enumerate(self.columns)}
+        self.corr, self.counts = nan_corr(returns_df.to_numpy(dtype=np.float64), min_periods)
+
+    def members(self, tickers: Iterable[str]) -> List[str]:
+        """Theme tickers present in the universe (order kept, duplicates dropped)."""
+        return [t for t in dict.fromkeys(tickers) if t in self.col_index]
+
+    def indices(self, tickers: Iterable[str]) -> np.ndarray:
+        """Integer column positions for tickers present in the universe."""
+        return np.array([self.col_index[t] for t in self.members(tickers)], dtype=np.intp)
+
+    def sub_matrix(self, tickers: Iterable[str]) -> np.ndarray:
+        """Theme correlation sub-matrix (rows/columns in members() order)."""
+        idx = self.indices(tickers)
+        return self.corr[np.ix_(idx, idx)]
+
+    def sub_frame(self, tickers: Iterable[str]) -> pd.DataFrame:
+        """Theme correlation sub-matrix as a labelled DataFrame."""
+        members = self.members(tickers)
+        return pd.DataFrame(self.sub_matrix(members), index=members, columns=members)
+
+
+def _corr_from_sums(s1: np.ndarray, s2: np.ndarray, n_obs: int) -> np.ndarray:
+    """Pearson correlation from running sums (sum x, sum x x^T) over n_obs rows."""
+    mean = s1 / n_obs
+    cov = s2 / n_obs - np.outer(mean, mean)
+    var = np.diag(cov).copy()
+    var[var <= 0] = np.nan
+    std = np.sqrt(var)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        corr = cov / np.outer(std, std)
+    np.clip(corr, -1.0, 1.0, out=corr)
+    return corr
+
+
+def rolling_corr(values: np.ndarray, window: int, step: int = 1,
+                 resync_every: int = 500) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Correlation matrix of every sliding window, updated incrementally.
+
+    Windows start at 0, step, 2*step, ... and cover rows [start, start + window),
+    matching `for i in range(0, T - window + 1, step): values[i:i+window]`.
+
+    Args:
+        values: [T x n] complete returns (no NaN; align/dropna beforehand)
+        window: Rows per window
+        step: Rows between consecutive windows (1 = daily resolution)
+        resync_every: Recompute the sums from scratch after this many row
+            updates to stop floating-point drift accumulating
+
+    Yields:
+        (end_pos, corr): index of the window's last row and its [n x n] correlation
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n_rows = values.shape[0]
+    if n_rows < window:
+        return
+
+    # Centre once so the running sums don't suffer cancellation
+    x = values - values.mean(axis=0)
+
+    def full_sums(start):
+        block = x[start:start + window]
+        return block.sum(axis=0), block.T @ block
+
+    start = 0
+    s1, s2 = full_sums(0)
+    updates = 0
+
+    for target in range(0, n_rows - window + 1, step):
+        shift = target - start
+        if shift >= window or updates + shift > resync_every:
+            s1, s2 = full_sums(target)
+            updates = 0
+        elif shift > 0:
+            leaving = x[start:target]
+            entering = x[start + window:target + window]
+            s1 += entering.sum(axis=0) - leaving.sum(axis=0)
+            s2 += entering.T @ entering - leaving.T @ leaving
+            updates += shift
+        start = target
+
+        yield target + window - 1, _corr_from_sums(s1, s2, window)
+
+
+def rolling_nan_corr(values: np.ndarray, window: int, step: int = 1, min_periods: int = 2,
+                     resync_every: int = 500) -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+    """
+    Pairwise-complete correlation of every sliding window, updated incrementally.
+
+    rolling_corr() for ragged panels: the masked sums of nan_corr() (overlap
+    counts, sum x, sum x^2, sum x y) are all sums over rows, so each step adds
+    the entering rows and subtracts the leaving ones.
+
+    Args:
+        values: [T x n] returns, NaN = missing
+        window: Rows per window
+        step: Rows between consecutive windows
+        min_periods: Minimum overlapping observations for a pair (else NaN)
+        resync_every: Recompute the sums from scratch after this many row updates
+
+    Yields:
+        (end_pos, corr, counts): window's last row, [n x n] correlation and overlap counts
+    """
+    x, m = _centred_masked(values)
+    n_rows = x.shape[0]
+    if n_rows < window:
+        return
+    xx = x * x
+
+    def block_sums(lo, hi):
+        xb, mb = x[lo:hi], m[lo:hi]
+        return [mb.T @ mb, xb.T @ mb, xx[lo:hi].T @ mb, xb.T @ xb]
+
+    start = 0
+    sums = block_sums(0, window)
+    updates = 0
+
+    for target in range(0, n_rows - window + 1, step):
+        shift = target - start
+        if shift >= window or updates + shift > resync_every:
+            sums = block_sums(target, target + window)
+            updates = 0
+        elif shift > 0:
+            entering = block_sums(start + window, target + window)
+            leaving = block_sums(start, target)
+            for total, add, sub in zip(sums, entering, leaving):
+                total += add - sub
+            updates += shift
+        start = target
+
+        corr, counts = _nan_corr_from_sums(*sums, min_periods)
+        yield target + window - 1, corr, counts
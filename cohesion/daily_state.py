@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Streaming Daily Theme Correlation State
+
+The daily abnormal-sector job needs every theme's pairwise-complete
+correlation over the last LOOKBACK_DAYS trading days. Rather than reloading
+prices and correlating the whole universe each morning, the state keeps, per
+theme, the masked sums nan_corr() is built from (see cohesion.correlation):
+
+    n = M^T M,  sx = X^T M,  sxx = (X^2)^T M,  sxy = X^T X
+
+over the window, together with the window's returns (so the oldest day can
+be expired), its closes (so the state can be checked against the price
+data) and each ticker's last valid close (so the next return can be
+formed). advance() applies one trading day as two rank-one updates per
+theme: add the entering row, subtract the leaving one. A day costs
+O(sum of theme size^2), independent of history length and universe size.
+The sums are recomputed from the stored window every RESYNC_DAYS updates to
+stop floating-point drift.
+
+The state is rebuilt from price history (from_close_panel()) on first use,
+when the theme mapping or window length changes, or when too many days were
+missed to catch up from the recent price rows. stale_reason() also asks for
+a rebuild when a close inside the window was added or corrected after it
+was applied (late ingest, revisions), or when a theme ticker appears in the
+price data that the state does not cover (new listings).
+
+Storage is one .npz file (DAILY_STATE_FILE), replaced atomically by save().
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config import DAILY_STATE_FILE
+from cohesion.correlation import _nan_corr_from_sums
+from cohesion.returns_cube import _returns_from_close
+
+STATE_VERSION = 2
+RESYNC_DAYS = 250   # rank-one updates between full recomputations of the sums
+CLOSE_RTOL = 1e-6   # stored vs re-read closes (float32 store vs float64 CSV rounding)
+SUM_NAMES = ('counts', 'sx', 'sxx', 'sxy')
+
+
+def themes_hash(themes: Dict[str, List[str]]) -> str:
+    """Fingerprint of a theme -> tickers mapping (a change forces a rebuild)."""
+    payload = json.dumps(sorted((k, list(v)) for k, v in themes.items()), ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def _block_sums(rows: np.ndarray) -> List[np.ndarray]:
+    """Masked sums [n, sx, sxx, sxy] of a block of return rows (NaN = missing)."""
+    m = (~np.isnan(rows)).astype(np.float64)
+    x = np.where(m > 0, rows, 0.0)
+    return [m.T @ m, x.T @ m, (x * x).T @ m, x.T @ x]
+
+
+def _rank_one(sums: List[np.ndarray], row: np.ndarray, sign: float):
+    """Add (sign=+1) or remove (sign=-1) one return row from the masked sums in place."""
+    m = (~np.isnan(row)).astype(np.float64)
+    x = np.where(m > 0, row, 0.0)
+    sums[0] += sign * np.outer(m, m)
+    sums[1] += sign * np.outer(x, m)
+    sums[2] += sign * np.outer(x * x, m)
+    sums[3] += sign * np.outer(x, x)
+
+
+class DailyThemeState:
+    """Per-theme running correlation sums over a trailing window of trading days"""
+
+    def __init__(self, tickers: List[str], themes: Dict[str, List[str]], window: int,
+                 dates: Iterable, returns: np.ndarray, closes: np.ndarray, last_close: np.ndarray,
+                 sums: Optional[Dict[str, List[np.ndarray]]] = None, updates: int = 0):
+        """
+        Args:
+            tickers: State universe (column order of returns / last_close)
+            themes: Theme -> tickers mapping (tickers outside the universe are ignored)
+            window: Trading days per window
+            dates: Window dates, oldest first (at most window)
+            returns: [len(dates) x n_tickers] returns, NaN = no observation
+            closes: [len(dates) x n_tickers] closes the returns were formed from
+            last_close: [n_tickers] last valid close per ticker (NaN = never traded)
+            sums: Per-theme masked sums (recomputed from returns when None)
+            updates: Rank-one updates applied since the sums were last recomputed
+        """
+        self.tickers = list(tickers)
+        self.ticker_index = {t: i for i, t in enumerate(self.tickers)}
+        self.window = int(window)
+        self.dates = [pd.Timestamp(d) for d in dates]
+        self.returns = np.asarray(returns, dtype=np.float64).reshape(len(self.dates), len(self.tickers))
+        self.closes = np.asarray(closes, dtype=np.float64).reshape(len(self.dates), len(self.tickers))
+        self.last_close = np.asarray(last_close, dtype=np.float64)
+        self.themes_hash = themes_hash(themes)
+        self.updates = updates
+
+        self.members: Dict[str, np.ndarray] = {}
+        for theme, stock_list in themes.items():
+            idx = [self.ticker_index[t] for t in dict.fromkeys(stock_list) if t in self.ticker_index]
+            if len(idx) >= 2:
+                self.members[theme] = np.array(idx, dtype=np.intp)
+
+        self.sums = sums if sums is not None else {}
+        if sums is None:
+            self.resync()
+
+    @classmethod
+    def from_close_panel(cls, close_panel: pd.DataFrame, themes: Dict[str, List[str]],
+                         window: int) -> 'DailyThemeState':
+        """
+        Build the state from a [dates x tickers] close panel (NaN = no row).
+
+        The panel needs window + 1 trading days to fill the window; only
+        tickers that belong to some theme are kept.
+        """
+        in_themes = {t for stock_list in themes.values() for t in stock_list}
+        close_panel = close_panel.loc[:, [t for t in close_panel.columns if t in in_themes]]
+        close = close_panel.to_numpy(dtype=np.float64)
+
+        returns = _returns_from_close(close)[1:][-window:]
+        closes = close[1:][-window:]
+        last_close = close_panel.ffill().iloc[-1].to_numpy(dtype=np.float64) \
+            if len(close_panel) else np.full(close.shape[1], np.nan)
+        dates = close_panel.index[1:][-window:]
+        return cls(list(close_panel.columns), themes, window, dates, returns, closes, last_close)
+
+    @property
+    def last_date(self) -> Optional[pd.Timestamp]:
+        return self.dates[-1] if self.dates else None
+
+    def stale_reason(self, close_panel: pd.DataFrame, themes: Dict[str, List[str]]) -> Optional[str]:
+        """
+        Why the state no longer matches the price data (None if it does).
+
+        Args:
+            close_panel: [dates x tickers] closes covering at least the
+                state's window (extra dates and tickers are ignored, except
+                theme tickers the state does not have)
+            themes: The theme mapping the state was built for
+
+        Returns:
+            str or None: 'new tickers (...)', 'missing dates' or 'revised closes (...)'
+        """
+        known = set(self.ticker_index)
+        in_themes = {t for stock_list in themes.values() for t in stock_list}
+        window_panel = close_panel[close_panel.index.isin(self.dates)]
+        listed = window_panel.columns[window_panel.notna().any().to_numpy()]
+        new = sorted(t for t in listed if t in in_themes and t not in known)
+        if new:
+            return f"new tickers ({', '.join(new[:5])}{' ...' if len(new) > 5 else ''})"
+
+        if not self.dates:
+            return None
+        stored_dates = pd.DatetimeIndex(self.dates)
+        if not stored_dates.isin(window_panel.index).all():
+            return 'missing dates'
+        current = window_panel.reindex(index=stored_dates, columns=self.tickers).to_numpy(dtype=np.float64)
+        same = np.isclose(current, self.closes, rtol=CLOSE_RTOL, atol=0.0, equal_nan=True)
+        if not same.all():
+            rows, cols = np.nonzero(~same)
+            first = stored_dates[rows.min()].strftime('%Y-%m-%d')
+            return f"revised closes ({len(rows)} values in {len(np.unique(cols))} tickers since {first})"
+        return None
+
+    def resync(self):
+        """Recompute every theme's sums from the stored window."""
+        self.sums = {theme: _block_sums(self.returns[:, idx]) for theme, idx in self.members.items()}
+        self.updates = 0
+
+    def advance(self, date, close_row: np.ndarray):
+        """
+        Apply one trading day: add its returns and expire the oldest day once
+        the window is full.
+
+        Args:
+            date: Trading date (must be after last_date)
+            close_row: [n_tickers] closes on that date in tickers order (NaN = no trade)
+        """
+        date = pd.Timestamp(date)
+        if self.dates and date <= self.dates[-1]:
+            raise ValueError(f"{date.date()} is not after the state's last date {self.dates[-1].date()}")
+
+        close_row = np.asarray(close_row, dtype=np.float64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            entering = close_row / self.last_close - 1.0
+        self.last_close = np.where(np.isnan(close_row), self.last_close, close_row)
+
+        leaving = self.returns[0] if len(self.dates) >= self.window else None
+        self.returns = np.vstack([self.returns, entering[None, :]])
+        self.closes = np.vstack([self.closes, close_row[None, :]])
+        self.dates.append(date)
+        if leaving is not None:
+            self.returns = self.returns[1:]
+            self.closes = self.closes[1:]
+            self.dates = self.dates[1:]
+
+        self.updates += 1
+        if self.updates >= RESYNC_DAYS:
+            self.resync()
+            return
+        for theme, idx in self.members.items():
+            sums = self.sums[theme]
+            _rank_one(sums, entering[idx], 1.0)
+            if leaving is not None:
+                _rank_one(sums, leaving[idx], -1.0)
+
+    def theme_corr(self, theme: str, min_returns: int = 2) -> Tuple[List[str], np.ndarray]:
+        """
+        Theme correlation over the current window.
+
+        Tickers with fewer than min_returns observations in the window are
+        dropped; pairs sharing fewer than 2 rows are NaN (as nan_corr()).
+
+        Returns:
+            (tickers, corr): kept theme tickers and their [k x k] correlation
+        """
+        idx = self.members.get(theme)
+        if idx is None:
+            return [], np.empty((0, 0))
+        sums = self.sums[theme]
+        keep = np.flatnonzero(np.rint(np.diag(sums[0])) >= min_returns)
+        sub = [s[np.ix_(keep, keep)] for s in sums]
+        corr, _ = _nan_corr_from_sums(*sub, 2)
+        return [self.tickers[i] for i in idx[keep]], corr
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def theme_closes(self, tickers: List[str]) -> pd.DataFrame:
+        """Closes of the given tickers over the window (dates x tickers)."""
+        idx = [self.ticker_index[t] for t in tickers]
+        return pd.DataFrame(self.closes[:, idx], index=pd.DatetimeIndex(self.dates), columns=list(tickers))
+
+    def save(self, path=DAILY_STATE_FILE):
+        """Write the state to one .npz file (atomic replace)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        theme_names = list(self.members)
+        header = {
+            'version': STATE_VERSION,
+            'window': self.window,
+            'tickers': self.tickers,
+            'dates': [d.strftime('%Y-%m-%d') for d in self.dates],
+            'themes': theme_names,
+            'themes_hash': self.themes_hash,
+            'updates': self.updates,
+        }
+        arrays = {
+            'header': np.array(json.dumps(header, ensure_ascii=False)),
+            'returns': self.returns,
+            'closes': self.closes,
+            'last_close': self.last_close,
+            'member_sizes': np.array([len(self.members[t]) for t in theme_names], dtype=np.int64),
+        }
+        for i, name in enumerate(SUM_NAMES):
+            arrays[name] = np.concatenate([self.sums[t][i].ravel() for t in theme_names]) \
+                if theme_names else np.empty(0)
+
+        tmp = path.with_name(path.name + '.tmp')
+        with open(tmp, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, themes: Dict[str, List[str]], window: int,
+             path=DAILY_STATE_FILE) -> Optional['DailyThemeState']:
+        """
+        Load a saved state, or None if there is none or it was built for a
+        different theme mapping, window or state version.
+        """
+        path = Path(path)
+        if not path.exists():
+            return None
+        with np.load(path) as data:
+            header = json.loads(str(data['header']))
+            if (header.get('version') != STATE_VERSION or header['window'] != window
+                    or header['themes_hash'] != themes_hash(themes)):
+                return None
+
+            sums = {}
+            offsets = np.concatenate([[0], np.cumsum(data['member_sizes'])])
+            flat = [data[name] for name in SUM_NAMES]
+            pos = 0
+            for j, theme in enumerate(header['themes']):
+                k = int(offsets[j + 1] - offsets[j])
+                sums[theme] = [a[pos:pos + k * k].reshape(k, k).copy() for a in flat]
+                pos += k * k
+
+            return cls(header['tickers'], themes, window, header['dates'], data['returns'],
+                       data['closes'], data['last_close'], sums=sums, updates=header['updates'])
@@ -0,0 +1,649 @@
+#!/usr/bin/env python3
+"""
+Shared Fiedler Kernel
+
+Single implementation of the graph-Laplacian cohesion measure used by every job:
+
+    A = 1{|corr| >= threshold} (off-diagonal), or |corr| on those edges if weighted
+    L = D - A
+    fiedler = second smallest eigenvalue of L (algebraic connectivity)
+
+Adjacency and Laplacian are built with vectorized numpy masks (no per-pair .iloc
+loop). Small themes use a dense eigvalsh restricted to the lowest eigenvalues;
+large themes use the sparse ARPACK solver, with a dense fallback if it fails to
+converge. Edges, connectivity and mean correlation come out of the same pass.
+
+Consecutive windows of one theme give nearly identical Laplacians, so large
+themes can be warm-started (FiedlerTracker):
+
+- warm: LOBPCG on the complement of the constant vector (L 1 = 0 always, so
+  deflating it leaves lambda_2 as the smallest eigenvalue), starting from the
+  previous window's Fiedler vector, Jacobi-preconditioned
+- cold / LOBPCG not converged: shift-invert Lanczos around sigma < 0, where
+  L - sigma I is positive definite and one Cholesky factor serves every step
+- dense eigh as the last resort
+
+Every solve reports its method and iteration count (LOBPCG iterations or
+shift-invert linear solves) so the warm-start savings are visible.
+
+compute_fiedler(..., return_features=True) takes the k smallest eigenpairs
+from one decomposition and also returns the eigenvalues, the spectral gap
+(lambda_3 - lambda_2), the sign-normalized Fiedler vector (per-stock
+partition loadings) and degree centrality, so stock-level cohesion roles
+need no second pass. FiedlerTracker warm-starts it too: a block LOBPCG from
+the previous window's k eigenvectors, before shift-invert.
+
+Before any eigen solve the graph's connected components are found
+(scipy.sparse.csgraph): a disconnected graph has Fiedler 0 by definition, so
+it is not solved, and the result records n_components, largest_component
+and disconnect_reason ('too_few_stocks', 'isolated_stocks' or 'split').
+With diagnose=True the largest component is solved on its own
+(component_fiedler).
+
+compute_fiedler_sweep() evaluates several thresholds from one correlation
+matrix: |corr| is sorted once and the graphs are grown edge-run by edge-run
+from the highest threshold down (threshold sensitivity studies).
+"""
+
+import sys
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy.linalg import eigh, eigvalsh, cho_factor, cho_solve, LinAlgError
+from scipy.sparse import csr_matrix, diags, identity, issparse
+from scipy.sparse.csgraph import connected_components
+from scipy.sparse.linalg import (eigsh, lobpcg, factorized, LinearOperator,
+                                 ArpackError, ArpackNoConvergence)
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config import CORRELATION_THRESHOLD
+
+# Themes up to this size are solved densely (LAPACK beats ARPACK 'SM' here)
+DENSE_MAX_NODES = 300
+
+# Algebraic connectivity below this is treated as zero (disconnected graph)
+CONNECTIVITY_TOL = 1e-9
+
+# Iterative solves stop at residual ||L v - lambda v|| <= SOLVER_TOL * ||L||
+SOLVER_TOL = 1e-9
+LOBPCG_MAXITER = 200
+
+# Shift-invert pole, relative to ||L||: just below the spectrum (L is PSD)
+SHIFT_INVERT_SIGMA = -1e-3
+
+# Eigenvalues returned with return_features=True (lambda_1 .. lambda_k)
+SPECTRAL_FEATURE_K = 4
+
+
+def threshold_adjacency(corr, threshold=CORRELATION_THRESHOLD, weighted=False) -> np.ndarray:
+    """
+    Build the adjacency matrix from a correlation matrix.
+
+    Args:
+        corr: [n x n] correlation matrix (DataFrame or ndarray); NaN = no edge
+        threshold: Minimum |correlation| for an edge
+        weighted: Use |correlation| as edge weight instead of 1
+
+    Returns:
+        ndarray: Symmetric [n x n] adjacency with zero diagonal
+    """
+    abs_corr = np.abs(np.asarray(corr, dtype=np.float64))
+    with np.errstate(invalid='ignore'):
+        mask = abs_corr >= threshold
+    np.fill_diagonal(mask, False)
+
+    if weighted:
+        return np.where(mask, abs_corr, 0.0)
+    return mask.astype(np.float64)
+
+
+def _mean_correlation(upper: np.ndarray) -> float:
+    """Mean over correlated pairs (pairs without enough overlap are NaN and skipped)."""
+    finite = upper[np.isfinite(upper)] if np.isnan(upper).any() else upper
+    return float(finite.mean()) if len(finite) > 0 else np.nan
+
+
+def laplacian_from_adjacency(adj: np.ndarray) -> np.ndarray:
+    """Graph Laplacian L = D - A."""
+    laplacian = -adj
+    laplacian[np.diag_indices_from(laplacian)] = adj.sum(axis=1)
+    return laplacian
+
+
+def smallest_laplacian_eigenvalues(laplacian: np.ndarray, k: int = 2) -> np.ndarray:
+    """
+    k smallest eigenvalues of a symmetric Laplacian, sorted ascending.
+
+    Dense LAPACK (subset by index) for n <= DENSE_MAX_NODES, sparse ARPACK above,
+    falling back to dense if ARPACK does not converge.
+    """
+    n = laplacian.shape[0]
+    k = min(k, n)
+    if k == 0:
+        return np.array([])
+
+    if n > DENSE_MAX_NODES and k < n:
+        try:
+            values = eigsh(csr_matrix(laplacian), k=k, which='SM', return_eigenvectors=False)
+            return np.sort(values)
+        except (ArpackNoConvergence, ArpackError):
+            pass
+
+    return eigvalsh(laplacian, subset_by_index=[0, k - 1])
+
+
+def smallest_laplacian_eigenpairs(laplacian, k: int = 2):
+    """
+    k smallest eigenpairs of a symmetric Laplacian (dense ndarray or scipy sparse).
+
+    Dense LAPACK for n <= DENSE_MAX_NODES; shift-invert Lanczos (sigma just
+    below the spectrum) above, falling back to dense if it fails. Sparse
+    input stays sparse through the Lanczos path (sparse LU of L - sigma I).
+
+    Returns:
+        (values, vectors): values ascending, vectors as matching columns
+    """
+    values, vectors, _, _ = _laplacian_eigenpairs(laplacian, k)
+    return values, vectors
+
+
+def _laplacian_eigenpairs(laplacian, k: int, x0=None):
+    """
+    smallest_laplacian_eigenpairs plus (n_iter, solver) of the solve that ran.
+
+    x0 ([n x k] starting vectors, e.g. the previous window's eigenvectors)
+    first tries a block LOBPCG on large graphs.
+    """
+    n = laplacian.shape[0]
+    k = min(k, n)
+    if k == 0:
+        return np.array([]), np.zeros((n, 0)), 0, 'none'
+
+    if n > DENSE_MAX_NODES and x0 is not None and x0.shape == (n, k):
+        result = _lobpcg_eigenpairs(laplacian, x0)
+        if result is not None:
+            return result
+
+    if n > DENSE_MAX_NODES and k < n:
+        sigma = SHIFT_INVERT_SIGMA * _laplacian_scale(laplacian)
+        n_solves = [0]
+        try:
+            solve_shifted = factorized((csr_matrix(laplacian) - sigma * identity(n)).tocsc())
+
+            def solve(b):
+                n_solves[0] += 1
+                return solve_shifted(b)
+
+            values, vectors = eigsh(csr_matrix(laplacian), k=k, sigma=sigma, which='LM',
+                                    OPinv=LinearOperator((n, n), matvec=solve, dtype=np.float64),
+                                    tol=SOLVER_TOL)
+            order = np.argsort(values)
+            return values[order], vectors[:, order], n_solves[0], 'shift-invert'
+        except (ArpackNoConvergence, ArpackError, RuntimeError):
+            pass
+
+    if issparse(laplacian):
+        laplacian = laplacian.toarray()
+    values, vectors = eigh(laplacian, subset_by_index=[0, k - 1])
+    return values, vectors, 0, 'dense'
+
+
+def _oriented(vector: np.ndarray) -> np.ndarray:
+    """Unit vector with its largest-magnitude entry positive (eigenvector sign is arbitrary)."""
+    vector = vector / (np.linalg.norm(vector) or 1.0)
+    if vector[np.argmax(np.abs(vector))] < 0:
+        vector = -vector
+    return vector + 0.0  # no -0.0 loadings
+
+
+def _laplacian_scale(laplacian) -> float:
+    """Gershgorin bound on ||L|| (twice the largest degree), at least 1."""
+    return max(2.0 * float(np.max(laplacian.diagonal())), 1.0)
+
+
+def _residual(laplacian: np.ndarray, value: float, vector: np.ndarray) -> float:
+    return float(np.linalg.norm(laplacian @ vector - value * vector))
+
+
+def _lobpcg_fiedler(laplacian: np.ndarray, v0: np.ndarray):
+    """LOBPCG for lambda_2 from a starting vector; None if it does not converge."""
+    n = laplacian.shape[0]
+    ones = np.full((n, 1), 1.0 / np.sqrt(n))
+    x = v0 - ones[:, 0] * (ones[:, 0] @ v0)
+    norm = np.linalg.norm(x)
+    if not np.isfinite(norm) or norm < 1e-12:
+        return None
+
+    scale = _laplacian_scale(laplacian)
+    degrees = np.diag(laplacian).copy()
+    degrees[degrees <= 0] = 1.0
+
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')  # non-convergence is checked below
+            values, vectors, history = lobpcg(
+                laplacian, (x / norm).reshape(-1, 1), M=diags(1.0 / degrees), Y=ones,
+                tol=SOLVER_TOL * scale, maxiter=LOBPCG_MAXITER, largest=False,
+                retResidualNormsHistory=True
+            )
+    except (LinAlgError, ValueError):
+        return None
+
+    value, vector = float(values[0]), vectors[:, 0]
+    if _residual(laplacian, value, vector) > SOLVER_TOL * scale * 10:
+        return None
+    return value, vector, len(history), 'lobpcg'
+
+
+def _lobpcg_eigenpairs(laplacian, x0: np.ndarray):
+    """Block LOBPCG for the k smallest eigenpairs from [n x k] starting vectors; None if not converged."""
+    x, r = np.linalg.qr(x0)
+    if not np.all(np.isfinite(r)) or np.min(np.abs(np.diag(r))) < 1e-8:
+        return None  # starting block is (nearly) rank deficient
+
+    scale = _laplacian_scale(laplacian)
+    degrees = np.asarray(laplacian.diagonal(), dtype=np.float64).copy()
+    degrees[degrees <= 0] = 1.0
+
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')  # non-convergence is checked below
+            values, vectors, history = lobpcg(
+                laplacian, x, M=diags(1.0 / degrees), tol=SOLVER_TOL * scale,
+                maxiter=LOBPCG_MAXITER, largest=False, retResidualNormsHistory=True
+            )
+    except (LinAlgError, ValueError):
+        return None
+
+    order = np.argsort(values)
+    values, vectors = values[order], vectors[:, order]
+    residuals = np.linalg.norm(laplacian @ vectors - vectors * values, axis=0)
+    if np.max(residuals) > SOLVER_TOL * scale * 10:
+        return None
+    return values, vectors, len(history), 'lobpcg'
+
+
+def _shift_invert_fiedler(laplacian: np.ndarray, v0=None):
+    """Shift-invert Lanczos for the two eigenvalues nearest 0; None on failure."""
+    n = laplacian.shape[0]
+    scale = _laplacian_scale(laplacian)
+    sigma = SHIFT_INVERT_SIGMA * scale
+
+    try:
+        factor = cho_factor(laplacian - sigma * np.eye(n))
+    except LinAlgError:
+        return None
+
+    n_solves = [0]
+
+    def solve(b):
+        n_solves[0] += 1
+        return cho_solve(factor, b)
+
+    if v0 is not None:
+        # Needs weight on both the constant vector and the Fiedler direction
+        v0 = v0 / (np.linalg.norm(v0) or 1.0) + 1.0 / np.sqrt(n)
+
+    try:
+        values, vectors = eigsh(laplacian, k=2, sigma=sigma, which='LM', v0=v0,
+                                OPinv=LinearOperator((n, n), matvec=solve, dtype=np.float64),
+                                tol=SOLVER_TOL)
+    except (ArpackNoConvergence, ArpackError):
+        return None
+
+    order = np.argsort(values)
+    return float(values[order[1]]), vectors[:, order[1]], n_solves[0], 'shift-invert'
+
+
+def fiedler_pair(laplacian: np.ndarray, v0=None):
+    """
+    Fiedler value and vector of a Laplacian.
+
+    Args:
+        laplacian: [n x n] graph Laplacian (n >= 2)
+        v0: Starting guess for the Fiedler vector (e.g. the previous window's)
+
+    Returns:
+        (fiedler, vector, n_iter, method): n_iter is 0 for dense solves
+    """
+    n = laplacian.shape[0]
+    if n > DENSE_MAX_NODES:
+        if v0 is not None:
+            result = _lobpcg_fiedler(laplacian, v0)
+            if result is not None:
+                return result
+        result = _shift_invert_fiedler(laplacian, v0)
+        if result is not None:
+            return result
+
+    values, vectors = eigh(laplacian, subset_by_index=[0, 1])
+    return float(values[1]), vectors[:, 1], 0, 'dense'
+
+
+def compute_fiedler(corr, threshold=CORRELATION_THRESHOLD, weighted=False,
+                    v0=None, return_vector=False, return_features=False,
+                    k=SPECTRAL_FEATURE_K, diagnose=False) -> dict:
+    """
+    Fiedler value and graph statistics for one correlation matrix.
+
+    Connected components are found first; a disconnected graph has Fiedler 0
+    by definition and is never handed to an eigensolver (a repeated zero
+    eigenvalue is where ARPACK 'SM' converges worst).
+
+    Args:
+        corr: [n x n] correlation matrix (DataFrame or ndarray)
+        threshold: Minimum |correlation| for an edge
+        weighted: Weight edges by |correlation| (cohesion analysis) instead of 0/1
+        v0: Starting Fiedler vector for large graphs (switches to fiedler_pair);
+            with return_features an [n x max(k, 2)] block of starting eigenvectors
+        return_vector: Also return the Fiedler vector (None if not solved)
+        return_features: Solve for the k smallest eigenpairs instead and also
+            return eigenvalues, spectral_gap, fiedler_vector and
+            degree_centrality (disconnected graphs get NaN
+            eigenvalues/spectral_gap and no vector)
+        k: Eigenvalues kept with return_features
+        diagnose: Also report component_fiedler, the Fiedler value of the
+            largest component (= fiedler when connected)
+
+    Returns:
+        dict: fiedler, n_stocks, n_edges, mean_correlation, is_connected,
+              n_components, largest_component, disconnect_reason
+              (+ component_fiedler with diagnose)
+              (+ fiedler_vector, n_iter, solver with return_vector)
+              (+ eigenvalues, eigenvectors, spectral_gap, fiedler_vector,
+              degree_centrality, n_iter, solver with return_features)
+    """
+    corr_values = np.asarray(corr, dtype=np.float64)
+    n = corr_values.shape[0]
+
+    upper = corr_values[np.triu_indices(n, k=1)]
+    mean_corr = _mean_correlation(upper)
+
+    adj = threshold_adjacency(corr_values, threshold, weighted)
+    n_edges = int(np.count_nonzero(np.triu(adj, k=1)))
+
+    result = {
+        'fiedler': 0.0,
+        'n_stocks': n,
+        'n_edges': n_edges,
+        'mean_correlation': mean_corr,
+        'is_connected': False
+    }
+    connectivity, labels = _connectivity(adj)
+    result.update(connectivity)
+    if return_vector or return_features:
+        result.update({'fiedler_vector': None, 'n_iter': 0, 'solver': 'none'})
+
+    if return_features:
+        _add_spectral_features(result, adj, k, v0)
+    elif connectivity['disconnect_reason'] is None:
+        laplacian = laplacian_from_adjacency(adj)
+        if return_vector or v0 is not None:
+            value, vector, n_iter, solver = fiedler_pair(laplacian, v0)
+            if return_vector:
+                result.update({'fiedler_vector': vector, 'n_iter': n_iter, 'solver': solver})
+            fiedler = max(value, 0.0)
+        else:
+            eigenvalues = smallest_laplacian_eigenvalues(laplacian, k=2)
+            fiedler = max(float(eigenvalues[1]), 0.0)
+
+        result['fiedler'] = fiedler
+        result['is_connected'] = fiedler > CONNECTIVITY_TOL
+
+    if diagnose:
+        result['component_fiedler'] = (result['fiedler'] if connectivity['disconnect_reason'] is None
+                                       else largest_component_fiedler(adj, labels))
+    return result
+
+
+def graph_components(adj: np.ndarray):
+    """
+    Connected components of the graph of a (dense) adjacency matrix.
+
+    Returns:
+        (labels, sizes): component label of every node, node count per component
+    """
+    if adj.shape[0] == 0:
+        return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int64)
+    _, labels = connected_components(csr_matrix(adj), directed=False)
+    return labels, np.bincount(labels)
+
+
+def _connectivity(adj: np.ndarray):
+    """Component statistics and why the graph is disconnected (None if connected)."""
+    labels, sizes = graph_components(adj)
+    if adj.shape[0] < 2:
+        reason = 'too_few_stocks'
+    elif np.any(sizes == 1):
+        reason = 'isolated_stocks'
+    elif len(sizes) > 1:
+        reason = 'split'
+    else:
+        reason = None
+    stats = {
+        'n_components': int(len(sizes)),
+        'largest_component': int(sizes.max()) if len(sizes) else 0,
+        'disconnect_reason': reason
+    }
+    return stats, labels
+
+
+def largest_component_fiedler(adj: np.ndarray, labels: np.ndarray) -> float:
+    """Fiedler value of the largest connected component (0 if it is a single node)."""
+    members = np.flatnonzero(labels == np.argmax(np.bincount(labels)))
+    if len(members) < 2:
+        return 0.0
+    sub = laplacian_from_adjacency(adj[np.ix_(members, members)])
+    return max(float(smallest_laplacian_eigenvalues(sub, k=2)[1]), 0.0)
+
+
+def _add_spectral_features(result: dict, adj: np.ndarray, k: int, x0=None) -> dict:
+    """
+    Fill compute_fiedler's result from one k-eigenpair decomposition of L.
+
+    Disconnected graphs are not decomposed, as in the scalar path: lambda_2
+    is a repeated 0 and its eigenvector an arbitrary mix of component
+    indicators, so eigenvalues and spectral_gap stay NaN and fiedler_vector
+    None (degree centrality is still reported). x0, the previous window's
+    [n x k] eigenvectors, warm-starts large graphs; the decomposition's
+    eigenvectors are returned for the next window.
+    """
+    n = adj.shape[0]
+    degrees = adj.sum(axis=1)
+    result['eigenvalues'] = np.full(min(k, n), np.nan)
+    result['eigenvectors'] = None
+    result['spectral_gap'] = np.nan
+    result['degree_centrality'] = degrees / (n - 1) if n > 1 else np.zeros(n)
+    if result['disconnect_reason'] is not None:
+        return result
+
+    values, vectors, n_iter, solver = _laplacian_eigenpairs(laplacian_from_adjacency(adj),
+                                                            max(k, 2), x0)
+    values = np.maximum(values, 0.0)
+    result['eigenvalues'] = values[:k]
+    if len(values) >= 3:
+        result['spectral_gap'] = float(values[2] - values[1])
+    result['eigenvectors'] = vectors
+    result['fiedler_vector'] = _oriented(vectors[:, 1])
+    result['n_iter'] = n_iter
+    result['solver'] = solver
+    result['fiedler'] = float(values[1])
+    result['is_connected'] = result['fiedler'] > CONNECTIVITY_TOL
+    return result
+
+
+def compute_fiedler_sweep(corr, thresholds, weighted=False, diagnose=False) -> list:
+    """
+    compute_fiedler for several thresholds from one correlation matrix.
+
+    |corr| over the upper triangle is sorted once; thresholds are visited from
+    the highest down, so each graph is the previous one plus the next run of
+    sorted edges (no re-thresholding of the full matrix). Small graphs are
+    solved exactly as compute_fiedler does; large ones warm-start from the
+    Fiedler vector of the next-higher threshold.
+
+    Args:
+        corr: Symmetric [n x n] correlation matrix (DataFrame or ndarray)
+        thresholds: Edge cutoffs (any order)
+        weighted: Weight edges by |correlation| instead of 0/1
+        diagnose: Also report component_fiedler (see compute_fiedler)
+
+    Returns:
+        list: One compute_fiedler dict per threshold (input order), plus 'threshold'
+    """
+    corr_values = np.asarray(corr, dtype=np.float64)
+    n = corr_values.shape[0]
+
+    rows, cols = np.triu_indices(n, k=1)
+    upper = corr_values[rows, cols]
+    mean_corr = _mean_correlation(upper)
+
+    abs_upper = np.abs(upper)
+    finite = np.isfinite(abs_upper)
+    rows, cols, abs_upper = rows[finite], cols[finite], abs_upper[finite]
+    order = np.argsort(-abs_upper, kind='stable')
+    rows, cols, abs_upper = rows[order], cols[order], abs_upper[order]
+    ascending = abs_upper[::-1]
+
+    adj = np.zeros((n, n))
+    added = 0
+    vector = None
+    results = {}
+
+    for threshold in sorted(set(thresholds), reverse=True):
+        count = len(ascending) - int(np.searchsorted(ascending, threshold, side='left'))
+        r, c = rows[added:count], cols[added:count]
+        if weighted:
+            # Each triangle keeps its own value, as threshold_adjacency does
+            adj[r, c] = abs_upper[added:count]
+            adj[c, r] = np.abs(corr_values[c, r])
+        else:
+            adj[r, c] = 1.0
+            adj[c, r] = 1.0
+        added = count
+
+        result = {
+            'threshold': threshold,
+            'fiedler': 0.0,
+            'n_stocks': n,
+            'n_edges': int(np.count_nonzero(abs_upper[:count])) if weighted else count,
+            'mean_correlation': mean_corr,
+            'is_connected': False
+        }
+        results[threshold] = result
+        connectivity, labels = _connectivity(adj)
+        result.update(connectivity)
+        if connectivity['disconnect_reason'] is not None:
+            if diagnose:
+                result['component_fiedler'] = largest_component_fiedler(adj, labels)
+            continue
+
+        laplacian = laplacian_from_adjacency(adj)
+        if n > DENSE_MAX_NODES:
+            value, vector, _, _ = fiedler_pair(laplacian, vector)
+            fiedler = max(value, 0.0)
+        else:
+            eigenvalues = smallest_laplacian_eigenvalues(laplacian, k=2)
+            fiedler = max(float(eigenvalues[1]), 0.0)
+        result['fiedler'] = fiedler
+        result['is_connected'] = fiedler > CONNECTIVITY_TOL
+        if diagnose:
+            result['component_fiedler'] = fiedler
+
+    return [dict(results[t]) for t in thresholds]
+
+
+def compute_fiedler_from_returns(returns_df: pd.DataFrame, threshold=CORRELATION_THRESHOLD,
+                                 weighted=False) -> dict:
+    """compute_fiedler on the Pearson correlation of a returns DataFrame."""
+    return compute_fiedler(returns_df.corr(), threshold, weighted)
+
+
+class FiedlerTracker:
+    """
+    Warm-starts each theme's eigen solve from its previous window.
+
+    The stored Fiedler vector is keyed by ticker, so it is re-aligned when a
+    theme's membership changes between windows (new tickers start at 0).
+    With features=True every window is a return_features solve, warm-started
+    from the previous window's k eigenvectors (block LOBPCG), and results keep
+    fiedler_vector for stock-level roles.
+    """
+
+    def __init__(self, threshold=CORRELATION_THRESHOLD, weighted=False, features=False,
+                 diagnose=False):
+        self.threshold = threshold
+        self.weighted = weighted
+        self.features = features
+        self.diagnose = diagnose
+        self._vectors = {}
+        self.stats = {'solves': 0, 'warm': 0, 'iterations': 0, 'warm_iterations': 0,
+                      'cold_iterations': 0, 'by_solver': {}}
+
+    def compute(self, key, corr, tickers) -> dict:
+        """
+        compute_fiedler for one window of theme `key`.
+
+        Args:
+            key: Theme identifier
+            corr: [n x n] correlation matrix
+            tickers: Row/column labels of corr
+
+        Returns:
+            dict: compute_fiedler result plus n_iter and solver
+                  (+ spectral features with features=True)
+        """
+        tickers = list(tickers)
+        previous = self._vectors.get(key)
+        v0 = None
+        if previous is not None:
+            v0 = previous.reindex(tickers).fillna(0.0).to_numpy()
+            if not np.any(v0):
+                v0 = None
+
+        result = compute_fiedler(corr, self.threshold, self.weighted, v0=v0, return_vector=True,
+                                 return_features=self.features, diagnose=self.diagnose)
+        if self.features:
+            vector = result['fiedler_vector']
+            block = result.pop('eigenvectors')
+            if block is not None:
+                self._vectors[key] = pd.DataFrame(block, index=tickers)
+        else:
+            vector = result.pop('fiedler_vector')
+            if vector is not None:
+                self._vectors[key] = pd.Series(vector, index=tickers)
+        if vector is not None:
+            stats = self.stats
+            stats['solves'] += 1
+            stats['iterations'] += result['n_iter']
+            stats['by_solver'][result['solver']] = stats['by_solver'].get(result['solver'], 0) + 1
+            if v0 is not None and result['solver'] != 'dense':
+                stats['warm'] += 1
+                stats['warm_iterations'] += result['n_iter']
+            elif result['solver'] != 'dense':
+                stats['cold_iterations'] += result['n_iter']
+        return result
+
+    def merge_stats(self, stats: dict):
+        """Add another tracker's statistics (e.g. from a worker process)."""
+        for key in ('solves', 'warm', 'iterations', 'warm_iterations', 'cold_iterations'):
+            self.stats[key] += stats[key]
+        for solver, count in stats['by_solver'].items():
+            self.stats['by_solver'][solver] = self.stats['by_solver'].get(solver, 0) + count
+
+    def reset(self):
+        """Forget stored vectors (statistics are kept)."""
+        self._vectors.clear()
+
+    def summary(self) -> str:
+        """One-line convergence report."""
+        stats = self.stats
+        iterative = stats['solves'] - stats['by_solver'].get('dense', 0)
+        cold = iterative - stats['warm']
+        warm_avg = stats['warm_iterations'] / stats['warm'] if stats['warm'] else 0.0
+        cold_avg = stats['cold_iterations'] / cold if cold else 0.0
+        solvers = ', '.join(f"{k}={v}" for k, v in sorted(stats['by_solver'].items()))
+        return (f"{stats['solves']} solves ({solvers}); iterative: {stats['warm']} warm "
+                f"avg {warm_avg:.1f} it, {cold} cold avg {cold_avg:.1f} it")
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Market-Wide Sparse kNN Correlation Network
+
+Theme cohesion only ever looks inside Naver theme boundaries. This module
+builds one graph over the whole universe per window: every ticker is linked
+to its k most correlated peers (by |corr|), and the union of those links is
+symmetrized into a sparse adjacency.
+
+The pairwise-complete correlation (as nan_corr() in cohesion.correlation) is
+computed one block of tickers at a time: a [block x n] slab of the masked
+sums gives the block's correlations with everyone, the k strongest per row
+are kept and the slab is discarded. Memory is O(block * n) for the slab and
+O(n * k) for the graph; the dense n x n matrix never exists.
+
+On the graph:
+- global Fiedler value of L = D - A (0 when the graph is disconnected, as
+  compute_fiedler) and the Fiedler value of its largest component, from the
+  shared smallest_laplacian_eigenpairs() on sparse storage
+- spectral clusters of the largest component: the n_clusters smallest
+  eigenvectors of the normalized Laplacian I - D^-1/2 A D^-1/2, rows
+  normalized, then k-means (Ng, Jordan & Weiss); nodes outside the largest
+  component get cluster -1
+- theme_overlap(): how the clusters line up with Naver themes
+"""
+
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+from scipy.cluster.vq import kmeans2
+from scipy.sparse import csr_matrix, diags, identity
+from scipy.sparse.csgraph import connected_components
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from cohesion.correlation import _centred_masked
+from cohesion.fiedler import smallest_laplacian_eigenpairs, _oriented, CONNECTIVITY_TOL
+
+DEFAULT_K = 10
+DEFAULT_CLUSTERS = 20
+KNN_BLOCK = 256        # tickers per correlation slab
+KMEANS_SEED = 0
+
+
+def knn_adjacency(values: np.ndarray, k: int = DEFAULT_K, min_periods: int = 2,
+                  weighted: bool = False, block: int = KNN_BLOCK) -> csr_matrix:
+    """
+    Symmetric kNN correlation graph of the columns of values.
+
+    Args:
+        values: [n_days x n_tickers] returns, NaN = missing
+        k: Neighbours kept per ticker (by |correlation|)
+        min_periods: Minimum overlapping observations for a pair to be a candidate
+        weighted: Use |correlation| as edge weight instead of 1
+        block: Tickers per correlation slab
+
+    Returns:
+        csr_matrix: [n x n] adjacency, an edge wherever either end lists the other
+    """
+    x, m = _centred_masked(values)
+    n = x.shape[1]
+    k = min(k, n - 1)
+    if k < 1:
+        return csr_matrix((n, n))
+    xx = x * x
+
+    rows, cols, weights = [], [], []
+    for lo in range(0, n, block):
+        hi = min(lo + block, n)
+        xb, mb = x[:, lo:hi], m[:, lo:hi]
+
+        # Masked sums of the block against every ticker (see nan_corr)
+        counts = mb.T @ m
+        sx = xb.T @ m
+        sy = mb.T @ x
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cov = xb.T @ x - sx * sy / counts
+            var_i = (xb * xb).T @ m - sx * sx / counts
+            var_j = mb.T @ xx - sy * sy / counts
+            strength = np.abs(cov / np.sqrt(var_i * var_j))
+
+        strength[(counts < max(min_periods, 2)) | (var_i <= 0) | (var_j <= 0)] = np.nan
+        strength[np.arange(hi - lo), np.arange(lo, hi)] = np.nan  # no self-loops
+        strength = np.nan_to_num(np.minimum(strength, 1.0), nan=-1.0)
+
+        top = np.argpartition(-strength, k - 1, axis=1)[:, :k]
+        top_strength = np.take_along_axis(strength, top, axis=1)
+        keep = top_strength > 0
+        rows.append(np.repeat(np.arange(lo, hi), k)[keep.ravel()])
+        cols.append(top[keep])
+        weights.append(top_strength[keep] if weighted else np.ones(int(keep.sum())))
+
+    adj = csr_matrix((np.concatenate(weights), (np.concatenate(rows), np.concatenate(cols))),
+                     shape=(n, n))
+    return adj.maximum(adj.T).tocsr()
+
+
+def sparse_laplacian(adj: csr_matrix) -> csr_matrix:
+    """Graph Laplacian L = D - A in sparse storage."""
+    return (diags(np.asarray(adj.sum(axis=1)).ravel()) - adj).tocsr()
+
+
+def market_spectrum(adj: csr_matrix, n_clusters: int = DEFAULT_CLUSTERS) -> dict:
+    """
+    Global connectivity, Fiedler values and spectral clusters of a sparse graph.
+
+    Returns:
+        dict: n_nodes, n_edges, n_components, largest_component, fiedler
+              (0 if disconnected), component_fiedler (largest component),
+              fiedler_vector (sign-normalized over the largest component, NaN elsewhere),
+              clusters (label per node, -1 outside the largest component),
+              degree (per node)
+    """
+    n = adj.shape[0]
+    degree = np.asarray(adj.sum(axis=1)).ravel()
+    result = {
+        'n_nodes': n,
+        'n_edges': int(adj.nnz // 2),
+        'n_components': 0,
+        'largest_component': 0,
+        'fiedler': 0.0,
+        'component_fiedler': 0.0,
+        'fiedler_vector': np.full(n, np.nan),
+        'clusters': np.full(n, -1, dtype=np.int64),
+        'degree': degree,
+    }
+    if n < 2:
+        return result
+
+    n_components, labels = connected_components(adj, directed=False)
+    sizes = np.bincount(labels)
+    members = np.flatnonzero(labels == np.argmax(sizes))
+    result['n_components'] = int(n_components)
+    result['largest_component'] = int(sizes.max())
+    if len(members) < 2:
+        return result
+
+    sub = adj[members][:, members]
+    values, vectors = smallest_laplacian_eigenpairs(sparse_laplacian(sub), k=2)
+    component_fiedler = max(float(values[1]), 0.0)
+    result['component_fiedler'] = component_fiedler
+    result['fiedler_vector'][members] = _oriented(vectors[:, 1])
+    if n_components == 1:
+        result['fiedler'] = component_fiedler if component_fiedler > CONNECTIVITY_TOL else 0.0
+
+    n_clusters = min(n_clusters, len(members))
+    if n_clusters >= 2:
+        result['clusters'][members] = _spectral_clusters(sub, n_clusters)
+    else:
+        result['clusters'][members] = 0
+    return result
+
+
+def _spectral_clusters(adj: csr_matrix, n_clusters: int) -> np.ndarray:
+    """k-means on the row-normalized smallest eigenvectors of the normalized Laplacian."""
+    d_inv_sqrt = diags(1.0 / np.sqrt(np.asarray(adj.sum(axis=1)).ravel()))
+    normalized = (identity(adj.shape[0]) - d_inv_sqrt @ adj @ d_inv_sqrt).tocsr()
+    _, vectors = smallest_laplacian_eigenpairs(normalized, k=n_clusters)
+
+    embedding = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    _, labels = kmeans2(embedding, n_clusters, minit='++', seed=KMEANS_SEED)
+    return labels
+
+
+def theme_overlap(clusters: pd.Series, themes: Dict[str, List[str]], top_n: int = 3) -> pd.DataFrame:
+    """
+    Overlap of spectral clusters with Naver themes.
+
+    Args:
+        clusters: ticker -> cluster label (-1 = outside the largest component)
+        themes: theme -> tickers mapping (theme_to_tickers.json)
+        top_n: Best-matching themes reported per cluster (by Jaccard index)
+
+    Returns:
+        DataFrame: one row per (cluster, matched theme) with cluster_size, theme_size
+        (tickers in the graph), overlap, jaccard, precision (overlap / cluster size)
+        and recall (overlap / theme size)
+    """
+    clusters = clusters[clusters >= 0]
+    theme_sets = {t: set(s) & set(clusters.index) for t, s in themes.items()}
+    rows = []
+    for label, members in clusters.groupby(clusters).groups.items():
+        members = set(members)
+        scored = []
+        for theme, theme_set in theme_sets.items():
+            overlap = len(members & theme_set)
+            if overlap:
+                jaccard = overlap / len(members | theme_set)
+                scored.append((jaccard, theme, overlap, len(theme_set)))
+        scored.sort(key=lambda s: (-s[0], s[1]))
+        for jaccard, theme, overlap, theme_size in scored[:top_n]:
+            rows.append({
+                'cluster': int(label),
+                'cluster_size': len(members),
+                'theme': theme,
+                'theme_size': theme_size,
+                'overlap': overlap,
+                'jaccard': jaccard,
+                'precision': overlap / len(members),
+                'recall': overlap / theme_size,
+            })
+    return pd.DataFrame(rows, columns=['cluster', 'cluster_size', 'theme', 'theme_size',
+                                       'overlap', 'jaccard', 'precision', 'recall'])
+
+
+def theme_concentration(clusters: pd.Series, themes: Dict[str, List[str]]) -> pd.DataFrame:
+    """
+    Per theme: how concentrated its members are in one spectral cluster.
+
+    Returns:
+        DataFrame: theme, n_stocks (in the graph), dominant_cluster, dominant_share
+        (fraction of members in it), n_clusters spanned
+    """
+    rows = []
+    for theme, tickers in themes.items():
+        labels = clusters.reindex([t for t in dict.fromkeys(tickers) if t in clusters.index])
+        labels = labels[labels >= 0]
+        if len(labels) == 0:
+            continue
+        counts = labels.value_counts()
+        rows.append({
+            'theme': theme,
+            'n_stocks': len(labels),
+            'dominant_cluster': int(counts.index[0]),
+            'dominant_share': counts.iloc[0] / len(labels),
+            'n_clusters': int(len(counts)),
+        })
+    return pd.DataFrame(rows, columns=['theme', 'n_stocks', 'dominant_cluster',
+                                       'dominant_share', 'n_clusters'])
@@ -0,0 +1,618 @@
+#!/usr/bin/env python3
+"""
+Columnar Price Panel Store
+
+Consolidates the ~2,500 per-ticker CSV files under PRICE_DATA_DIR into one
+on-disk date x ticker panel, so jobs stop re-parsing every CSV over the NAS mount.
+
+Layout (PRICE_STORE_DIR), one file set per build ({build} = build id):
+- dates.{build}.npy:  sorted datetime64[ns] row index
+- close.{build}.npy, high.{build}.npy, low.{build}.npy, volume.{build}.npy:
+                      float64 [n_dates x n_tickers], NaN where a ticker has no row
+- index.json:         the current set's file names, column order (file stems =
+                      Korean stock names), name -> KRX code map and build metadata
+
+A rebuild writes a complete new set next to the current one and swaps
+index.json last (one os.replace), so a reader sees either the old store or
+the new one, never a mix. The previous set is kept for readers that opened
+the old index.json; older sets are removed.
+
+Arrays are opened with mmap_mode='r': slicing a date range only touches the
+pages it needs, and every process reading the store shares the OS page cache.
+
+The store is assembled from an incremental ingest (ingest_price_files()):
+every CSV is parsed once by a process pool into schema-normalized arrays
+(datetime64 dates, float32 prices) under PRICE_STORE_DIR/ingest/, and a
+manifest of file size and mtime lets later builds skip unchanged files.
+Files that cannot be parsed are reported by name and reason.
+
+open_price_store() also checks the store against its source directory: when
+a CSV there is newer than the newest CSV the store was built from, the store
+is stale and None is returned, so callers read the CSVs until
+Jobs/build_price_store.py runs again (the daily and weekly runners call it
+first).
+
+When the store has not been built, daily jobs that only need recent history
+use read_price_tails(), which seeks from the end of each CSV and parses just
+the last N rows.
+
+Usage:
+    store = open_price_store()
+    if store is not None:
+        close = store.panel('close', tickers=['삼성전자', 'SK하이닉스'], start='2025-01-01')
+"""
+
+import io
+import json
+import multiprocessing as mp
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config import PRICE_DATA_DIR, PRICE_STORE_DIR, DB_FILE
+
+try:
+    import pyarrow  # noqa: F401  (multithreaded CSV parser for pandas)
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+PANEL_FIELDS = ('close', 'high', 'low', 'volume')
+PRICE_FIELDS = ('close', 'high', 'low')   # ingested as float32 (KRW ticks are exact)
+INDEX_FILE = 'index.json'
+DATES_FILE = 'dates.npy'
+INGEST_DIR = 'ingest'
+INGEST_MANIFEST = 'manifest.json'
+TAIL_BLOCK_SIZE = 8192     # bytes per backward read (~100 price rows)
+PRICE_READ_WORKERS = 8     # concurrent CSV reads over the NAS mount
+INGEST_WORKERS = min(8, os.cpu_count() or 1)
+CSV_ENGINE = 'pyarrow' if HAS_PYARROW else 'c'
+FRESHNESS_CHECK_SECONDS = 60  # re-stat the source CSVs at most this often per process
+
+_store_cache = {}
+_freshness_cache = {}
+
+
+def _date_column(columns) -> Optional[str]:
+    """Date column of a raw price CSV ('Date', 'date' or the unnamed index)."""
+    date_col = next((c for c in columns if c.lower() == 'date'), None)
+    if date_col is None:
+        # The unnamed index column: 'Unnamed: 0' (C engine) or '' (pyarrow)
+        date_col = next((c for c in columns if c == '' or c == 'Unnamed: 0'), None)
+    return date_col
+
+
+def _normalize_price_frame(df: pd.DataFrame) -> Optional[pd.DataFrame]:
+    """Date-indexed, lowercase PANEL_FIELDS frame (see read_price_csv)."""
+    date_col = _date_column(df.columns)
+    if date_col is None:
+        return None
+
+    rename = {c: c.lower() for c in df.columns if c.lower() in PANEL_FIELDS}
+    if 'close' not in rename.values():
+        return None
+
+    df = df.rename(columns=rename)
+    df[date_col] = pd.to_datetime(df[date_col])
+    df = df.set_index(date_col)
+    df.index.name = 'Date'
+
+    fields = [f for f in PANEL_FIELDS if f in df.columns]
+    df = df[fields].apply(pd.to_numeric, errors='coerce')
+    df = df[~df.index.duplicated(keep='last')]
+    return df.sort_index()
+
+
+def read_price_csv(csv_file) -> Optional[pd.DataFrame]:
+    """
+    Read one raw price CSV and normalize its schema.
+
+    Handles the date column variants seen under PRICE_DATA_DIR ('Unnamed: 0',
+    'Date', 'date') and case-insensitive OHLCV column names.
+
+    Returns:
+        DataFrame indexed by 'Date' with the available PANEL_FIELDS columns
+        (lowercase), sorted by date, or None if the file has no date/close column.
+    """
+    return _normalize_price_frame(pd.read_csv(csv_file, engine=CSV_ENGINE))
+
+
+def _tail_lines(f, n_rows: int, block_size: int = TAIL_BLOCK_SIZE):
+    """
+    Last n_rows non-empty lines of a binary file, read backwards in blocks.
+
+    Returns:
+        (lines, reached_start): reached_start is True when the whole file was
+        read, in which case lines still include the header line.
+    """
+    f.seek(0, os.SEEK_END)
+    pos = f.tell()
+    data = b''
+    # n_rows + 1 newlines guarantee n_rows complete lines after the cut
+    while pos > 0 and data.count(b'\n') <= n_rows:
+        step = min(block_size, pos)
+        pos -= step
+        f.seek(pos)
+        data = f.read(step) + data
+
+    lines = data.splitlines()
+    if pos > 0:
+        lines = lines[1:]  # partial line at the cut
+    lines = [line for line in lines if line.strip()]
+    return lines, pos == 0
+
+
+def read_price_csv_tail(csv_file, n_rows: int) -> Optional[pd.DataFrame]:
+    """
+    Read only the last n_rows rows of a price CSV (same schema as read_price_csv).
+
+    Seeks from the end of the file instead of parsing the full history, so the
+    cost no longer grows with how long a ticker has been listed. The header is
+    read separately from the first line. Price files are appended in date
+    order; if the tail turns out not to be (hand-edited file), the whole file
+    is read instead and its last n_rows dates are returned.
+    """
+    with open(csv_file, 'rb') as f:
+        header = f.readline()
+        lines, reached_start = _tail_lines(f, n_rows)
+
+    if reached_start:
+        lines = lines[1:]  # header
+    if not header.strip():
+        return None
+
+    raw = pd.read_csv(io.BytesIO(header.rstrip(b'\r\n') + b'\n' + b'\n'.join(lines[-n_rows:])))
+    date_col = _date_column(raw.columns)
+    if date_col is None:
+        return None
+    raw[date_col] = pd.to_datetime(raw[date_col])
+    if raw[date_col].is_monotonic_increasing:
+        df = _normalize_price_frame(raw)
+    else:
+        df = read_price_csv(csv_file)
+    return df.tail(n_rows) if df is not None else None
+
+
+def read_price_tails(csv_files, n_rows: int, max_workers: int = PRICE_READ_WORKERS) -> Dict[str, pd.DataFrame]:
+    """
+    Tail-read many price CSVs concurrently.
+
+    Reads are I/O bound on the NAS mount, so a bounded thread pool overlaps
+    their latency. Unreadable files and files without a date/close column
+    are skipped.
+
+    Returns:
+        dict: {file stem: DataFrame} in csv_files order
+    """
+    csv_files = [Path(f) for f in csv_files]
+
+    def read(csv_file):
+        try:
+            return read_price_csv_tail(csv_file, n_rows)
+        except Exception:
+            return None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        frames = list(executor.map(read, csv_files))
+    return {f.stem: df for f, df in zip(csv_files, frames) if df is not None and len(df) > 0}
+
+
+def _load_name_to_code() -> Dict[str, str]:
+    """Map Korean stock names to 6-digit KRX codes from db_final.csv (if available)."""
+    if not DB_FILE.exists():
+        return {}
+    try:
+        db_df = pd.read_csv(DB_FILE, usecols=['tickers', 'name'])
+    except Exception:
+        return {}
+    db_df = db_df.dropna()
+    codes = db_df['tickers'].astype(str).str.split('.').str[0].str.zfill(6)
+    return dict(zip(db_df['name'].astype(str), codes))
+
+
+def _atomic_save(path: Path, array: np.ndarray):
+    """Write a .npy file via a temp file so readers never see a partial array."""
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+
+def _read_index(store_dir: Path) -> Optional[dict]:
+    """A store's index.json (None if it has not been built)."""
+    index_file = Path(store_dir) / INDEX_FILE
+    if not index_file.exists():
+        return None
+    with open(index_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _store_files(index: dict) -> Dict[str, str]:
+    """{'dates' / field: file name} of the set an index points at (unversioned before 'files')."""
+    return index.get('files') or {'dates': DATES_FILE, **{f: f"{f}.npy" for f in PANEL_FIELDS}}
+
+
+def _ingest_file(job) -> dict:
+    """
+    Parse one CSV into an ingest .npz (dates + PANEL_FIELDS arrays).
+
+    Runs in a pool worker; returns the file's manifest entry, with 'error'
+    set (and no arrays written) when the file cannot be parsed.
+    """
+    csv_file, out_file, start_date = job
+    stat = os.stat(csv_file)
+    entry = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'rows': 0, 'error': None}
+    try:
+        df = read_price_csv(csv_file)
+        if df is None:
+            entry['error'] = 'no date/close column'
+            return entry
+        if start_date is not None:
+            df = df[df.index >= pd.Timestamp(start_date)]
+
+        arrays = {'dates': df.index.values.astype('datetime64[ns]')}
+        for field in PANEL_FIELDS:
+            if field in df.columns:
+                dtype = np.float32 if field in PRICE_FIELDS else np.float64
+                arrays[field] = df[field].to_numpy(dtype=dtype)
+        tmp_file = out_file.with_name(out_file.name + '.tmp')
+        with open(tmp_file, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_file, out_file)
+        entry['rows'] = int(len(df))
+    except Exception as e:
+        entry['error'] = f"{type(e).__name__}: {e}"
+    return entry
+
+
+def ingest_price_files(price_dir=PRICE_DATA_DIR, store_dir=PRICE_STORE_DIR, start_date=None,
+                       workers: int = INGEST_WORKERS, full: bool = False, verbose=True) -> dict:
+    """
+    Bring the per-file ingest arrays under store_dir/ingest in line with price_dir.
+
+    Files whose size and mtime match the manifest are skipped; new or changed
+    files are parsed by a process pool (CSV_ENGINE), arrays of deleted files
+    are removed. Failed files keep a manifest entry with the error and are
+    retried on the next run.
+
+    Args:
+        price_dir: Directory of per-ticker CSV files
+        store_dir: Store directory (arrays go to store_dir/ingest)
+        start_date: Drop rows before this date (a change re-ingests every file)
+        workers: Parser processes (1 = parse in this process)
+        full: Ignore the manifest and re-parse every file
+        verbose: Print progress and failures
+
+    Returns:
+        dict: {'files': {stem: manifest entry}, 'parsed', 'skipped', 'removed',
+               'failed': {file name: reason}}
+    """
+    price_dir = Path(price_dir)
+    ingest_dir = Path(store_dir) / INGEST_DIR
+    ingest_dir.mkdir(parents=True, exist_ok=True)
+    manifest_file = ingest_dir / INGEST_MANIFEST
+    start_key = str(pd.Timestamp(start_date).date()) if start_date is not None else None
+
+    manifest = {}
+    if manifest_file.exists() and not full:
+        with open(manifest_file, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('start_date') != start_key:
+            manifest = {}
+    previous = manifest.get('files', {})
+
+    files = {}
+    jobs = []
+    skipped = 0
+    for csv_file in sorted(price_dir.glob('*.csv')):
+        stem = csv_file.stem
+        stat = csv_file.stat()
+        entry = previous.get(stem)
+        out_file = ingest_dir / f"{stem}.npz"
+        if (entry is not None and entry['error'] is None and out_file.exists()
+                and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns):
+            files[stem] = entry
+            skipped += 1
+        else:
+            jobs.append((csv_file, out_file, start_key))
+
+    if verbose:
+        print(f"Ingesting {len(jobs)} new/changed of {len(jobs) + skipped} files in {price_dir} "
+              f"({skipped} unchanged, {CSV_ENGINE} parser, {max(1, min(workers, len(jobs)))} workers)")
+
+    pool = None
+    if workers > 1 and len(jobs) > 1:
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context('fork'))
+    entries = pool.map(_ingest_file, jobs, chunksize=16) if pool else map(_ingest_file, jobs)
+    try:
+        for i, ((csv_file, out_file, _), entry) in enumerate(zip(jobs, entries), 1):
+            files[csv_file.stem] = entry
+            if entry['error'] is not None and out_file.exists():
+                out_file.unlink()  # stale arrays of a file that no longer parses
+            if verbose and i % 500 == 0:
+                print(f"  Parsed {i}/{len(jobs)} files...")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    removed = 0
+    for out_file in ingest_dir.glob('*.npz'):
+        if out_file.stem not in files:
+            out_file.unlink()
+            removed += 1
+
+    tmp_manifest = ingest_dir / (INGEST_MANIFEST + '.tmp')
+    with open(tmp_manifest, 'w', encoding='utf-8') as f:
+        json.dump({'start_date': start_key, 'source_dir': str(price_dir), 'files': files},
+                  f, ensure_ascii=False)
+    os.replace(tmp_manifest, manifest_file)
+
+    failed = {f"{stem}.csv": e['error'] for stem, e in files.items() if e['error'] is not None}
+    if verbose and failed:
+        print(f"  {len(failed)} files failed to parse:")
+        for name, reason in list(failed.items())[:20]:
+            print(f"    {name}: {reason}")
+        if len(failed) > 20:
+            print(f"    ... {len(failed) - 20} more (see {manifest_file})")
+    return {'files': files, 'parsed': len(jobs), 'skipped': skipped, 'removed': removed,
+            'failed': failed}
+
+
+def build_price_store(price_dir=PRICE_DATA_DIR, store_dir=PRICE_STORE_DIR,
+                      start_date=None, workers: int = INGEST_WORKERS, full: bool = False,
+                      verbose=True) -> dict:
+    """
+    Build the consolidated price panel from every CSV under price_dir.
+
+    Runs ingest_price_files() first (only new or changed CSVs are parsed),
+    then assembles the panel from the ingest arrays.
+
+    Args:
+        price_dir: Directory of per-ticker CSV files
+        store_dir: Output directory for the panel store
+        start_date: Drop rows before this date (None = keep full history)
+        workers: Parser processes for the ingest
+        full: Re-parse every CSV regardless of the ingest manifest
+        verbose: Print progress
+
+    Returns:
+        dict: Build summary (n_tickers, n_dates, first_date, last_date,
+              parsed, skipped, failed = {file name: reason})
+    """
+    price_dir = Path(price_dir)
+    store_dir = Path(store_dir)
+    store_dir.mkdir(parents=True, exist_ok=True)
+
+    ingest = ingest_price_files(price_dir, store_dir, start_date, workers, full, verbose)
+    ingest_dir = store_dir / INGEST_DIR
+
+    frames = {}
+    for stem, entry in ingest['files'].items():
+        if entry['error'] is None and entry['rows'] > 0:
+            with np.load(ingest_dir / f"{stem}.npz") as data:
+                frames[stem] = {k: data[k] for k in data.files}
+
+    tickers = sorted(frames)
+    if tickers:
+        dates = np.unique(np.concatenate([frames[t]['dates'] for t in tickers]))
+    else:
+        dates = np.array([], dtype='datetime64[ns]')
+    dates = dates.astype('datetime64[ns]')
+
+    # New file set alongside the current one; nothing reads it until index.json points at it
+    previous = _read_index(store_dir)
+    build_id = datetime.now().strftime('%Y%m%d%H%M%S%f')
+    files = {name: f"{name}.{build_id}.npy" for name in ('dates',) + PANEL_FIELDS}
+    for field in PANEL_FIELDS:
+        panel = np.full((len(dates), len(tickers)), np.nan, dtype=np.float64)
+        for col, ticker in enumerate(tickers):
+            arrays = frames[ticker]
+            if field not in arrays:
+                continue
+            rows = np.searchsorted(dates, arrays['dates'])
+            panel[rows, col] = arrays[field]
+        _atomic_save(store_dir / files[field], panel)
+
+    _atomic_save(store_dir / files['dates'], dates)
+
+    name_to_code = _load_name_to_code()
+    index = {
+        'files': files,
+        'tickers': tickers,
+        'codes': {t: name_to_code[t] for t in tickers if t in name_to_code},
+        'fields': list(PANEL_FIELDS),
+        'n_dates': int(len(dates)),
+        'first_date': str(pd.Timestamp(dates[0]).date()) if len(dates) else None,
+        'last_date': str(pd.Timestamp(dates[-1]).date()) if len(dates) else None,
+        'source_dir': str(price_dir),
+        'source_mtime_ns': max((e['mtime_ns'] for e in ingest['files'].values()), default=None),
+        'built_at': datetime.now().isoformat(timespec='seconds'),
+    }
+    tmp_index = store_dir / (INDEX_FILE + '.tmp')
+    with open(tmp_index, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_index, store_dir / INDEX_FILE)
+
+    # Keep the previous set for readers still on the old index; drop older ones
+    keep = set(files.values()) | (set(_store_files(previous).values()) if previous else set())
+    for path in store_dir.glob('*.npy'):
+        if path.name not in keep:
+            path.unlink()
+
+    _store_cache.pop(str(store_dir), None)
+
+    summary = {
+        'n_tickers': len(tickers),
+        'n_dates': int(len(dates)),
+        'first_date': index['first_date'],
+        'last_date': index['last_date'],
+        'parsed': ingest['parsed'],
+        'skipped': ingest['skipped'],
+        'failed': ingest['failed'],
+    }
+    if verbose:
+        print(f"  Stored {len(tickers)} tickers x {len(dates)} dates "
+              f"({index['first_date']} to {index['last_date']})")
+    return summary
+
+
+class PriceStore:
+    """Read-only, memory-mapped view of the consolidated price panel"""
+
+    def __init__(self, store_dir=PRICE_STORE_DIR):
+        self.store_dir = Path(store_dir)
+        with open(self.store_dir / INDEX_FILE, 'r', encoding='utf-8') as f:
+            self.index = json.load(f)
+
+        self.files = _store_files(self.index)
+        self.tickers: List[str] = self.index['tickers']
+        self.codes: Dict[str, str] = self.index.get('codes', {})
+        self.ticker_index = {t: i for i, t in enumerate(self.tickers)}
+        self.dates = pd.DatetimeIndex(np.load(self.store_dir / self.files['dates']), name='Date')
+        self._arrays = {}
+
+    @staticmethod
+    def exists(store_dir=PRICE_STORE_DIR) -> bool:
+        """Check whether a store has been built in store_dir."""
+        return (Path(store_dir) / INDEX_FILE).exists()
+
+    def __contains__(self, ticker) -> bool:
+        return ticker in self.ticker_index
+
+    def array(self, field: str = 'close') -> np.ndarray:
+        """Memory-mapped [n_dates x n_tickers] array for one field."""
+        if field not in self._arrays:
+            self._arrays[field] = np.load(self.store_dir / self.files[field], mmap_mode='r')
+        return self._arrays[field]
+
+    def row_slice(self, start=None, end=None) -> slice:
+        """Row slice covering start <= date <= end."""
+        lo = 0 if start is None else self.dates.searchsorted(pd.Timestamp(start), side='left')
+        hi = len(self.dates) if end is None else self.dates.searchsorted(pd.Timestamp(end), side='right')
+        return slice(lo, hi)
+
+    def columns_for(self, tickers: Optional[Iterable[str]] = None):
+        """Resolve tickers to (present tickers, column indices); unknown tickers are dropped."""
+        if tickers is None:
+            return list(self.tickers), np.arange(len(self.tickers))
+        present = [t for t in tickers if t in self.ticker_index]
+        return present, np.array([self.ticker_index[t] for t in present], dtype=np.intp)
+
+    def panel(self, field: str = 'close', tickers=None, start=None, end=None) -> pd.DataFrame:
+        """
+        Date-sliced panel for one field.
+
+        Args:
+            field: One of PANEL_FIELDS
+            tickers: Tickers (file stems) to include (None = all)
+            start: First date (inclusive)
+            end: Last date (inclusive)
+
+        Returns:
+            DataFrame [dates x tickers], NaN where a ticker has no data
+        """
+        rows = self.row_slice(start, end)
+        present, cols = self.columns_for(tickers)
+        values = np.asarray(self.array(field)[rows][:, cols])
+        return pd.DataFrame(values, index=self.dates[rows], columns=present)
+
+    def series(self, ticker: str, field: str = 'close', start=None, end=None) -> Optional[pd.Series]:
+        """Single ticker series with missing dates dropped (None if unknown)."""
+        if ticker not in self.ticker_index:
+            return None
+        rows = self.row_slice(start, end)
+        values = np.asarray(self.array(field)[rows, self.ticker_index[ticker]])
+        return pd.Series(values, index=self.dates[rows], name=field).dropna()
+
+    def frames(self, tickers=None, fields=PANEL_FIELDS, start=None, end=None) -> Dict[str, pd.DataFrame]:
+        """
+        Per-ticker DataFrames in the {ticker: DataFrame} shape the legacy loaders return.
+
+        Rows where the ticker has no close price are dropped, matching a CSV read.
+        """
+        panels = {field: self.panel(field, tickers, start, end) for field in fields}
+        first = panels[fields[0]]
+        close = panels['close'] if 'close' in panels else self.panel('close', tickers, start, end)
+
+        result = {}
+        for ticker in first.columns:
+            mask = close[ticker].notna().to_numpy()
+            if not mask.any():
+                continue
+            result[ticker] = pd.DataFrame(
+                {field: panels[field][ticker].to_numpy()[mask] for field in fields},
+                index=first.index[mask]
+            )
+        return result
+
+    def code_for(self, ticker: str) -> Optional[str]:
+        """KRX code for a stock name, if known."""
+        return self.codes.get(ticker)
+
+
+def _newest_source_mtime_ns(price_dir: Path) -> Optional[int]:
+    """Newest mtime among the CSVs in price_dir (None if it cannot be listed)."""
+    try:
+        with os.scandir(price_dir) as entries:
+            return max((e.stat().st_mtime_ns for e in entries if e.name.endswith('.csv')),
+                       default=None)
+    except OSError:
+        return None
+
+
+def store_is_stale(store: PriceStore, price_dir=None) -> bool:
+    """
+    True when a CSV in the store's source directory (or price_dir) changed
+    after the store was built. Stores built before 'source_mtime_ns' was
+    recorded are compared by their build time.
+    """
+    price_dir = Path(price_dir or store.index.get('source_dir') or PRICE_DATA_DIR)
+    newest = _newest_source_mtime_ns(price_dir)
+    if newest is None:
+        return False  # source not reachable here (e.g. a deployment with the store only)
+    built = store.index.get('source_mtime_ns')
+    if built is None:
+        built = int(datetime.fromisoformat(store.index['built_at']).timestamp() * 1e9)
+    return newest > built
+
+
+def open_price_store(store_dir=PRICE_STORE_DIR, check_fresh: bool = True) -> Optional[PriceStore]:
+    """
+    Open (and cache per process) the price store, or None if it hasn't been
+    built or (check_fresh) is older than the CSVs it was built from.
+
+    Callers fall back to reading CSVs from PRICE_DATA_DIR when this returns None.
+    """
+    index_file = Path(store_dir) / INDEX_FILE
+    if not index_file.exists():
+        return None
+
+    # Reopen when the store was rebuilt under a long-running process (dashboard)
+    key = str(store_dir)
+    mtime = index_file.stat().st_mtime
+    cached = _store_cache.get(key)
+    if cached is None or cached[0] != mtime:
+        _store_cache[key] = (mtime, PriceStore(store_dir))
+    store = _store_cache[key][1]
+    if not check_fresh:
+        return store
+
+    now = time.monotonic()
+    checked = _freshness_cache.get(key)
+    if checked is None or checked[0] != mtime or now - checked[1] > FRESHNESS_CHECK_SECONDS:
+        stale = store_is_stale(store)
+        if stale and (checked is None or not checked[2] or checked[0] != mtime):
+            print(f"Warning: price store {store_dir} (built {store.index.get('built_at')}) is older "
+                  f"than the CSVs in {store.index.get('source_dir')}; reading CSVs instead "
+                  f"(run Jobs/build_price_store.py)")
+        checked = (mtime, now, stale)
+        _freshness_cache[key] = checked
+    return None if checked[2] else store
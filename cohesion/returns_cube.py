@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Shared float32 Close/Returns Cube
+
+A compact date x ticker cube derived from the price store, for processes
+that only need closes or returns (backtests, rolling cohesion, pool workers,
+API workers). Every process attaches to the same files with mmap_mode='r', so
+the OS keeps one physical copy in the page cache instead of each process
+holding its own dict of object-heavy pandas frames.
+
+Layout (RETURNS_CUBE_DIR):
+- cube.json:    header index (tickers, shape, dtype, date range, source store build)
+- dates.npy:    sorted datetime64[ns] row index
+- close.npy:    float32 [n_dates x n_tickers], NaN where a ticker has no row
+- returns.npy:  float32 [n_dates x n_tickers], simple return vs the ticker's
+                previous valid close (prices.dropna().pct_change()), NaN elsewhere
+
+The cube is rebuilt after the price store (Jobs/build_price_store.py);
+open_returns_cube() returns None when it is missing, was built from an
+older store or the store is stale, and callers fall back to the price store
+(or the CSVs).
+
+Usage:
+    cube = open_returns_cube()
+    if cube is not None:
+        returns = cube.panel('returns', tickers=['삼성전자', 'SK하이닉스'], start='2025-01-01')
+"""
+
+import json
+import os
+import sys
+from collections.abc import Mapping
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config import PRICE_STORE_DIR, RETURNS_CUBE_DIR
+from cohesion.price_store import PriceStore, open_price_store
+
+CUBE_FIELDS = ('close', 'returns')
+HEADER_FILE = 'cube.json'
+DATES_FILE = 'dates.npy'
+BUILD_CHUNK = 256  # tickers converted per pass (bounds float64 scratch memory)
+
+_cube_cache = {}
+
+
+def _returns_from_close(close: np.ndarray) -> np.ndarray:
+    """
+    Per-column simple returns against the previous valid (non-NaN) row.
+
+    Matches prices.dropna().pct_change() placed back on the full date grid:
+    gaps (halts, pre-listing rows) are skipped rather than producing NaN
+    around them.
+    """
+    n_rows = close.shape[0]
+    valid = ~np.isnan(close)
+    row_ids = np.where(valid, np.arange(n_rows)[:, None], -1)
+    last_valid = np.maximum.accumulate(row_ids, axis=0)
+
+    prev = np.full_like(last_valid, -1)
+    prev[1:] = last_valid[:-1]
+    has_prev = valid & (prev >= 0)
+
+    cols = np.broadcast_to(np.arange(close.shape[1]), close.shape)
+    returns = np.full(close.shape, np.nan)
+    returns[has_prev] = close[has_prev] / close[prev[has_prev], cols[has_prev]] - 1.0
+    return returns
+
+
+def build_returns_cube(store: Optional[PriceStore] = None, cube_dir=RETURNS_CUBE_DIR,
+                       verbose=True) -> dict:
+    """
+    Build the float32 close/returns cube from the price store.
+
+    Args:
+        store: Source PriceStore (default: open_price_store())
+        cube_dir: Output directory
+        verbose: Print progress
+
+    Returns:
+        dict: Build summary (n_tickers, n_dates, bytes)
+    """
+    store = store or open_price_store()
+    if store is None:
+        raise FileNotFoundError(f"Price store not found: {PRICE_STORE_DIR}")
+
+    cube_dir = Path(cube_dir)
+    cube_dir.mkdir(parents=True, exist_ok=True)
+    close_src = store.array('close')
+    shape = close_src.shape
+
+    tmp_files = {field: cube_dir / f"{field}.npy.tmp" for field in CUBE_FIELDS}
+    outputs = {
+        field: np.lib.format.open_memmap(tmp_files[field], mode='w+', dtype=np.float32, shape=shape)
+        for field in CUBE_FIELDS
+    }
+    for lo in range(0, shape[1], BUILD_CHUNK):
+        hi = min(lo + BUILD_CHUNK, shape[1])
+        close = np.asarray(close_src[:, lo:hi], dtype=np.float64)
+        outputs['close'][:, lo:hi] = close
+        outputs['returns'][:, lo:hi] = _returns_from_close(close)
+
+    for field in CUBE_FIELDS:
+        outputs[field].flush()
+        del outputs[field]
+        os.replace(tmp_files[field], cube_dir / f"{field}.npy")
+
+    tmp_dates = cube_dir / (DATES_FILE + '.tmp')
+    with open(tmp_dates, 'wb') as f:
+        np.save(f, store.dates.values.astype('datetime64[ns]'))
+    os.replace(tmp_dates, cube_dir / DATES_FILE)
+
+    header = {
+        'tickers': list(store.tickers),
+        'fields': list(CUBE_FIELDS),
+        'dtype': 'float32',
+        'shape': [int(shape[0]), int(shape[1])],
+        'first_date': store.index.get('first_date'),
+        'last_date': store.index.get('last_date'),
+        'source_built_at': store.index.get('built_at'),
+        'built_at': datetime.now().isoformat(timespec='seconds'),
+    }
+    tmp_header = cube_dir / (HEADER_FILE + '.tmp')
+    with open(tmp_header, 'w', encoding='utf-8') as f:
+        json.dump(header, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_header, cube_dir / HEADER_FILE)
+
+    _cube_cache.pop(str(cube_dir), None)
+
+    n_bytes = int(np.prod(shape)) * 4 * len(CUBE_FIELDS)
+    if verbose:
+        print(f"  Cube: {shape[1]} tickers x {shape[0]} dates, "
+              f"{n_bytes / 1e6:.0f} MB float32 ({cube_dir})")
+    return {'n_tickers': int(shape[1]), 'n_dates': int(shape[0]), 'bytes': n_bytes}
+
+
+class ReturnsCube:
+    """Read-only, memory-mapped float32 close/returns cube"""
+
+    def __init__(self, cube_dir=RETURNS_CUBE_DIR):
+        self.cube_dir = Path(cube_dir)
+        with open(self.cube_dir / HEADER_FILE, 'r', encoding='utf-8') as f:
+            self.header = json.load(f)
+
+        self.tickers: List[str] = self.header['tickers']
+        self.ticker_index = {t: i for i, t in enumerate(self.tickers)}
+        self.dates = pd.DatetimeIndex(np.load(self.cube_dir / DATES_FILE), name='Date')
+        self._arrays = {field: np.load(self.cube_dir / f"{field}.npy", mmap_mode='r')
+                        for field in CUBE_FIELDS}
+
+    @staticmethod
+    def exists(cube_dir=RETURNS_CUBE_DIR) -> bool:
+        return (Path(cube_dir) / HEADER_FILE).exists()
+
+    def __contains__(self, ticker) -> bool:
+        return ticker in self.ticker_index
+
+    def array(self, field: str = 'returns') -> np.ndarray:
+        """Memory-mapped float32 [n_dates x n_tickers] array (zero-copy)."""
+        return self._arrays[field]
+
+    def row_slice(self, start=None, end=None) -> slice:
+        """Row slice covering start <= date <= end."""
+        lo = 0 if start is None else self.dates.searchsorted(pd.Timestamp(start), side='left')
+        hi = len(self.dates) if end is None else self.dates.searchsorted(pd.Timestamp(end), side='right')
+        return slice(lo, hi)
+
+    def columns_for(self, tickers: Optional[Iterable[str]] = None):
+        """Resolve tickers to (present tickers, column indices); unknown tickers are dropped."""
+        if tickers is None:
+            return list(self.tickers), np.arange(len(self.tickers))
+        present = [t for t in tickers if t in self.ticker_index]
+        return present, np.array([self.ticker_index[t] for t in present], dtype=np.intp)
+
+    def panel(self, field: str = 'returns', tickers=None, start=None, end=None) -> pd.DataFrame:
+        """
+        Date-sliced float32 panel.
+
+        With tickers=None the frame wraps the mapped rows without copying;
+        selecting tickers gathers their columns into a (float32) copy.
+        """
+        rows = self.row_slice(start, end)
+        if tickers is None:
+            return pd.DataFrame(self.array(field)[rows], index=self.dates[rows],
+                                columns=self.tickers, copy=False)
+        present, cols = self.columns_for(tickers)
+        return pd.DataFrame(self.array(field)[rows][:, cols], index=self.dates[rows], columns=present)
+
+    def series(self, ticker: str, field: str = 'close', start=None, end=None) -> Optional[pd.Series]:
+        """Single ticker series (float64) with missing dates dropped (None if unknown)."""
+        if ticker not in self.ticker_index:
+            return None
+        rows = self.row_slice(start, end)
+        values = np.asarray(self.array(field)[rows, self.ticker_index[ticker]], dtype=np.float64)
+        return pd.Series(values, index=self.dates[rows], name=field).dropna()
+
+    def counts(self, field: str = 'close', start=None, end=None) -> np.ndarray:
+        """Non-NaN rows per ticker in the window (one pass over the mapped rows)."""
+        rows = self.row_slice(start, end)
+        return np.count_nonzero(~np.isnan(self.array(field)[rows]), axis=0)
+
+    def frames(self, tickers=None, start=None, end=None, field='close', column=None,
+               min_rows=1) -> 'CubeFrames':
+        """Lazy {ticker: prices} mapping over a date window (see CubeFrames)."""
+        return CubeFrames(self, tickers, start, end, field, column, min_rows)
+
+
+class CubeFrames(Mapping):
+    """
+    Read-only {ticker: prices} mapping backed by the cube.
+
+    Drop-in for the {ticker: DataFrame/Series} dicts the loaders used to
+    build eagerly: membership is decided once from non-NaN counts, and each
+    value is materialized (float64, NaN rows dropped) only when accessed.
+    Values are Series, or single-column DataFrames when column is given.
+    """
+
+    def __init__(self, cube: ReturnsCube, tickers=None, start=None, end=None,
+                 field='close', column=None, min_rows=1):
+        self.cube = cube
+        self.start = start
+        self.end = end
+        self.field = field
+        self.column = column
+
+        counts = cube.counts(field, start, end)
+        present, cols = cube.columns_for(tickers)
+        self._tickers = [t for t, c in zip(present, cols) if counts[c] >= min_rows]
+        self._members = set(self._tickers)
+
+    def __getitem__(self, ticker):
+        if ticker not in self._members:
+            raise KeyError(ticker)
+        series = self.cube.series(ticker, self.field, self.start, self.end)
+        if self.column is None:
+            return series
+        return series.to_frame(self.column)
+
+    def __contains__(self, ticker):
+        return ticker in self._members
+
+    def __iter__(self):
+        return iter(self._tickers)
+
+    def __len__(self):
+        return len(self._tickers)
+
+    def trading_dates(self) -> pd.DatetimeIndex:
+        """Dates on which any member has a value (the union of the frames' indexes)."""
+        rows = self.cube.row_slice(self.start, self.end)
+        _, cols = self.cube.columns_for(self._tickers)
+        has_value = ~np.isnan(self.cube.array(self.field)[rows][:, cols])
+        return self.cube.dates[rows][has_value.any(axis=1)]
+
+
+def open_returns_cube(cube_dir=RETURNS_CUBE_DIR, store_dir=PRICE_STORE_DIR) -> Optional[ReturnsCube]:
+    """
+    Open (and cache per process) the cube, or None if it hasn't been built,
+    is older than the price store it was derived from, or that store is stale.
+    """
+    header_file = Path(cube_dir) / HEADER_FILE
+    if not header_file.exists():
+        return None
+
+    key = str(cube_dir)
+    mtime = header_file.stat().st_mtime
+    cached = _cube_cache.get(key)
+    if cached is None or cached[0] != mtime:
+        _cube_cache[key] = (mtime, ReturnsCube(cube_dir))
+    cube = _cube_cache[key][1]
+
+    if PriceStore.exists(store_dir):
+        # None here means the store is stale against its CSVs, and so is the cube
+        store = open_price_store(store_dir)
+        if store is None or store.index.get('built_at') != cube.header.get('source_built_at'):
+            return None
+    return cube
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Hangul-Aware Search Index
+
+In-memory index over a list of names (Naver themes, stock names) for the
+dashboard's as-you-type search. Every entry is kept in three forms:
+
+- compact: lower-cased with spaces and separators removed ("2차전지(소재)" ->
+  "2차전지소재"), plus its words
+- jamo: each Hangul syllable decomposed into basic jamo, compound vowels
+  and finals split ("반도체" -> "ㅂㅏㄴㄷㅗㅊㅔ"), so a syllable still being
+  composed ("반도ㅊ") matches
+- initials: the 초성 of each syllable ("반도체" -> "ㅂㄷㅊ"), so a
+  consonant-only query ("ㅂㄷㅊ") matches; such queries are matched on
+  initials only
+
+Bigram postings over the jamo and initials forms give the candidates of a
+query; only those are scored. Matches are ranked by quality tier, then by a
+caller-supplied score (e.g. current Fiedler value), then by length and
+entry order:
+
+    0 exact            4 substring            8 initials prefix
+    1 prefix           5 all query words      9 initials substring
+    2 whole word       6 jamo prefix         10 an entry word contained
+    3 word prefix      7 jamo substring         in the query
+
+Usage:
+    index = HangulSearchIndex(themes)
+    index.search("ㅂㄷㅊ", limit=20, score=fiedler_by_theme)
+"""
+
+import re
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple, Union
+
+HANGUL_BASE = 0xAC00
+HANGUL_LAST = 0xD7A3
+CHOSEONG = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+JUNGSEONG = ['ㅏ', 'ㅐ', 'ㅑ', 'ㅒ', 'ㅓ', 'ㅔ', 'ㅕ', 'ㅖ', 'ㅗ', 'ㅗㅏ', 'ㅗㅐ', 'ㅗㅣ', 'ㅛ', 'ㅜ',
+             'ㅜㅓ', 'ㅜㅔ', 'ㅜㅣ', 'ㅠ', 'ㅡ', 'ㅡㅣ', 'ㅣ']
+JONGSEONG = ['', 'ㄱ', 'ㄲ', 'ㄱㅅ', 'ㄴ', 'ㄴㅈ', 'ㄴㅎ', 'ㄷ', 'ㄹ', 'ㄹㄱ', 'ㄹㅁ', 'ㄹㅂ', 'ㄹㅅ',
+             'ㄹㅌ', 'ㄹㅍ', 'ㄹㅎ', 'ㅁ', 'ㅂ', 'ㅂㅅ', 'ㅅ', 'ㅆ', 'ㅇ', 'ㅈ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ']
+# Compound compatibility jamo typed as one key (ㅘ, ㄺ, ...) split like the tables above
+COMPOUND_JAMO = {'ㅘ': 'ㅗㅏ', 'ㅙ': 'ㅗㅐ', 'ㅚ': 'ㅗㅣ', 'ㅝ': 'ㅜㅓ', 'ㅞ': 'ㅜㅔ', 'ㅟ': 'ㅜㅣ',
+                 'ㅢ': 'ㅡㅣ', 'ㄳ': 'ㄱㅅ', 'ㄵ': 'ㄴㅈ', 'ㄶ': 'ㄴㅎ', 'ㄺ': 'ㄹㄱ', 'ㄻ': 'ㄹㅁ',
+                 'ㄼ': 'ㄹㅂ', 'ㄽ': 'ㄹㅅ', 'ㄾ': 'ㄹㅌ', 'ㄿ': 'ㄹㅍ', 'ㅀ': 'ㄹㅎ', 'ㅄ': 'ㅂㅅ'}
+CONSONANTS = set(CHOSEONG) | {'ㄳ', 'ㄵ', 'ㄶ', 'ㄺ', 'ㄻ', 'ㄼ', 'ㄽ', 'ㄾ', 'ㄿ', 'ㅀ', 'ㅄ'}
+
+WORD_SPLIT = re.compile(r'[^0-9a-z가-힣ㄱ-ㅣ]+')
+
+SUBSTRING_TIER = 4  # tiers up to here: the entry's compact form contains the query
+
+def _is_syllable(ch: str) -> bool:
+    return HANGUL_BASE <= ord(ch) <= HANGUL_LAST
+
+
+def to_jamo(text: str) -> str:
+    """Decompose Hangul syllables (and compound jamo) into basic jamo; other characters pass through."""
+    out = []
+    for ch in text:
+        if _is_syllable(ch):
+            code = ord(ch) - HANGUL_BASE
+            out.append(CHOSEONG[code // 588])
+            out.append(JUNGSEONG[(code % 588) // 28])
+            out.append(JONGSEONG[code % 28])
+        else:
+            out.append(COMPOUND_JAMO.get(ch, ch))
+    return ''.join(out)
+
+
+def to_initials(text: str) -> str:
+    """초성 of each Hangul syllable; other characters pass through."""
+    return ''.join(CHOSEONG[(ord(ch) - HANGUL_BASE) // 588] if _is_syllable(ch) else ch for ch in text)
+
+
+def _words(text: str) -> List[str]:
+    return [w for w in WORD_SPLIT.split(text.lower()) if w]
+
+
+def _grams(text: str) -> Set[str]:
+    """Bigrams of text (the text itself when shorter)."""
+    if len(text) < 2:
+        return {text} if text else set()
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+class HangulSearchIndex:
+    """n-gram / jamo / 초성 search over a fixed list of entries"""
+
+    def __init__(self, entries: Sequence[str]):
+        self.entries: List[str] = list(dict.fromkeys(str(e) for e in entries))
+        self.words: List[List[str]] = [_words(e) for e in self.entries]
+        self.compact: List[str] = [''.join(w) for w in self.words]
+        self.jamo: List[str] = [to_jamo(c) for c in self.compact]
+        self.initials: List[str] = [to_initials(c) for c in self.compact]
+
+        self._jamo_postings: Dict[str, Set[int]] = {}
+        self._initial_postings: Dict[str, Set[int]] = {}
+        self._word_entries: Dict[str, Set[int]] = {}
+        for i in range(len(self.entries)):
+            for gram in _grams(self.jamo[i]) | set(self.jamo[i]):
+                self._jamo_postings.setdefault(gram, set()).add(i)
+            for gram in _grams(self.initials[i]) | set(self.initials[i]):
+                self._initial_postings.setdefault(gram, set()).add(i)
+            for word in self.words[i]:
+                if len(word) >= 2:
+                    self._word_entries.setdefault(word, set()).add(i)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @staticmethod
+    def _lookup(postings: Dict[str, Set[int]], text: str) -> Set[int]:
+        """Entries containing every bigram of text (superset of those containing text)."""
+        grams = _grams(text)
+        if not grams:
+            return set()
+        sets = sorted((postings.get(g, set()) for g in grams), key=len)
+        found = set(sets[0])
+        for s in sets[1:]:
+            found &= s
+            if not found:
+                break
+        return found
+
+    def _candidates(self, compact: str, words: List[str], jamo: str, initials_query: bool) -> Set[int]:
+        if initials_query:
+            found = self._lookup(self._initial_postings, compact)
+        else:
+            found = self._lookup(self._jamo_postings, jamo)
+            if len(words) > 1:
+                per_word = [self._lookup(self._jamo_postings, to_jamo(w)) for w in words]
+                found |= set.intersection(*per_word)
+        # Entry words the query contains (e.g. "반도체" for "반도체장비주")
+        for start in range(len(compact) - 1):
+            for end in range(start + 2, len(compact) + 1):
+                found |= self._word_entries.get(compact[start:end], set())
+        return found
+
+    def _tier(self, i: int, compact: str, words: List[str], jamo: str, initials_query: bool) -> Optional[int]:
+        entry = self.compact[i]
+        if entry == compact:
+            return 0
+        if entry.startswith(compact):
+            return 1
+        if compact in self.words[i]:
+            return 2
+        if any(w.startswith(compact) for w in self.words[i]):
+            return 3
+        if compact in entry:
+            return 4
+        if len(words) > 1 and all(w in entry for w in words):
+            return 5
+        if initials_query:
+            # Consonant-only queries are 초성; jamo matches would pair a final with the next initial
+            if self.initials[i].startswith(compact):
+                return 8
+            if compact in self.initials[i]:
+                return 9
+        else:
+            if self.jamo[i].startswith(jamo):
+                return 6
+            if jamo in self.jamo[i]:
+                return 7
+        if any(len(w) >= 2 and w in compact for w in self.words[i]):
+            return 10
+        return None
+
+    def search(self, query: str, limit: Optional[int] = None,
+               score: Union[Dict[str, float], Callable[[str], float], None] = None) -> List[Tuple[str, int]]:
+        """
+        Ranked matches of a query.
+
+        Args:
+            query: Search text (words, partial syllables or 초성)
+            limit: Max results (None = all)
+            score: Secondary ranking within a tier, higher first - a dict
+                   (missing entries score 0) or a callable on the entry
+
+        Returns:
+            list: (entry, tier) pairs, best first
+        """
+        words = _words(query)
+        compact = ''.join(words)
+        if not compact:
+            return []
+        jamo = to_jamo(compact)
+        initials_query = any(ch in CONSONANTS for ch in compact) and \
+            all(ch in CONSONANTS or not ('ㄱ' <= ch <= 'ㅣ' or _is_syllable(ch)) for ch in compact)
+
+        if isinstance(score, dict):
+            lookup = score.get
+            score = lambda entry: lookup(entry, 0.0)
+
+        ranked = []
+        for i in self._candidates(compact, words, jamo, initials_query):
+            tier = self._tier(i, compact, words, jamo, initials_query)
+            if tier is not None:
+                secondary = float(score(self.entries[i])) if score is not None else 0.0
+                if secondary != secondary:  # NaN
+                    secondary = 0.0
+                ranked.append((tier, -secondary, len(self.entries[i]), i))
+        ranked.sort()
+        if limit is not None:
+            ranked = ranked[:max(limit, 0)]
+        return [(self.entries[i], tier) for tier, _, _, i in ranked]
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Persistent Spectral Result Cache
+
+Many Naver themes reduce to the same constituent set once missing tickers are
+dropped, and the weekly, monthly, rolling and daily jobs revisit the same
+windows run after run. Results are cached on disk keyed by
+
+    sha1(result version, kind, sorted ticker set, window start, window end,
+         parameters, data fingerprint)
+
+where kind names the correlation method ('window' = per theme,
+'batched' = pairwise universe slice, 'rolling', 'daily'), so a key always
+identifies one deterministic computation on the same price history. The
+data fingerprint (fingerprint()) covers the window's dates, each ticker's
+non-NaN count and its exact values, so closes that land late or are
+corrected in place, and a different price source (float32 store vs float64
+CSV fallback), miss the cache instead of returning a stale result.
+
+Storage is one SQLite file (SPECTRAL_CACHE_FILE) shared by every job and
+every forked pool worker: lookups go to the file, new results are buffered
+and written in one transaction per flush(). The table is bounded by
+max_entries; flush() evicts the least recently used rows beyond it.
+
+Cached values are the scalar fields of a result (fiedler, n_edges, ...),
+never eigenvectors. Entries for superseded data are never hit again and age
+out through eviction.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config import SPECTRAL_CACHE_FILE
+
+# Part of every key: bump when the fields stored for a result change
+RESULT_VERSION = 4
+
+DEFAULT_MAX_ENTRIES = 200_000
+EVICT_TO = 0.9          # after eviction keep this fraction of max_entries
+BUSY_TIMEOUT_S = 30.0   # concurrent writers (pool workers) wait for the lock
+
+STAT_KEYS = ('hits', 'misses', 'stores', 'evicted')
+
+
+def _scalar(value):
+    """JSON-safe scalar (numpy scalars unwrapped), or None for non-scalars."""
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, (float, np.floating)):
+        return float(value)
+    if isinstance(value, str):
+        return value
+    return None
+
+
+def _date_str(value) -> str:
+    return str(value)[:10] if value is not None else ''
+
+
+class SpectralCache:
+    """Size-bounded on-disk cache of per-window spectral results"""
+
+    def __init__(self, path=SPECTRAL_CACHE_FILE, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 enabled: bool = True):
+        """
+        Args:
+            path: SQLite file
+            max_entries: Rows kept after flush() (least recently used are evicted)
+            enabled: False turns every lookup into a miss and stores nothing
+        """
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.stats = {k: 0 for k in STAT_KEYS}
+        self._conn = None
+        self._pid = None
+        self._pending = {}
+        self._touched = set()
+
+    def __getstate__(self):
+        # Connections never cross process boundaries
+        state = dict(self.__dict__)
+        state['_conn'] = None
+        state['_pid'] = None
+        return state
+
+    @staticmethod
+    def fingerprint(data: pd.DataFrame) -> str:
+        """
+        Digest of the data a window is computed from (dates x tickers).
+
+        Covers the dates, each ticker's non-NaN count and the exact values in
+        their dtype; column order does not matter.
+        """
+        data = data.reindex(columns=sorted(data.columns))
+        values = data.to_numpy()
+        missing = pd.isna(values)
+        # Dates in ns whatever their stored unit; NaNs hashed as a mask, not payload bits
+        dates = pd.DatetimeIndex(data.index).values.astype('datetime64[ns]').view(np.int64)
+        digest = hashlib.sha1(str(values.dtype).encode('ascii'))
+        digest.update(dates.tobytes())
+        digest.update((len(values) - missing.sum(axis=0)).astype(np.int64).tobytes())
+        digest.update(np.packbits(missing).tobytes())
+        digest.update(np.ascontiguousarray(np.where(missing, 0, values)).tobytes())
+        return digest.hexdigest()
+
+    @staticmethod
+    def key(kind: str, tickers: Iterable[str], window_start, window_end, params: dict,
+            data: str) -> str:
+        """
+        Cache key for one window.
+
+        Args:
+            kind: Correlation method ('window', 'batched', 'rolling', 'daily')
+            tickers: Valid ticker set (order-insensitive)
+            window_start / window_end: First and last date of the window
+            params: Parameters that change the result (threshold, lookback, ...)
+            data: fingerprint() of the window's closes or returns
+        """
+        payload = json.dumps([
+            RESULT_VERSION,
+            kind,
+            sorted(set(tickers)),
+            _date_str(window_start),
+            _date_str(window_end),
+            sorted((k, _scalar(v)) for k, v in params.items()),
+            data
+        ], ensure_ascii=False)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def _connection(self) -> sqlite3.Connection:
+        # Forked workers must not reuse the parent's connection
+        if self._conn is None or self._pid != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), timeout=BUSY_TIMEOUT_S)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS results_last_used ON results(last_used)"
+            )
+            self._pid = os.getpid()
+        return self._conn
+
+    def get(self, key: str) -> Optional[dict]:
+        """Cached result for key, or None (counted as a hit or a miss)."""
+        if not self.enabled:
+            return None
+        value = self._pending.get(key)
+        if value is None:
+            row = self._connection().execute(
+                "SELECT value FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                value = json.loads(row[0])
+                self._touched.add(key)
+
+        if value is None:
+            self.stats['misses'] += 1
+            return None
+        self.stats['hits'] += 1
+        return dict(value)
+
+    def put(self, key: str, result: dict):
+        """Buffer the scalar fields of a result (written on flush())."""
+        if not self.enabled or result is None:
+            return
+        # None is kept (as JSON null) so optional fields such as disconnect_reason
+        # survive the round trip; only non-scalar values (vectors) are dropped
+        self._pending[key] = {k: _scalar(v) for k, v in result.items()
+                              if v is None or _scalar(v) is not None}
+        self.stats['stores'] += 1
+
+    def flush(self):
+        """Write buffered results, refresh hit timestamps and evict beyond max_entries."""
+        if not self.enabled or (not self._pending and not self._touched):
+            return
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO results (key, value, last_used) VALUES (?, ?, ?)",
+                [(k, json.dumps(v), now) for k, v in self._pending.items()]
+            )
+            conn.executemany(
+                "UPDATE results SET last_used = ? WHERE key = ?",
+                [(now, k) for k in self._touched]
+            )
+            n_rows = conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            if n_rows > self.max_entries:
+                n_evict = n_rows - int(self.max_entries * EVICT_TO)
+                conn.execute(
+                    "DELETE FROM results WHERE key IN ("
+                    "SELECT key FROM results ORDER BY last_used LIMIT ?)", (n_evict,)
+                )
+                self.stats['evicted'] += n_evict
+        self._pending.clear()
+        self._touched.clear()
+
+    def __len__(self):
+        if not self.path.exists():
+            return 0
+        return self._connection().execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def clear(self):
+        """Drop every cached result."""
+        self._pending.clear()
+        self._touched.clear()
+        if self.path.exists():
+            with self._connection() as conn:
+                conn.execute("DELETE FROM results")
+
+    def merge_stats(self, stats: dict):
+        """Add counters reported by another process (pool worker)."""
+        for k in STAT_KEYS:
+            self.stats[k] += stats.get(k, 0)
+
+    def summary(self) -> str:
+        if not self.enabled:
+            return "disabled"
+        lookups = self.stats['hits'] + self.stats['misses']
+        rate = self.stats['hits'] / lookups * 100 if lookups else 0.0
+        return (f"{self.stats['hits']} hits / {self.stats['misses']} misses ({rate:.1f}% hit rate), "
+                f"{self.stats['stores']} stored, {self.stats['evicted']} evicted")
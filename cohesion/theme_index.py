@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Persistent Theme-Membership Index
+
+db_final.csv (and the dashboard's network_theme_data.csv) store each stock's
+Naver themes as a Python list literal in the naverTheme column, which every
+consumer used to re-parse with ast.literal_eval inside iterrows(). The index
+parses a source CSV once and keeps:
+
+- row-aligned tickers and names (row i = row i of pd.read_csv(source))
+- integer theme IDs in first-seen order (the order the parsing loops built
+  their dicts in)
+- a CSR row -> theme incidence: indptr/indices in each row's list order,
+  duplicates kept, so the loops' outputs are reproduced exactly
+- a per-row status: naverTheme missing, unparsable / not a list, or a list
+
+Layout (THEME_INDEX_DIR, next to theme_to_tickers.json), one pair per source
+({stem} = source file stem + hash of its path):
+- {stem}.json: header (source path, size, mtime, sha1, counts)
+- {stem}.npz:  tickers, names, has_name, status, themes, indptr, indices
+
+open_theme_index() reuses the saved index while the source's size and mtime
+are unchanged, re-hashes the source when they are not (touching the file
+alone does not trigger a rebuild), and rebuilds only when the sha1 differs.
+
+Usage:
+    index = open_theme_index()                      # db_final.csv
+    theme_stocks = index.theme_members(index.names)  # {theme: [names]}
+"""
+
+import ast
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config import DB_FILE, THEME_INDEX_DIR
+
+INDEX_VERSION = 1
+HASH_BLOCK_SIZE = 1 << 20
+
+# Per-row naverTheme status
+THEMES_MISSING = 0      # NaN / empty cell
+THEMES_INVALID = 1      # not parseable, or not a list
+THEMES_LIST = 2
+
+_index_cache = {}
+
+
+def _file_sha1(path: Path) -> str:
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _parse_theme_list(value):
+    """(status, themes) for one naverTheme cell."""
+    if not isinstance(value, str):
+        if isinstance(value, list):
+            return THEMES_LIST, value
+        return (THEMES_MISSING, []) if pd.isna(value) else (THEMES_INVALID, [])
+    try:
+        themes = ast.literal_eval(value)
+    except Exception:
+        return THEMES_INVALID, []
+    if not isinstance(themes, list):
+        return THEMES_INVALID, []
+    return THEMES_LIST, themes
+
+
+class ThemeMembershipIndex:
+    """Parsed ticker x theme membership of one source CSV"""
+
+    def __init__(self, header: dict, arrays: dict):
+        self.header = header
+        self.tickers: List = arrays['tickers'].tolist()
+        self.names: List[str] = arrays['names'].tolist()
+        self.has_name: np.ndarray = arrays['has_name']
+        self.status: np.ndarray = arrays['status']
+        self.themes: List[str] = arrays['themes'].tolist()
+        self.indptr: np.ndarray = arrays['indptr']
+        self.indices: np.ndarray = arrays['indices']
+        self.theme_ids = {t: i for i, t in enumerate(self.themes)}
+        self._theme_rows = None
+
+    @property
+    def n_rows(self) -> int:
+        return len(self.tickers)
+
+    @property
+    def n_themes(self) -> int:
+        return len(self.themes)
+
+    def incidence(self):
+        """[n_rows x n_themes] 0/1 scipy CSR incidence matrix (duplicate listings collapsed)."""
+        from scipy.sparse import csr_matrix  # lazy: the dashboard imports this module without scipy
+
+        matrix = csr_matrix((np.ones(len(self.indices)), self.indices, self.indptr),
+                            shape=(self.n_rows, self.n_themes))
+        matrix.sum_duplicates()
+        matrix.data[:] = 1.0
+        return matrix
+
+    def theme_counts(self) -> np.ndarray:
+        """Themes listed per row (0 where naverTheme is missing or not a list)."""
+        return np.diff(self.indptr)
+
+    def row_themes(self, row: int) -> List[str]:
+        """Themes of one row, in list order."""
+        return [self.themes[j] for j in self.indices[self.indptr[row]:self.indptr[row + 1]]]
+
+    def theme_rows(self, theme: str) -> np.ndarray:
+        """Rows listing a theme, in row order, each once (empty if unknown)."""
+        if self._theme_rows is None:
+            order = np.argsort(self.indices, kind='stable')
+            rows = np.repeat(np.arange(self.n_rows), self.theme_counts())[order]
+            bounds = np.searchsorted(self.indices[order], np.arange(self.n_themes + 1))
+            # np.unique: a row listing a theme twice is still one member
+            self._theme_rows = [np.unique(rows[bounds[j]:bounds[j + 1]]) for j in range(self.n_themes)]
+        theme_id = self.theme_ids.get(theme)
+        return self._theme_rows[theme_id] if theme_id is not None else np.array([], dtype=np.int64)
+
+    def _row_mask(self, rows) -> np.ndarray:
+        mask = self.status == THEMES_LIST
+        return mask if rows is None else mask & np.asarray(rows, dtype=bool)
+
+    def theme_members(self, keys: Optional[Sequence] = None, rows=None) -> Dict[str, list]:
+        """
+        {theme: [keys of its rows]} in first-seen theme order and row order.
+
+        Args:
+            keys: Per-row values to collect (default: names)
+            rows: Boolean row mask applied on top of "naverTheme is a list"
+        """
+        keys = self.names if keys is None else keys
+        mask = self._row_mask(rows)
+        members = {}
+        for row in np.flatnonzero(mask):
+            key = keys[row]
+            for j in self.indices[self.indptr[row]:self.indptr[row + 1]]:
+                members.setdefault(self.themes[j], []).append(key)
+        return members
+
+    def member_themes(self, keys: Optional[Sequence] = None, rows=None) -> Dict[object, List[str]]:
+        """{key: [themes]} over the selected rows (rows sharing a key are concatenated)."""
+        keys = self.names if keys is None else keys
+        mask = self._row_mask(rows)
+        themes = {}
+        for row in np.flatnonzero(mask):
+            start, end = self.indptr[row], self.indptr[row + 1]
+            if end > start:
+                themes.setdefault(keys[row], []).extend(self.themes[j] for j in self.indices[start:end])
+        return themes
+
+
+def build_theme_index(source=DB_FILE, index_dir=THEME_INDEX_DIR, ticker_col: str = 'tickers',
+                      name_col: str = 'name', theme_col: str = 'naverTheme',
+                      sha1: Optional[str] = None) -> ThemeMembershipIndex:
+    """Parse a source CSV and write its index to index_dir."""
+    source = Path(source)
+    index_dir = Path(index_dir)
+    stat = source.stat()
+
+    df = pd.read_csv(source, usecols=lambda c: c in (ticker_col, name_col, theme_col))
+    n = len(df)
+    tickers = df[ticker_col] if ticker_col in df.columns else pd.Series([''] * n)
+    names = df[name_col] if name_col in df.columns else pd.Series([np.nan] * n)
+    cells = df[theme_col] if theme_col in df.columns else pd.Series([np.nan] * n)
+
+    theme_ids = {}
+    status = np.empty(n, dtype=np.int8)
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    indices = []
+    for row, cell in enumerate(cells.tolist()):
+        status[row], row_themes = _parse_theme_list(cell)
+        for theme in row_themes:
+            indices.append(theme_ids.setdefault(theme, len(theme_ids)))
+        indptr[row + 1] = len(indices)
+
+    ticker_values = tickers.to_numpy()
+    if ticker_values.dtype.kind not in 'iu':
+        ticker_values = tickers.astype(str).to_numpy().astype(str)
+    arrays = {
+        'tickers': ticker_values,
+        'names': names.fillna('').astype(str).to_numpy().astype(str),
+        'has_name': names.notna().to_numpy(),
+        'status': status,
+        'themes': np.array(list(theme_ids), dtype=str),
+        'indptr': indptr,
+        'indices': np.array(indices, dtype=np.int64),
+    }
+    header = {
+        'version': INDEX_VERSION,
+        'source': str(source),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha1': sha1 or _file_sha1(source),
+        'columns': [ticker_col, name_col, theme_col],
+        'n_rows': n,
+        'n_themes': len(theme_ids),
+        'built_at': datetime.now().isoformat(timespec='seconds'),
+    }
+
+    try:
+        index_dir.mkdir(parents=True, exist_ok=True)
+        stem = _index_stem(source)
+        tmp_arrays = index_dir / f"{stem}.npz.tmp"
+        with open(tmp_arrays, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_arrays, index_dir / f"{stem}.npz")
+        _write_header(index_dir / f"{stem}.json", header)
+    except OSError as e:
+        # Read-only deployments still get the in-memory index
+        print(f"Warning: could not save theme index to {index_dir}: {e}")
+    return ThemeMembershipIndex(header, arrays)
+
+
+def _index_stem(source: Path) -> str:
+    """Index file stem: source stem plus a hash of its path (two db_final.csv never collide)."""
+    return f"{source.stem}-{hashlib.sha1(str(source).encode('utf-8')).hexdigest()[:8]}"
+
+
+def _write_header(path: Path, header: dict):
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(header, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+def _load_saved(source: Path, index_dir: Path, stat, columns) -> Optional[ThemeMembershipIndex]:
+    """Saved index if it still describes source (by size/mtime, else by sha1)."""
+    stem = _index_stem(source)
+    header_file = index_dir / f"{stem}.json"
+    arrays_file = index_dir / f"{stem}.npz"
+    if not header_file.exists() or not arrays_file.exists():
+        return None
+    with open(header_file, 'r', encoding='utf-8') as f:
+        header = json.load(f)
+    if (header.get('version') != INDEX_VERSION or header.get('source') != str(source)
+            or header.get('columns') != list(columns)):
+        return None
+
+    if header['size'] != stat.st_size or header['mtime_ns'] != stat.st_mtime_ns:
+        if header['size'] != stat.st_size or header['sha1'] != _file_sha1(source):
+            return None
+        header.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+        try:
+            _write_header(header_file, header)  # same content, new mtime
+        except OSError:
+            pass
+
+    with np.load(arrays_file) as data:
+        arrays = {k: data[k] for k in data.files}
+    return ThemeMembershipIndex(header, arrays)
+
+
+def open_theme_index(source=DB_FILE, index_dir=THEME_INDEX_DIR, ticker_col: str = 'tickers',
+                     name_col: str = 'name', theme_col: str = 'naverTheme') -> Optional[ThemeMembershipIndex]:
+    """
+    Membership index of a source CSV (cached per process), building or
+    rebuilding it when the source changed; None if the source is missing.
+    """
+    source = Path(source).resolve()
+    if not source.exists():
+        return None
+    index_dir = Path(index_dir)
+    columns = (ticker_col, name_col, theme_col)
+    stat = source.stat()
+
+    key = (str(source), str(index_dir), columns)
+    cached = _index_cache.get(key)
+    if cached is not None and cached[0] == (stat.st_size, stat.st_mtime_ns):
+        return cached[1]
+
+    index = _load_saved(source, index_dir, stat, columns)
+    if index is None:
+        index = build_theme_index(source, index_dir, *columns)
+    _index_cache[key] = ((stat.st_size, stat.st_mtime_ns), index)
+    return index
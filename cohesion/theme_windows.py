@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Per-Window Theme Fiedler Computation (serial and process-pool)
+
+Computes {theme: Fiedler result} for a list of (start, end) periods from one
+date x ticker close panel. The serial path and the parallel path run the same
+functions on the same panel, so their output is identical and in period order.
+
+Parallel mode:
+- the close panel is copied once into POSIX shared memory and every worker
+  attaches a zero-copy view of it (no pickled per-ticker frames)
+- periods are chunked and dispatched with Executor.map, which keeps results
+  in submission order
+- workers are forked, because the job scripts run at module level and must
+  not be re-executed in spawned children; without fork we run serially
+
+Within a chunk each theme's eigen solve is warm-started from its previous
+period (FiedlerTracker). Chunk boundaries depend only on chunk_size, never on
+the worker count, so serial and parallel runs make the same solver calls.
+
+Threshold sweep: with params['thresholds'] = [t1, t2, ...] every theme
+window yields a list of results, one per threshold, from a single returns
+alignment and correlation (compute_fiedler_sweep).
+
+Ragged histories: with params['min_overlap'] set, the per-theme path
+correlates outer-aligned returns pairwise-complete (pairwise_corr) instead of
+keeping only rows where every stock traded, and both paths drop tickers and
+pairs with fewer than min_overlap observations in the window.
+
+With a SpectralCache, a (valid ticker set, window, window closes) already
+solved - by an identical theme in this period or by an earlier run - is
+returned from the cache before any returns alignment or correlation work.
+Closes that arrive late or are corrected change the key (fingerprint()).
+Workers flush their new results at the end of each chunk.
+"""
+
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from cohesion.fiedler import compute_fiedler, compute_fiedler_sweep, FiedlerTracker
+from cohesion.correlation import UniverseCorrelation, min_overlap_rows, pairwise_corr
+
+# Consecutive periods per task; each chunk warm-starts its own tracker
+PERIOD_CHUNK = 4
+
+# Worker-process state, set by _init_worker
+_worker_state = {}
+
+
+def _solve(corr, labels, theme, params, tracker):
+    # diagnose: disconnected themes also report their largest component's Fiedler value
+    if params.get('thresholds'):
+        return compute_fiedler_sweep(corr, params['thresholds'], diagnose=True)
+    if tracker is None:
+        return compute_fiedler(corr, params['threshold'], diagnose=True)
+    return tracker.compute(theme, corr, labels)
+
+
+def _cache_keys(cache, kind, closes, window_start, window_end, params) -> list:
+    """
+    One key per threshold (sweep) or a single key; sweep keys match single runs.
+    closes: the window's close panel for the keyed tickers (ticker set + fingerprint).
+    """
+    base = {'lookback_days': params['lookback_days'], 'min_stocks': params['min_stocks']}
+    if params.get('min_overlap'):
+        base['min_overlap'] = params['min_overlap']
+    data = cache.fingerprint(closes)
+    return [cache.key(kind, closes.columns, window_start, window_end, dict(base, threshold=t), data)
+            for t in params.get('thresholds') or [params['threshold']]]
+
+
+def _cache_get(cache, keys, params):
+    """Cached result (list for a sweep), or None unless every key hits."""
+    results = []
+    for key in keys:
+        cached = cache.get(key)
+        if cached is None:
+            return None
+        results.append(cached)
+    if params.get('thresholds'):
+        return [dict(r, threshold=t) for r, t in zip(results, params['thresholds'])]
+    return results[0]
+
+
+def _cache_put(cache, keys, result):
+    for key, value in zip(keys, result if isinstance(result, list) else [result]):
+        cache.put(key, value)
+
+
+def theme_window_fiedler(close_panel: pd.DataFrame, tickers, start_date, end_date,
+                         params: dict, theme=None, tracker=None, cache=None) -> Optional[dict]:
+    """
+    Fiedler value for one theme over [start_date - lookback, end_date].
+
+    Each ticker's returns come from its own price rows in the window, then the
+    theme's returns are aligned and complete rows kept (listwise dropna), or
+    correlated pairwise-complete with params['min_overlap'].
+
+    Returns:
+        dict from compute_fiedler (list of dicts for a threshold sweep), or None
+        if fewer than min_stocks stocks qualify
+    """
+    min_stocks = params['min_stocks']
+    valid_tickers = [t for t in dict.fromkeys(tickers) if t in close_panel.columns]
+    if len(valid_tickers) < min_stocks:
+        return None
+
+    lookback_start = start_date - pd.Timedelta(days=params['lookback_days'])
+    window = close_panel.loc[lookback_start:end_date, valid_tickers]
+    # Only tickers with prices in this window (listed, not halted throughout)
+    window = window.loc[:, window.notna().any().to_numpy()]
+    valid_tickers = list(window.columns)
+    if len(valid_tickers) < min_stocks:
+        return None
+
+    keys = None
+    if cache is not None:
+        keys = _cache_keys(cache, 'window', window, lookback_start, end_date, params)
+        cached = _cache_get(cache, keys, params)
+        if cached is not None:
+            return cached
+
+    returns_dict = {}
+    for ticker in valid_tickers:
+        prices = window[ticker].dropna()
+        if len(prices) < 2:
+            continue
+        returns = prices.pct_change().dropna()
+        if len(returns) >= 2:
+            returns_dict[ticker] = returns
+
+    if len(returns_dict) < min_stocks:
+        return None
+
+    if params.get('min_overlap'):
+        corr, _ = pairwise_corr(pd.DataFrame(returns_dict), params['min_overlap'])
+        if len(corr.columns) < min_stocks:
+            return None
+    else:
+        returns_df = pd.DataFrame(returns_dict).dropna()
+        if len(returns_df) < 2 or len(returns_df.columns) < min_stocks:
+            return None
+        corr = returns_df.corr()
+
+    result = _solve(corr, corr.columns, theme, params, tracker)
+    if keys is not None:
+        _cache_put(cache, keys, result)
+    return result
+
+
+def period_fiedler_batched(close_panel: pd.DataFrame, theme_to_tickers: Dict[str, List[str]],
+                           start_date, end_date, params: dict, tracker=None,
+                           cache=None) -> Dict[str, dict]:
+    """
+    Fiedler values for all themes over one window from a single universe-wide
+    (pairwise-complete) correlation matrix, sliced per theme by integer index.
+
+    The universe correlation is only computed if some theme misses the cache.
+    """
+    lookback_start = start_date - pd.Timedelta(days=params['lookback_days'])
+    window = close_panel.loc[lookback_start:end_date]
+
+    returns = window.pct_change(fill_method=None).iloc[1:]
+    min_periods = min_overlap_rows(params.get('min_overlap') or 2, len(returns))
+    returns = returns.loc[:, returns.notna().sum() >= min_periods]
+    present = set(returns.columns)
+
+    period_results = {}
+    pending = []
+    for theme, tickers in theme_to_tickers.items():
+        members = [t for t in dict.fromkeys(tickers) if t in present]
+        if len(members) < params['min_stocks']:
+            continue
+        keys = None
+        if cache is not None:
+            keys = _cache_keys(cache, 'batched', window[members], lookback_start, end_date, params)
+            cached = _cache_get(cache, keys, params)
+            if cached is not None:
+                period_results[theme] = cached
+                continue
+        pending.append((theme, members, keys))
+
+    if pending:
+        universe = UniverseCorrelation(returns, min_periods)
+        for theme, members, keys in pending:
+            result = _solve(universe.sub_matrix(members), members, theme, params, tracker)
+            if keys is not None:
+                _cache_put(cache, keys, result)
+            period_results[theme] = result
+
+    # Keep theme_to_tickers order whether a theme hit or missed
+    return {theme: period_results[theme] for theme in theme_to_tickers if theme in period_results}
+
+
+def period_fiedler(close_panel: pd.DataFrame, theme_to_tickers: Dict[str, List[str]],
+                   start_date, end_date, params: dict, tracker=None, cache=None) -> Dict[str, dict]:
+    """Fiedler values for all themes over one window: {theme: result}."""
+    if params.get('batched'):
+        return period_fiedler_batched(close_panel, theme_to_tickers, start_date, end_date,
+                                      params, tracker, cache)
+
+    period_results = {}
+    for theme, tickers in theme_to_tickers.items():
+        result = theme_window_fiedler(close_panel, tickers, start_date, end_date, params,
+                                      theme, tracker, cache)
+        if result is not None:
+            period_results[theme] = result
+    return period_results
+
+
+def _attach_shared(name: str) -> shared_memory.SharedMemory:
+    """Attach to the parent's block (forked workers share its resource tracker)."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13: re-registering with the shared tracker is a no-op
+        return shared_memory.SharedMemory(name=name)
+
+
+def _init_worker(shm_name, shape, dates, tickers, theme_to_tickers, params, cache):
+    """Attach the shared close panel once per worker process."""
+    shm = _attach_shared(shm_name)
+    values = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    _worker_state['shm'] = shm
+    _worker_state['panel'] = pd.DataFrame(values, index=pd.DatetimeIndex(dates),
+                                          columns=tickers, copy=False)
+    _worker_state['themes'] = theme_to_tickers
+    _worker_state['params'] = params
+    _worker_state['cache'] = cache
+
+
+def _compute_chunk(close_panel, theme_to_tickers, chunk, params, cache=None):
+    """
+    Consecutive periods with one warm-start tracker.
+
+    Returns:
+        (results, solver stats, cache counters for this chunk)
+    """
+    tracker = FiedlerTracker(params['threshold'], diagnose=True)
+    before = dict(cache.stats) if cache is not None else {}
+    results = [period_fiedler(close_panel, theme_to_tickers, start, end, params, tracker, cache)
+               for start, end in chunk]
+    if cache is None:
+        return results, tracker.stats, {}
+    cache.flush()
+    return results, tracker.stats, {k: v - before[k] for k, v in cache.stats.items()}
+
+
+def _run_chunk(chunk):
+    """Worker task: compute a chunk of (start, end) periods."""
+    return _compute_chunk(_worker_state['panel'], _worker_state['themes'], chunk,
+                          _worker_state['params'], _worker_state['cache'])
+
+
+def compute_periods(close_panel: pd.DataFrame, theme_to_tickers: Dict[str, List[str]],
+                    periods: List[dict], params: dict, workers: int = 1,
+                    label: str = 'period', progress_every: int = 5,
+                    chunk_size: int = PERIOD_CHUNK, cache=None) -> List[Dict[str, dict]]:
+    """
+    Theme Fiedler results for every period, in period order.
+
+    Args:
+        close_panel: [dates x tickers] close prices (NaN = no row)
+        theme_to_tickers: {theme: [tickers]}
+        periods: [{'start': Timestamp, 'end': Timestamp, ...}]
+        params: lookback_days, threshold, min_stocks, batched (+ thresholds for a sweep)
+        workers: Process count (1 = serial in this process)
+        label: Progress label ('week', 'month')
+        progress_every: Print progress roughly every N periods
+        chunk_size: Consecutive periods per task (warm starts stay within a chunk)
+        cache: Optional SpectralCache (hit/miss counters accumulate on it)
+
+    Returns:
+        list: One {theme: result} dict per period
+    """
+    bounds = [(p['start'], p['end']) for p in periods]
+    chunks = [bounds[i:i+chunk_size] for i in range(0, len(bounds), chunk_size)]
+    solver_stats = FiedlerTracker(params['threshold'])
+    results = []
+    reported = 0  # periods done at the last progress line (chunks can step past a multiple)
+
+    if workers <= 1 or len(chunks) <= 1 or 'fork' not in mp.get_all_start_methods():
+        for chunk in chunks:
+            chunk_results, stats, _ = _compute_chunk(close_panel, theme_to_tickers, chunk,
+                                                     params, cache)
+            results.extend(chunk_results)
+            solver_stats.merge_stats(stats)
+            if len(results) // progress_every > reported // progress_every or len(results) == len(bounds):
+                print(f"   Processed {len(results)}/{len(bounds)} {label}s...")
+                reported = len(results)
+        print(f"   Eigen solves: {solver_stats.summary()}")
+        return results
+
+    values = np.ascontiguousarray(close_panel.to_numpy(dtype=np.float64))
+    shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+    try:
+        shared = np.ndarray(values.shape, dtype=np.float64, buffer=shm.buf)
+        shared[:] = values
+        del values
+
+        initargs = (shm.name, shared.shape, close_panel.index.values,
+                    list(close_panel.columns), theme_to_tickers, params, cache)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context('fork'),
+                                 initializer=_init_worker, initargs=initargs) as executor:
+            for chunk, (chunk_results, stats, cache_stats) in zip(chunks,
+                                                                  executor.map(_run_chunk, chunks)):
+                results.extend(chunk_results)
+                solver_stats.merge_stats(stats)
+                if cache is not None:
+                    cache.merge_stats(cache_stats)
+                if len(results) // progress_every > reported // progress_every or len(results) == len(bounds):
+                    print(f"   Processed {len(results)}/{len(bounds)} {label}s "
+                          f"({workers} workers)...")
+                    reported = len(results)
+        del shared
+        print(f"   Eigen solves: {solver_stats.summary()}")
+        return results
+    finally:
+        shm.close()
+        shm.unlink()
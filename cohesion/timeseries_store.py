@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+"""
+Consolidated Fiedler Timeseries Table
+
+Replaces the per-theme data/theme_<safe_name>_timeseries.csv files (one glob +
+~400 CSV parses per load, theme names reverse-engineered from mangled file
+names) with one table keyed by (theme_id, date):
+
+    <store_dir>/
+        themes.json        {"themes": {exact theme name: theme_id}, "params": {...}}
+        year=2025.csv      theme_id,date,fiedler,n_stocks,n_edges,mean_correlation,is_connected
+        year=2026.csv      ...
+        stock_roles.csv    theme_id,date,ticker,fiedler_loading,partition,degree_centrality
+
+Partitions may also carry SPECTRAL_COLUMNS (lambda_3, lambda_4, spectral_gap)
+when the cohesion run exports spectral features; older rows read as NaN.
+stock_roles.csv holds each theme's per-stock roles from its latest window:
+Fiedler vector loading, partition side (+1/-1) and degree centrality.
+
+"params" records how the rows were computed (e.g. the cohesion run's
+correlation mode); a run with different params recomputes instead of
+appending to them. Tables written before it have no params.
+
+Rows are partitioned by year and sorted by (theme_id, date), so an incremental
+cohesion run rewrites only the partitions it touches. Loading reads every
+partition once into a (theme_id, date) MultiIndex for per-theme and per-date
+slices. Theme ids are stable: new themes get the next id, existing ids never change.
+"""
+
+import glob
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config import DATA_DIR, FIEDLER_TIMESERIES_DIR, THEME_TO_TICKERS_FILE
+
+THEMES_FILE = 'themes.json'
+ROLES_FILE = 'stock_roles.csv'
+METRIC_COLUMNS = ['fiedler', 'n_stocks', 'n_edges', 'mean_correlation', 'is_connected']
+SPECTRAL_COLUMNS = ['lambda_3', 'lambda_4', 'spectral_gap']
+ROLE_COLUMNS = ['fiedler_loading', 'partition', 'degree_centrality']
+
+
+def legacy_safe_name(theme: str) -> str:
+    """File-name mangling used by the old theme_<safe_name>_timeseries.csv files."""
+    return theme.replace('/', '_').replace(' ', '_').replace('(', '').replace(')', '')[:50]
+
+
+def _atomic_write_csv(df: pd.DataFrame, path: Path):
+    tmp_path = path.with_name(path.name + '.tmp')
+    df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def _atomic_write_json(obj, path: Path):
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(obj, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+class FiedlerTimeseries:
+    """(theme_id, date)-indexed Fiedler timeseries for all themes"""
+
+    def __init__(self, frame: pd.DataFrame, theme_ids: Dict[str, int], params: Optional[dict] = None):
+        """
+        Args:
+            frame: Columns theme_id, date + METRIC_COLUMNS
+            theme_ids: {exact theme name: theme_id}
+            params: How the rows were computed (None = not recorded)
+        """
+        self.params = params
+        self.theme_ids = dict(theme_ids)
+        self.theme_names = {tid: name for name, tid in self.theme_ids.items()}
+
+        frame = frame.copy()
+        frame['date'] = pd.to_datetime(frame['date'])
+        self.frame = frame.set_index(['theme_id', 'date']).sort_index()
+
+    def __len__(self):
+        return len(self.frame)
+
+    def __contains__(self, theme: str):
+        tid = self.theme_ids.get(theme)
+        return tid is not None and tid in self.frame.index.get_level_values(0)
+
+    @property
+    def themes(self) -> List[str]:
+        """Theme names that have rows, in theme_id order."""
+        present = self.frame.index.get_level_values(0).unique()
+        return [self.theme_names[tid] for tid in present]
+
+    def theme(self, theme: str, start=None, end=None) -> pd.DataFrame:
+        """
+        One theme's series as [date, fiedler, ...] (the old per-theme file layout).
+
+        Returns an empty DataFrame for unknown themes.
+        """
+        tid = self.theme_ids.get(theme)
+        if tid is None or tid not in self.frame.index.get_level_values(0):
+            return pd.DataFrame(columns=['date'] + METRIC_COLUMNS)
+
+        df = self.frame.xs(tid, level='theme_id')
+        df = df.loc[pd.Timestamp(start) if start else None:pd.Timestamp(end) if end else None]
+        return df.reset_index()
+
+    def on_date(self, date) -> pd.DataFrame:
+        """Cross-section for one date: [theme, fiedler, ...]."""
+        date = pd.Timestamp(date)
+        if date not in self.frame.index.get_level_values(1):
+            return pd.DataFrame(columns=['theme'] + METRIC_COLUMNS)
+        df = self.frame.xs(date, level='date').reset_index()
+        df.insert(0, 'theme', df.pop('theme_id').map(self.theme_names))
+        return df
+
+    def latest(self) -> pd.DataFrame:
+        """Last row of every theme: [theme, date, fiedler, ...]."""
+        df = self.frame.groupby(level='theme_id').tail(1).reset_index()
+        df.insert(0, 'theme', df.pop('theme_id').map(self.theme_names))
+        return df
+
+    def by_theme(self) -> Dict[str, pd.DataFrame]:
+        """{exact theme name: [date, fiedler, ...] DataFrame}."""
+        return {
+            self.theme_names[tid]: df.droplevel('theme_id').reset_index()
+            for tid, df in self.frame.groupby(level='theme_id', sort=True)
+        }
+
+
+class FiedlerTimeseriesStore:
+    """On-disk partitioned table (see module docstring)"""
+
+    def __init__(self, store_dir=FIEDLER_TIMESERIES_DIR):
+        self.store_dir = Path(store_dir)
+
+    def exists(self) -> bool:
+        return (self.store_dir / THEMES_FILE).exists()
+
+    def partition_files(self) -> List[Path]:
+        return sorted(self.store_dir.glob('year=*.csv'))
+
+    def signature(self):
+        """mtimes of the metadata and partitions (cache key)."""
+        files = [self.store_dir / THEMES_FILE] + self.partition_files()
+        return tuple((f.name, f.stat().st_mtime_ns) for f in files if f.exists())
+
+    def _meta(self) -> dict:
+        if not self.exists():
+            return {}
+        with open(self.store_dir / THEMES_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def theme_ids(self) -> Dict[str, int]:
+        return self._meta().get('themes', {})
+
+    def params(self) -> Optional[dict]:
+        """How the stored rows were computed (None if not recorded)."""
+        return self._meta().get('params')
+
+    def _write_meta(self, theme_ids: Dict[str, int], params: Optional[dict] = None):
+        """Write themes.json, keeping the stored params unless new ones are given."""
+        meta = {'themes': theme_ids}
+        params = params if params is not None else self.params()
+        if params is not None:
+            meta['params'] = params
+        _atomic_write_json(meta, self.store_dir / THEMES_FILE)
+
+    def _assign_ids(self, themes: Iterable[str]):
+        """Stored ids plus the next free ids for unseen themes: (theme_ids, new_themes)."""
+        theme_ids = self.theme_ids()
+        new_themes = [t for t in themes if t not in theme_ids]
+        next_id = max(theme_ids.values(), default=-1) + 1
+        for offset, theme in enumerate(new_themes):
+            theme_ids[theme] = next_id + offset
+        return theme_ids, new_themes
+
+    def read(self) -> FiedlerTimeseries:
+        """Load every partition into one indexed table."""
+        parts = [
+            pd.read_csv(f, parse_dates=['date'], float_precision='round_trip')
+            for f in self.partition_files()
+        ]
+        if parts:
+            frame = pd.concat(parts, ignore_index=True)
+        else:
+            frame = pd.DataFrame(columns=['theme_id', 'date'] + METRIC_COLUMNS)
+        meta = self._meta()
+        return FiedlerTimeseries(frame, meta.get('themes', {}), meta.get('params'))
+
+    def write(self, series: Dict[str, pd.DataFrame], params: Optional[dict] = None) -> dict:
+        """
+        Replace the stored series of the given themes (others are untouched).
+
+        Args:
+            series: {exact theme name: DataFrame with date + METRIC_COLUMNS (+ SPECTRAL_COLUMNS)};
+                    None / empty removes a theme's rows
+            params: How the rows were computed (recorded in themes.json; None keeps the stored params)
+
+        Returns:
+            dict: themes, rows, new_themes, partitions (names rewritten)
+        """
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+
+        theme_ids, new_themes = self._assign_ids(series)
+
+        frames = []
+        for theme, df in series.items():
+            if df is None or len(df) == 0:
+                continue
+            df = df[['date'] + [c for c in METRIC_COLUMNS + SPECTRAL_COLUMNS if c in df.columns]].copy()
+            df['date'] = pd.to_datetime(df['date'])
+            df.insert(0, 'theme_id', theme_ids[theme])
+            frames.append(df)
+
+        new_rows = (pd.concat(frames, ignore_index=True) if frames
+                    else pd.DataFrame(columns=['theme_id', 'date'] + METRIC_COLUMNS))
+        replaced_ids = {theme_ids[t] for t in series}
+
+        # Ids first: partitions may reference the new themes
+        self._write_meta(theme_ids, params)
+
+        existing = {int(f.stem.split('=')[1]): f for f in self.partition_files()}
+        new_years = set(new_rows['date'].dt.year.unique()) if len(new_rows) else set()
+        rewritten = []
+
+        for year in sorted(set(existing) | new_years):
+            path = self.store_dir / f'year={year}.csv'
+            kept = pd.DataFrame(columns=new_rows.columns)
+            if year in existing:
+                stored = pd.read_csv(path, parse_dates=['date'], float_precision='round_trip')
+                touched = stored['theme_id'].isin(replaced_ids)
+                if not touched.any() and year not in new_years:
+                    continue
+                kept = stored[~touched]
+
+            year_rows = new_rows[new_rows['date'].dt.year == year] if len(new_rows) else new_rows
+            part = pd.concat([kept, year_rows], ignore_index=True)
+            part = part.drop_duplicates(subset=['theme_id', 'date'], keep='last')
+            part = part.sort_values(['theme_id', 'date'])
+            part['date'] = pd.to_datetime(part['date']).dt.strftime('%Y-%m-%d')
+            _atomic_write_csv(part, path)
+            rewritten.append(path.name)
+
+        return {
+            'themes': len(series),
+            'rows': len(new_rows),
+            'new_themes': len(new_themes),
+            'partitions': rewritten
+        }
+
+    def read_roles(self) -> pd.DataFrame:
+        """Stock roles as [theme, date, ticker] + ROLE_COLUMNS (empty if none written)."""
+        path = self.store_dir / ROLES_FILE
+        if not path.exists():
+            return pd.DataFrame(columns=['theme', 'date', 'ticker'] + ROLE_COLUMNS)
+        df = pd.read_csv(path, parse_dates=['date'], float_precision='round_trip')
+        theme_names = {tid: name for name, tid in self.theme_ids().items()}
+        df.insert(0, 'theme', df.pop('theme_id').map(theme_names))
+        return df
+
+    def write_roles(self, roles: Dict[str, pd.DataFrame]) -> int:
+        """
+        Replace the stock roles of the given themes (others are untouched).
+
+        Args:
+            roles: {exact theme name: DataFrame with date, ticker + ROLE_COLUMNS}
+
+        Returns:
+            int: Rows written for these themes
+        """
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        theme_ids, new_themes = self._assign_ids(roles)
+        if new_themes:
+            self._write_meta(theme_ids)
+
+        frames = []
+        for theme, df in roles.items():
+            if df is None or len(df) == 0:
+                continue
+            df = df[['date', 'ticker'] + ROLE_COLUMNS].copy()
+            df.insert(0, 'theme_id', theme_ids[theme])
+            frames.append(df)
+
+        path = self.store_dir / ROLES_FILE
+        if path.exists():
+            stored = pd.read_csv(path, float_precision='round_trip')
+            frames.insert(0, stored[~stored['theme_id'].isin({theme_ids[t] for t in roles})])
+
+        columns = ['theme_id', 'date', 'ticker'] + ROLE_COLUMNS
+        table = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+        table['date'] = pd.to_datetime(table['date']).dt.strftime('%Y-%m-%d')
+        _atomic_write_csv(table.sort_values(['theme_id', 'ticker'])[columns], path)
+        return sum(len(df) for df in roles.values() if df is not None)
+
+
+def import_legacy_timeseries(data_dir=DATA_DIR, theme_names: Optional[Iterable[str]] = None,
+                             verbose: bool = True) -> Dict[str, pd.DataFrame]:
+    """
+    Read the old theme_<safe_name>_timeseries.csv files.
+
+    File names are resolved back to exact theme names through theme_names
+    (e.g. the theme mapping); unresolved files keep their file-derived name.
+
+    Returns:
+        dict: {theme name: DataFrame}
+    """
+    safe_to_name = {legacy_safe_name(t): t for t in (theme_names or [])}
+    series = {}
+    unresolved = 0
+
+    for file_path in sorted(glob.glob(str(Path(data_dir) / 'theme_*_timeseries.csv'))):
+        safe = Path(file_path).stem[len('theme_'):-len('_timeseries')]
+        theme = safe_to_name.get(safe)
+        if theme is None:
+            theme = safe
+            unresolved += 1
+        try:
+            series[theme] = pd.read_csv(file_path, parse_dates=['date'],
+                                        float_precision='round_trip')
+        except Exception as e:
+            if verbose:
+                print(f"  Warning: Could not load {file_path}: {e}")
+
+    if verbose and series:
+        print(f"  Imported {len(series)} legacy theme timeseries files "
+              f"({unresolved} names unresolved)")
+    return series
+
+
+_cache = {}
+
+
+def _default_theme_names() -> List[str]:
+    if not THEME_TO_TICKERS_FILE.exists():
+        return []
+    with open(THEME_TO_TICKERS_FILE, 'r', encoding='utf-8') as f:
+        return list(json.load(f).keys())
+
+
+def open_fiedler_timeseries(store_dir=FIEDLER_TIMESERIES_DIR, theme_names=None,
+                            legacy_dir=DATA_DIR) -> Optional[FiedlerTimeseries]:
+    """
+    Load the consolidated table (cached per process until a partition changes).
+
+    If the table has not been built yet, the legacy per-theme files are read in
+    memory instead (nothing is written), resolving names via theme_names
+    (default: the theme mapping). Returns None if neither exists.
+    """
+    store = FiedlerTimeseriesStore(store_dir)
+    if store.exists():
+        key = ('table', str(store.store_dir), store.signature())
+    else:
+        legacy_files = sorted(Path(legacy_dir).glob('theme_*_timeseries.csv'))
+        if not legacy_files:
+            return None
+        key = ('legacy', str(legacy_dir), len(legacy_files),
+               max(f.stat().st_mtime_ns for f in legacy_files),
+               None if theme_names is None else tuple(sorted(theme_names)))
+
+    if key in _cache:
+        return _cache[key]
+
+    if store.exists():
+        table = store.read()
+    else:
+        if theme_names is None:
+            theme_names = _default_theme_names()
+        series = import_legacy_timeseries(legacy_dir, theme_names, verbose=False)
+        theme_ids = {theme: i for i, theme in enumerate(sorted(series))}
+        frames = []
+        for theme, df in series.items():
+            df = df[['date'] + [c for c in METRIC_COLUMNS if c in df.columns]].copy()
+            df.insert(0, 'theme_id', theme_ids[theme])
+            frames.append(df)
+        data = (pd.concat(frames, ignore_index=True) if frames
+                else pd.DataFrame(columns=['theme_id', 'date'] + METRIC_COLUMNS))
+        table = FiedlerTimeseries(data, theme_ids)
+
+    _cache.clear()
+    _cache[key] = table
+    return table
+
+
+_roles_cache = {}
+
+
+def open_stock_roles(store_dir=FIEDLER_TIMESERIES_DIR) -> Optional[pd.DataFrame]:
+    """
+    Per-stock cohesion roles from the latest window of each theme
+    ([theme, date, ticker] + ROLE_COLUMNS), cached per process until the
+    file changes. None if no cohesion run has written roles yet.
+    """
+    store = FiedlerTimeseriesStore(store_dir)
+    path = store.store_dir / ROLES_FILE
+    if not path.exists():
+        return None
+
+    key = (str(path), path.stat().st_mtime_ns)
+    if key not in _roles_cache:
+        _roles_cache.clear()
+        _roles_cache[key] = store.read_roles()
+    return _roles_cache[key]
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+KRX Trading Calendar
+
+One sorted DatetimeIndex of trading days, built once (from the price store or
+the union of loaded price frames), answering period queries with searchsorted
+instead of rescanning every date per week/month:
+
+- week_windows(): 7-calendar-day windows stepped from the first trading day
+  (the Fiedler database's weekly periods)
+- month_windows(): calendar-month windows (monthly periods)
+- last_n() / before(): N-trading-day windows (week-over-week comparison)
+- week_ends(): last trading day of each calendar week (backtest evaluation dates)
+"""
+
+from typing import Iterable, List
+
+import numpy as np
+import pandas as pd
+
+
+class TradingCalendar:
+    """Sorted, de-duplicated trading days with window queries"""
+
+    def __init__(self, dates):
+        """
+        Args:
+            dates: Iterable of trading dates (any order, duplicates allowed)
+        """
+        self.dates = pd.DatetimeIndex(np.unique(pd.DatetimeIndex(dates).values))
+
+    @classmethod
+    def from_frames(cls, frames: Iterable) -> 'TradingCalendar':
+        """Union of the date indexes of price DataFrames/Series."""
+        indexes = [frame.index.values for frame in frames if len(frame.index) > 0]
+        if not indexes:
+            return cls([])
+        return cls(np.concatenate(indexes))
+
+    @classmethod
+    def from_price_store(cls, store, start=None, end=None) -> 'TradingCalendar':
+        """Dates of the consolidated price store (already the union of all tickers)."""
+        rows = store.row_slice(start, end)
+        return cls(store.dates[rows])
+
+    def __len__(self):
+        return len(self.dates)
+
+    @property
+    def first(self) -> pd.Timestamp:
+        return self.dates[0]
+
+    @property
+    def last(self) -> pd.Timestamp:
+        return self.dates[-1]
+
+    def _bounds(self, start=None, end=None):
+        """Integer [i, j) covering start <= date <= end."""
+        i = 0 if start is None else self.dates.searchsorted(pd.Timestamp(start), side='left')
+        j = len(self.dates) if end is None else self.dates.searchsorted(pd.Timestamp(end), side='right')
+        return i, j
+
+    def between(self, start=None, end=None) -> pd.DatetimeIndex:
+        """Trading days with start <= date <= end."""
+        i, j = self._bounds(start, end)
+        return self.dates[i:j]
+
+    def subset(self, start=None, end=None) -> 'TradingCalendar':
+        """Calendar restricted to start <= date <= end."""
+        return TradingCalendar(self.between(start, end))
+
+    def last_n(self, n: int, end=None) -> pd.DatetimeIndex:
+        """The last n trading days on or before end (fewer if history is short)."""
+        _, j = self._bounds(None, end)
+        return self.dates[max(j - n, 0):j]
+
+    def before(self, date, n: int) -> pd.DatetimeIndex:
+        """The n trading days strictly before date."""
+        j = self.dates.searchsorted(pd.Timestamp(date), side='left')
+        return self.dates[max(j - n, 0):j]
+
+    def week_windows(self, start=None, min_days: int = 3) -> List[dict]:
+        """
+        Consecutive 7-calendar-day windows stepped from the first trading day.
+
+        Args:
+            start: First date to consider (default: first trading day)
+            min_days: Skip windows with fewer trading days
+
+        Returns:
+            list: [{'start', 'end', 'label'}] with label = window end (YYYY-MM-DD)
+        """
+        dates = self.between(start)
+        periods = []
+        if len(dates) == 0:
+            return periods
+
+        week = pd.Timedelta(days=7)
+        window_starts = pd.date_range(dates[0], dates[-1], freq=week)
+        lo = dates.searchsorted(window_starts, side='left')
+        hi = dates.searchsorted(window_starts + week, side='left')
+
+        for i, j in zip(lo, hi):
+            if j - i >= min_days:
+                periods.append({
+                    'start': dates[i],
+                    'end': dates[j - 1],
+                    'label': dates[j - 1].strftime('%Y-%m-%d')
+                })
+        return periods
+
+    def month_windows(self, start=None, min_days: int = 5) -> List[dict]:
+        """
+        Calendar-month windows (trading days from the 1st to month end).
+
+        Args:
+            start: First date to consider (default: first trading day)
+            min_days: Skip months with fewer trading days
+
+        Returns:
+            list: [{'start', 'end', 'label'}] with label = YYYY-MM
+        """
+        dates = self.between(start)
+        periods = []
+        if len(dates) == 0:
+            return periods
+
+        month_starts = pd.date_range(dates[0].to_period('M').start_time, dates[-1], freq='MS')
+        lo = dates.searchsorted(month_starts, side='left')
+        hi = dates.searchsorted(month_starts + pd.offsets.MonthBegin(1), side='left')
+
+        for month_start, i, j in zip(month_starts, lo, hi):
+            if j - i >= min_days:
+                periods.append({
+                    'start': dates[i],
+                    'end': dates[j - 1],
+                    'label': month_start.strftime('%Y-%m')
+                })
+        return periods
+
+    def week_ends(self, start, end, freq: str = 'W') -> pd.DatetimeIndex:
+        """
+        Last trading day of each calendar week anchored like pd.date_range(freq).
+
+        Weeks without any trading day (holiday weeks) are dropped instead of
+        repeating the previous week's date.
+        """
+        anchors = pd.date_range(start, end, freq=freq)
+        if len(anchors) == 0 or len(self.dates) == 0:
+            return pd.DatetimeIndex([])
+
+        pos = self.dates.searchsorted(anchors, side='right') - 1
+        valid = pos >= 0
+        picked = self.dates[pos[valid]]
+        in_week = picked > (anchors[valid] - pd.Timedelta(days=7))
+        picked = picked[in_week & (picked >= pd.Timestamp(start))]
+        return pd.DatetimeIndex(picked.unique())
+
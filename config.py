@@ -41,6 +41,34 @@ REGIME_DIR = AUTOGLUON_BASE_DIR / "regime" / "results" / "regime_queries"
 THEME_TO_TICKERS_FILE = DATA_DIR / "theme_to_tickers.json"
 NAVER_THEME_ANALYSIS_FILE = DATA_DIR / "naver_theme_analysis.json"
 
+# Parsed ticker x theme membership index of db_final.csv / network_theme_data.csv
+# (cohesion/theme_index.py; rebuilt when the source file changes)
+THEME_INDEX_DIR = DATA_DIR / "theme_index"
+
+# Consolidated rolling Fiedler timeseries, keyed by (theme_id, date)
+# (written by scripts/analyze_naver_theme_cohesion.py)
+FIEDLER_TIMESERIES_DIR = DATA_DIR / "fiedler_timeseries"
+
+# Consolidated date x ticker price panel (built by Jobs/build_price_store.py)
+PRICE_STORE_DIR = Path(
+    os.getenv("KRX_PRICE_STORE_DIR", str(DATA_DIR / "price_store"))
+)
+
+# Shared float32 close/returns cube derived from the price store
+RETURNS_CUBE_DIR = Path(
+    os.getenv("KRX_RETURNS_CUBE_DIR", str(DATA_DIR / "returns_cube"))
+)
+
+# Persistent per-window spectral result cache (cohesion/spectral_cache.py)
+SPECTRAL_CACHE_FILE = Path(
+    os.getenv("KRX_SPECTRAL_CACHE_FILE", str(DATA_DIR / "spectral_cache.sqlite"))
+)
+
+# Streaming per-theme correlation state for the daily job (cohesion/daily_state.py)
+DAILY_STATE_FILE = Path(
+    os.getenv("KRX_DAILY_STATE_FILE", str(DATA_DIR / "daily_state.npz"))
+)
+
 # Default analysis parameters
 START_DATE = "2025-01-01"
 LOOKBACK_DAYS = 60
@@ -60,9 +88,15 @@ if __name__ == "__main__":
     print(f"  Price Data: {PRICE_DATA_DIR} {'(EXISTS)' if PRICE_DATA_DIR.exists() else '(NOT FOUND)'}")
     print(f"  AutoGluon Base: {AUTOGLUON_BASE_DIR} {'(EXISTS)' if AUTOGLUON_BASE_DIR.exists() else '(NOT FOUND)'}")
     print(f"  DB File: {DB_FILE} {'(EXISTS)' if DB_FILE.exists() else '(NOT FOUND)'}")
+    print(f"  Price Store: {PRICE_STORE_DIR} {'(EXISTS)' if (PRICE_STORE_DIR / 'index.json').exists() else '(NOT BUILT)'}")
+    print(f"  Returns Cube: {RETURNS_CUBE_DIR} {'(EXISTS)' if (RETURNS_CUBE_DIR / 'cube.json').exists() else '(NOT BUILT)'}")
+    print(f"  Spectral Cache: {SPECTRAL_CACHE_FILE} {'(EXISTS)' if SPECTRAL_CACHE_FILE.exists() else '(EMPTY)'}")
+    print(f"  Daily State: {DAILY_STATE_FILE} {'(EXISTS)' if DAILY_STATE_FILE.exists() else '(NOT BUILT)'}")
     print(f"\nLocal Files:")
     print(f"  Theme Mapping: {THEME_TO_TICKERS_FILE} {'(EXISTS)' if THEME_TO_TICKERS_FILE.exists() else '(NOT FOUND)'}")
+    print(f"  Theme Index: {THEME_INDEX_DIR} {'(EXISTS)' if THEME_INDEX_DIR.exists() else '(NOT BUILT)'}")
     print(f"  Naver Analysis: {NAVER_THEME_ANALYSIS_FILE} {'(EXISTS)' if NAVER_THEME_ANALYSIS_FILE.exists() else '(NOT FOUND)'}")
+    print(f"  Fiedler Timeseries: {FIEDLER_TIMESERIES_DIR} {'(EXISTS)' if (FIEDLER_TIMESERIES_DIR / 'themes.json').exists() else '(NOT BUILT)'}")
     print("=" * 80)
     print("\nTo override external paths, set environment variables:")
     print("  export KRX_PRICE_DATA_DIR=/path/to/price/data")
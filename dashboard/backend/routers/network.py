@@ -7,14 +7,19 @@ from fastapi import APIRouter, HTTPException, Query
 from typing import List, Dict, Optional
 import pandas as pd
 import numpy as np
-import ast
+from functools import lru_cache
 import sys
 from pathlib import Path
 import glob
 import re
+from concurrent.futures import ThreadPoolExecutor
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
 from config import DATA_DIR
+from cohesion.price_store import open_price_store, read_price_csv_tail, PRICE_READ_WORKERS
+from cohesion.timeseries_store import open_stock_roles
+from cohesion.theme_index import open_theme_index
+from cohesion.search_index import HangulSearchIndex, SUBSTRING_TIER
 
 router = APIRouter()
 
@@ -25,6 +30,7 @@ FIEDLER_WEEKLY_CSV = DATA_DIR / "naver_themes_weekly_fiedler_2025.csv"
 SIGNAL_PROB_DIR = Path("/mnt/nas/AutoGluon/AutoML_Krx/predictedProbability")
 PRICE_DATA_DIR = Path("/mnt/nas/AutoGluon/AutoML_Krx/KRXNOTTRAINED")
 SIGNAL_SCORES_JSON = DATA_DIR / "signal_scores.json"
+SIGNAL_LOOKBACK_ROWS = 252  # 52-week window; RSI only needs the last 15 rows
 
 # Cloud detection
 IS_CLOUD = not PRICE_DATA_DIR.exists()
@@ -35,14 +41,17 @@ _fiedler_cache = None
 _signal_prob_cache = {}
 _signal_score_cache = {}
 _baked_signal_scores = None  # pre-computed scores for Railway
-_all_themes_cache = None
+_theme_source = None  # CSV behind _theme_cache
+_theme_index = None  # parsed theme index of _theme_source (rows align with _theme_cache)
+_search_indexes = None  # (theme index, theme search, stock search, stock name -> row)
+_fiedler_map = None  # (fiedler frame, {theme: fiedler})
 _cache_date = None  # tracks which date caches were built for
 
 
 def _check_cache_freshness():
     """Invalidate all caches when date changes (new trading day data)"""
     global _theme_cache, _fiedler_cache, _signal_prob_cache, _signal_score_cache
-    global _all_themes_cache, _cache_date, _theme_ucs_cache
+    global _cache_date, _theme_ucs_cache
     from datetime import date
     today = date.today().isoformat()
     if _cache_date != today:
@@ -50,16 +59,20 @@ def _check_cache_freshness():
         _fiedler_cache = None
         _signal_prob_cache = {}
         _signal_score_cache = {}
-        _all_themes_cache = None
         _theme_ucs_cache = None
+        _cooccurrence_network.cache_clear()
         _cache_date = today
         print(f"[network] Cache invalidated for new date: {today}")
 
 
 def load_theme_data():
-    """Load and cache NaverTheme data - local first, NAS fallback"""
-    global _theme_cache
+    """Load and cache NaverTheme data - local first, NAS fallback (reloaded when the CSV changes)"""
+    global _theme_cache, _theme_source, _theme_index
     _check_cache_freshness()
+    if _theme_cache is not None and open_theme_index(_theme_source) is not _theme_index:
+        print(f"[network] {_theme_source.name} changed, reloading")
+        _theme_cache = None
+        _cooccurrence_network.cache_clear()
     if _theme_cache is None:
         print(f"[network] DATA_DIR: {DATA_DIR}")
         print(f"[network] LOCAL_THEME_CSV: {LOCAL_THEME_CSV}, exists: {LOCAL_THEME_CSV.exists()}")
@@ -69,18 +82,80 @@ def load_theme_data():
         if LOCAL_THEME_CSV.exists():
             print(f"[network] Loading from local: {LOCAL_THEME_CSV}")
             _theme_cache = pd.read_csv(LOCAL_THEME_CSV)
+            _theme_source = LOCAL_THEME_CSV
         # Fallback to NAS
         elif NAVER_THEME_CSV.exists():
             print(f"[network] Loading from NAS: {NAVER_THEME_CSV}")
             _theme_cache = pd.read_csv(NAVER_THEME_CSV)
+            _theme_source = NAVER_THEME_CSV
         else:
             raise HTTPException(
                 status_code=404,
                 detail=f"NaverTheme data not found. LOCAL: {LOCAL_THEME_CSV} (exists: {LOCAL_THEME_CSV.exists()}), NAS: {NAVER_THEME_CSV} (exists: {NAVER_THEME_CSV.exists()})"
             )
+        _theme_index = open_theme_index(_theme_source)
     return _theme_cache
 
 
+def load_theme_index():
+    """Parsed theme membership index of the loaded NaverTheme CSV (rows align with load_theme_data())"""
+    load_theme_data()
+    return _theme_index
+
+
+def load_search_indexes():
+    """
+    Hangul search indexes over theme and stock names, rebuilt only when the
+    theme CSV changes (they survive the daily cache reset).
+
+    Returns:
+        (theme_search, stock_search, stock_rows): HangulSearchIndex over themes and
+        stock names, and each stock name's first row in load_theme_data()
+    """
+    global _search_indexes
+    index = load_theme_index()
+    if _search_indexes is None or _search_indexes[0] is not index:
+        stock_rows = {}
+        for row, (name, has_name) in enumerate(zip(index.names, index.has_name)):
+            if has_name:
+                stock_rows.setdefault(name, row)
+        _search_indexes = (index, HangulSearchIndex(index.themes), HangulSearchIndex(stock_rows), stock_rows)
+        print(f"[network] Search index built: {index.n_themes} themes, {len(stock_rows)} stocks")
+    return _search_indexes[1:]
+
+
+def stock_market_cap_score():
+    """Secondary stock ranking for name search: market cap (None without the column)"""
+    df = load_theme_data()
+    if '시가총액' not in df.columns:
+        return None
+    _, _, stock_rows = load_search_indexes()
+    caps = df['시가총액'].to_numpy()
+    return lambda name: caps[stock_rows[name]]
+
+
+def find_stock_row(name: str):
+    """Row of a stock in load_theme_data(): exact name, else the largest partial name match (None if absent)"""
+    _, stock_search, stock_rows = load_search_indexes()
+    if name in stock_rows:
+        return stock_rows[name]
+    matches = stock_search.search(name, 1, score=stock_market_cap_score())
+    if matches and matches[0][1] <= SUBSTRING_TIER:
+        return stock_rows[matches[0][0]]
+    return None
+
+
+def find_theme(theme: str):
+    """Theme by exact name, else the best partial match by current Fiedler (None if absent)"""
+    if theme in load_theme_index().theme_ids:
+        return theme
+    theme_search, _, _ = load_search_indexes()
+    matches = theme_search.search(theme, 1, score=load_fiedler_map())
+    if matches and matches[0][1] <= SUBSTRING_TIER:
+        return matches[0][0]
+    return None
+
+
 def load_fiedler_data():
     """Load and cache Fiedler data"""
     global _fiedler_cache
@@ -95,6 +170,17 @@ def load_fiedler_data():
     return _fiedler_cache
 
 
+def load_fiedler_map():
+    """{theme: latest Fiedler} from load_fiedler_data() (empty without Fiedler data)"""
+    global _fiedler_map
+    fiedler_df = load_fiedler_data()
+    if _fiedler_map is None or _fiedler_map[0] is not fiedler_df:
+        values = {} if fiedler_df is None else {
+            theme: safe_float(f) for theme, f in zip(fiedler_df.index, fiedler_df['fiedler'])}
+        _fiedler_map = (fiedler_df, values)
+    return _fiedler_map[1]
+
+
 def get_signal_probability(stock_name: str) -> dict:
     """Load signal probability for a stock (daily cache)"""
     global _signal_prob_cache
@@ -167,13 +253,17 @@ def compute_signal_score(stock_name: str) -> dict:
         return result
 
     try:
-        price_file = PRICE_DATA_DIR / f"{stock_name}.csv"
-        if not price_file.exists():
-            _signal_score_cache[stock_name] = default
-            return default
+        store = open_price_store()
+        if store is not None and stock_name in store:
+            df = store.frames([stock_name], fields=('close', 'high', 'low')).get(stock_name)
+        else:
+            price_file = PRICE_DATA_DIR / f"{stock_name}.csv"
+            if not price_file.exists():
+                _signal_score_cache[stock_name] = default
+                return default
+            df = read_price_csv_tail(price_file, SIGNAL_LOOKBACK_ROWS)
 
-        df = pd.read_csv(price_file)
-        if len(df) < 15:
+        if df is None or len(df) < 15:
             _signal_score_cache[stock_name] = default
             return default
 
@@ -188,7 +278,7 @@ def compute_signal_score(stock_name: str) -> dict:
         rsi = 100 - 100 / (1 + rs)
 
         # 52-week high/low (last 252 trading days)
-        recent = df.tail(252)
+        recent = df.tail(SIGNAL_LOOKBACK_ROWS)
         high_52w = recent['high'].max()
         low_52w = recent['low'].min()
         current_price = closes[-1]
@@ -222,50 +312,13 @@ def compute_signal_score(stock_name: str) -> dict:
         return default
 
 
-def get_all_themes():
-    """Get all unique themes (cached)"""
-    global _all_themes_cache
-    if _all_themes_cache is None:
-        df = load_theme_data()
-        all_themes = set()
-        for themes_str in df['naverTheme'].dropna():
-            all_themes.update(parse_themes(themes_str))
-        _all_themes_cache = sorted(list(all_themes))
-    return _all_themes_cache
-
-
-def fuzzy_match(query: str, text: str) -> bool:
-    """Check if query matches text with partial/fuzzy matching"""
-    query = query.lower().strip()
-    text = text.lower()
-
-    # Direct contains match
-    if query in text:
-        return True
-
-    # Split query into words and check if all words are in text
-    words = query.split()
-    if len(words) > 1:
-        return all(word in text for word in words)
-
-    # Check for partial word match (at least 2 chars)
-    if len(query) >= 2:
-        # Remove common suffixes/prefixes for matching
-        for word in text.split():
-            if query in word or word in query:
-                return True
-
-    return False
-
-
-def parse_themes(themes_str):
-    """Parse theme list from string representation"""
-    if pd.isna(themes_str) or themes_str == '[]':
-        return []
-    try:
-        return ast.literal_eval(themes_str)
-    except:
-        return []
+def prefetch_signal_scores(stock_names):
+    """Compute uncached signal scores concurrently (NAS reads overlap)."""
+    _check_cache_freshness()
+    missing = list(dict.fromkeys(n for n in stock_names if n not in _signal_score_cache))
+    if len(missing) > 1:
+        with ThreadPoolExecutor(max_workers=PRICE_READ_WORKERS) as executor:
+            list(executor.map(compute_signal_score, missing))
 
 
 def safe_float(val, default=0.0):
@@ -302,17 +355,13 @@ async def get_stock_themes(
         df = load_theme_data()
         fiedler_df = load_fiedler_data()
 
-        # Find stock
-        stock_data = df[df['name'] == name]
-        if len(stock_data) == 0:
-            # Try partial match
-            stock_data = df[df['name'].str.contains(name, na=False)]
-
-        if len(stock_data) == 0:
+        # Find stock (exact, then partial match)
+        stock_row = find_stock_row(name)
+        if stock_row is None:
             raise HTTPException(status_code=404, detail=f"Stock not found: {name}")
 
-        row = stock_data.iloc[0]
-        themes = parse_themes(row.get('naverTheme', '[]'))
+        row = df.iloc[stock_row]
+        themes = load_theme_index().row_themes(stock_row)
 
         # Get Fiedler scores for themes
         theme_details = []
@@ -368,30 +417,11 @@ async def get_theme_stocks(
         df = load_theme_data()
         fiedler_df = load_fiedler_data()
 
-        # First try exact match
-        mask = df['naverTheme'].apply(lambda x: theme in parse_themes(x))
-        theme_stocks = df[mask].copy()
-        matched_theme = theme
-
-        # If no exact match, try partial match
-        if len(theme_stocks) == 0:
-            # Get all unique themes
-            all_themes = set()
-            for themes_str in df['naverTheme']:
-                for t in parse_themes(themes_str):
-                    all_themes.add(t)
-
-            # Find themes containing the search term
-            matching_themes = [t for t in all_themes if theme.lower() in t.lower()]
-
-            if matching_themes:
-                # Use the first matching theme
-                matched_theme = matching_themes[0]
-                mask = df['naverTheme'].apply(lambda x: matched_theme in parse_themes(x))
-                theme_stocks = df[mask].copy()
-
-        if len(theme_stocks) == 0:
+        # Exact match, else the best partial match; member rows from the theme index
+        matched_theme = find_theme(theme)
+        if matched_theme is None:
             raise HTTPException(status_code=404, detail=f"Theme not found: {theme}")
+        theme_stocks = df.iloc[load_theme_index().theme_rows(matched_theme)].copy()
 
         # Calculate score and sort
         theme_stocks['total_score'] = theme_stocks['1'].fillna(0) - theme_stocks['-1'].fillna(0)
@@ -412,6 +442,7 @@ async def get_theme_stocks(
                 cohesion_level = "weak"
 
         stocks = []
+        prefetch_signal_scores(theme_stocks.head(limit)['name'])
         for _, row in theme_stocks.head(limit).iterrows():
             stock_name = row['name']
             total_score = safe_float(row.get('total_score', 0))
@@ -465,45 +496,18 @@ async def search_themes(
     q: str = Query(..., description="Search query"),
     limit: int = Query(30, description="Max results")
 ):
-    """Search themes by name with fuzzy matching"""
+    """
+    Search themes by name (partial words, jamo and 초성 match, e.g. "ㅂㄷㅊ"),
+    ranked by match quality, then by current Fiedler
+    """
     try:
-        df = load_theme_data()
         fiedler_df = load_fiedler_data()
-        all_themes = get_all_themes()
-
-        # Filter by query with fuzzy matching
-        matching = [t for t in all_themes if fuzzy_match(q, t)]
-
-        # If no matches, try even more relaxed matching
-        if not matching and len(q) >= 2:
-            # Try matching any 2+ character substring
-            matching = [t for t in all_themes if any(
-                q.lower() in word.lower() or word.lower() in q.lower()
-                for word in t.replace('-', ' ').replace('/', ' ').split()
-            )]
-
-        # Sort by relevance (exact match first, then by Fiedler)
-        def sort_key(theme):
-            # Exact match gets highest priority
-            if q.lower() == theme.lower():
-                return (0, 0)
-            # Starts with query
-            if theme.lower().startswith(q.lower()):
-                return (1, 0)
-            # Contains query as word
-            if q.lower() in theme.lower().split():
-                return (2, 0)
-            # Get Fiedler for secondary sorting
-            fiedler = 0.0
-            if fiedler_df is not None and theme in fiedler_df.index:
-                fiedler = float(fiedler_df.loc[theme, 'fiedler'])
-            return (3, -fiedler)
-
-        matching.sort(key=sort_key)
+        theme_search, _, _ = load_search_indexes()
+        matching = theme_search.search(q, limit, score=load_fiedler_map())
 
         # Add Fiedler data
         results = []
-        for theme in matching[:limit]:
+        for theme, _ in matching:
             result = {"theme": theme, "fiedler": 0.0, "cohesion_level": "unknown"}
             if fiedler_df is not None and theme in fiedler_df.index:
                 fiedler_val = safe_float(fiedler_df.loc[theme, 'fiedler'])
@@ -523,7 +527,7 @@ async def search_themes(
             "query": q,
             "themes": results,
             "count": len(results),
-            "total_themes": len(all_themes)
+            "total_themes": len(theme_search)
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -534,16 +538,22 @@ async def search_all(
     q: str = Query(..., description="Search query"),
     limit: int = Query(20, description="Max results per type")
 ):
-    """Search both stocks and themes with fuzzy matching"""
+    """
+    Search both stocks and themes (partial words, jamo and 초성 match).
+    Stocks are ranked by match quality then market cap, themes by match
+    quality then current Fiedler.
+    """
     try:
         df = load_theme_data()
-        fiedler_df = load_fiedler_data()
-        all_themes = get_all_themes()
+        fiedler_map = load_fiedler_map()
+        theme_search, stock_search, stock_rows = load_search_indexes()
 
         # Search stocks
-        stock_matches = df[df['name'].apply(lambda x: fuzzy_match(q, str(x)))]
+        matches = stock_search.search(q, limit, score=stock_market_cap_score())
+        stock_matches = df.iloc[[stock_rows[name] for name, _ in matches]]
         stocks = []
-        for _, row in stock_matches.head(limit).iterrows():
+        prefetch_signal_scores(stock_matches['name'])
+        for _, row in stock_matches.iterrows():
             stock_name = row['name']
             ss = compute_signal_score(stock_name)
             stocks.append({
@@ -555,21 +565,14 @@ async def search_all(
             })
 
         # Search themes
-        theme_matches = [t for t in all_themes if fuzzy_match(q, t)]
         themes = []
-        for theme in theme_matches[:limit]:
-            fiedler = 0.0
-            if fiedler_df is not None and theme in fiedler_df.index:
-                fiedler = safe_float(fiedler_df.loc[theme, 'fiedler'])
+        for theme, _ in theme_search.search(q, limit, score=fiedler_map):
             themes.append({
                 "theme": theme,
-                "fiedler": safe_round(fiedler, 3),
+                "fiedler": safe_round(fiedler_map.get(theme, 0.0), 3),
                 "type": "theme"
             })
 
-        # Sort themes by Fiedler
-        themes.sort(key=lambda x: x['fiedler'], reverse=True)
-
         return {
             "success": True,
             "query": q,
@@ -591,10 +594,15 @@ async def get_graph_data(
     """
     Get graph data for vis.js network visualization.
     Returns nodes and edges for the theme-stock network.
+    In theme-centered graphs, stock nodes carry their cohesion role in that
+    theme (Fiedler loading, partition side, degree centrality) when the
+    cohesion run has exported stock roles.
     """
     try:
         df = load_theme_data()
         fiedler_df = load_fiedler_data()
+        theme_index = load_theme_index()
+        _, _, stock_rows = load_search_indexes()
 
         nodes = []
         edges = []
@@ -611,16 +619,16 @@ async def get_graph_data(
             else:
                 return "#ef4444"  # Red - weak
 
-        def add_stock_node(name, is_center=False):
+        def add_stock_node(name, is_center=False, role=None):
             if f"stock_{name}" in node_ids:
                 return
             node_ids.add(f"stock_{name}")
 
-            stock_data = df[df['name'] == name]
-            if len(stock_data) == 0:
+            stock_row = stock_rows.get(name)
+            if stock_row is None:
                 return
 
-            row = stock_data.iloc[0]
+            row = df.iloc[stock_row]
             ss = compute_signal_score(name)
             score = ss["overall"]
 
@@ -638,7 +646,7 @@ async def get_graph_data(
                 signal = "avoid"
                 color = "#ef4444"  # Red
 
-            nodes.append({
+            node = {
                 "id": f"stock_{name}",
                 "label": name,
                 "type": "stock",
@@ -649,7 +657,15 @@ async def get_graph_data(
                 "size": 45 if is_center else 30,
                 "color": color,
                 "isCenter": is_center
-            })
+            }
+            if role is not None:
+                node["cohesion_role"] = {
+                    "fiedler_loading": safe_round(role['fiedler_loading'], 4),
+                    "partition": int(role['partition']),
+                    "degree_centrality": safe_round(role['degree_centrality'], 3),
+                    "as_of": role['date'].strftime('%Y-%m-%d')
+                }
+            nodes.append(node)
 
         def add_theme_node(theme_name):
             if f"theme_{theme_name}" in node_ids:
@@ -682,16 +698,12 @@ async def get_graph_data(
         # Build graph based on center type
         if stock:
             # Stock-centered graph
-            stock_data = df[df['name'] == stock]
-            if len(stock_data) == 0:
-                stock_data = df[df['name'].str.contains(stock, na=False)]
-
-            if len(stock_data) == 0:
+            stock_row = find_stock_row(stock)
+            if stock_row is None:
                 raise HTTPException(status_code=404, detail=f"Stock not found: {stock}")
 
-            row = stock_data.iloc[0]
-            stock_name = row['name']
-            themes = parse_themes(row.get('naverTheme', '[]'))
+            stock_name = df.iloc[stock_row]['name']
+            themes = theme_index.row_themes(stock_row)
 
             # Add center stock
             add_stock_node(stock_name, is_center=True)
@@ -705,22 +717,30 @@ async def get_graph_data(
             # Theme-centered graph
             add_theme_node(theme)
 
+            roles = open_stock_roles()
+            theme_roles = None
+            if roles is not None:
+                theme_roles = roles[roles['theme'] == theme].set_index('ticker')
+
             # Get stocks in theme
-            mask = df['naverTheme'].apply(lambda x: theme in parse_themes(x))
-            theme_stocks = df[mask].copy()
+            theme_stocks = df.iloc[theme_index.theme_rows(theme)].copy()
 
             # Calculate score and get top stocks
             theme_stocks['total_score'] = theme_stocks['1'].fillna(0) - theme_stocks['-1'].fillna(0)
             theme_stocks = theme_stocks.sort_values('total_score', ascending=False).head(15)
+            prefetch_signal_scores(theme_stocks['name'])
 
-            for _, row in theme_stocks.iterrows():
+            for stock_row, (_, row) in zip(df.index.get_indexer(theme_stocks.index), theme_stocks.iterrows()):
                 stock_name = row['name']
-                add_stock_node(stock_name)
+                role = None
+                if theme_roles is not None and stock_name in theme_roles.index:
+                    role = theme_roles.loc[stock_name]
+                add_stock_node(stock_name, role=role)
                 add_edge(f"theme_{theme}", f"stock_{stock_name}")
 
                 # Depth 2: Add other themes for each stock
                 if depth >= 2:
-                    other_themes = parse_themes(row.get('naverTheme', '[]'))
+                    other_themes = theme_index.row_themes(stock_row)
                     for other_theme in other_themes[:5]:  # Limit to avoid clutter
                         if other_theme != theme:
                             add_theme_node(other_theme)
@@ -752,8 +772,85 @@ async def get_graph_data(
 # ---------------------------------------------------------------------------
 # Theme Co-occurrence Network (InfraNodus visualization data)
 # ---------------------------------------------------------------------------
-_cooccurrence_cache = None
+_cooccurrence_matrix = None  # (theme index, themes, sizes, counts) for the loaded data
 _theme_ucs_cache = None
+COOCCURRENCE_CACHE_SIZE = 128  # parameter combinations kept (slider positions)
+
+
+def _theme_cooccurrence_counts():
+    """
+    Theme x theme shared-stock counts for the loaded theme data.
+
+    Stocks are identified by name (rows sharing a name are one stock); with
+    B the [stocks x themes] 0/1 incidence, the counts are B^T B, computed
+    once per data version. The diagonal holds each theme's stock count.
+    B is dense (a few thousand stocks x a few hundred themes) so the
+    dashboard needs numpy only.
+    """
+    global _cooccurrence_matrix
+    index = load_theme_index()
+    if _cooccurrence_matrix is not None and _cooccurrence_matrix[0] is index:
+        return _cooccurrence_matrix[1:]
+
+    # Collapse rows to stocks by name (nameless rows stay separate stocks)
+    keys = [name if has_name else ('', row)
+            for row, (name, has_name) in enumerate(zip(index.names, index.has_name))]
+    stock_ids = {}
+    row_stock = np.array([stock_ids.setdefault(k, len(stock_ids)) for k in keys], dtype=np.int64)
+    incidence = np.zeros((len(stock_ids), index.n_themes), dtype=np.float32)
+    incidence[np.repeat(row_stock, index.theme_counts()), index.indices] = 1.0
+
+    counts = np.rint(incidence.T @ incidence).astype(np.int64)
+    sizes = np.diag(counts).copy()
+    _cooccurrence_matrix = (index, index.themes, sizes, counts)
+    return index.themes, sizes, counts
+
+
+@lru_cache(maxsize=COOCCURRENCE_CACHE_SIZE)
+def _cooccurrence_network(min_stocks: int, min_shared: int, max_themes: int):
+    """Co-occurrence nodes/edges for one parameter combination (cleared with the daily caches)."""
+    fiedler_df = load_fiedler_data()
+    themes, sizes, counts = _theme_cooccurrence_counts()
+
+    # Themes with enough stocks, by stock count (descending, ties in first-seen order), top N
+    valid = np.flatnonzero(sizes >= min_stocks)
+    selected = valid[np.argsort(-sizes[valid], kind='stable')][:max_themes]
+
+    # Build node list with metadata
+    nodes = []
+    for i, theme_id in enumerate(selected):
+        theme = themes[theme_id]
+        fiedler = 0.0
+        if fiedler_df is not None and theme in fiedler_df.index:
+            fiedler = safe_float(fiedler_df.loc[theme, 'fiedler'])
+        nodes.append({
+            "id": i,
+            "code": theme,
+            "label": theme,
+            "fiedler": safe_round(fiedler, 3),
+            "n_stocks": int(sizes[theme_id])
+        })
+
+    # Build edge list (co-occurrence = shared stocks) from the selected block
+    shared = counts[np.ix_(selected, selected)]
+    src, dst = np.triu_indices(len(selected), k=1)
+    keep = shared[src, dst] >= min_shared
+    edges = [{"source": int(i), "target": int(j), "weight": int(w)}
+             for i, j, w in zip(src[keep], dst[keep], shared[src, dst][keep])]
+
+    return {
+        "success": True,
+        "nodes": nodes,
+        "edges": edges,
+        "stats": {
+            "node_count": len(nodes),
+            "edge_count": len(edges),
+            "total_themes": len(themes),
+            "min_stocks": min_stocks,
+            "min_shared": min_shared
+        }
+    }
+
 
 @router.get("/theme-cooccurrence")
 async def theme_cooccurrence(
@@ -765,85 +862,16 @@ async def theme_cooccurrence(
     Build theme-to-theme co-occurrence network.
     Nodes = themes, Edges = shared stock count between theme pairs.
     Used for InfraNodus-style network visualization.
+
+    Shared-stock counts come from one incidence product per data
+    version; each (min_stocks, min_shared, max_themes) result is kept in an
+    LRU cache so slider changes are served from memory.
     """
-    global _cooccurrence_cache
     _check_cache_freshness()
-
-    cache_key = f"{min_stocks}_{min_shared}_{max_themes}"
-    if _cooccurrence_cache and _cooccurrence_cache.get("key") == cache_key:
-        return _cooccurrence_cache["data"]
-
     try:
-        df = load_theme_data()
-        fiedler_df = load_fiedler_data()
-
-        # Build theme → set of stocks mapping
-        theme_stocks_map = {}
-        for _, row in df.iterrows():
-            stock_name = row.get('name', '')
-            themes = parse_themes(row.get('naverTheme', '[]'))
-            for t in themes:
-                if t not in theme_stocks_map:
-                    theme_stocks_map[t] = set()
-                theme_stocks_map[t].add(stock_name)
-
-        # Filter themes by min stock count
-        valid_themes = {t: stocks for t, stocks in theme_stocks_map.items()
-                        if len(stocks) >= min_stocks}
-
-        # Sort by stock count (descending) and take top N
-        sorted_themes = sorted(valid_themes.keys(),
-                               key=lambda t: len(valid_themes[t]), reverse=True)
-        selected = sorted_themes[:max_themes]
-        selected_set = set(selected)
-
-        # Build node list with metadata
-        nodes = []
-        theme_idx = {}
-        for i, theme in enumerate(selected):
-            theme_idx[theme] = i
-            fiedler = 0.0
-            n_stocks = len(valid_themes[theme])
-            if fiedler_df is not None and theme in fiedler_df.index:
-                fiedler = safe_float(fiedler_df.loc[theme, 'fiedler'])
-            nodes.append({
-                "id": i,
-                "code": theme,
-                "label": theme,
-                "fiedler": safe_round(fiedler, 3),
-                "n_stocks": n_stocks
-            })
-
-        # Build edge list (co-occurrence = shared stocks)
-        edges = []
-        theme_list = list(selected)
-        for i in range(len(theme_list)):
-            for j in range(i + 1, len(theme_list)):
-                t1, t2 = theme_list[i], theme_list[j]
-                shared = len(valid_themes[t1] & valid_themes[t2])
-                if shared >= min_shared:
-                    edges.append({
-                        "source": theme_idx[t1],
-                        "target": theme_idx[t2],
-                        "weight": shared
-                    })
-
-        result = {
-            "success": True,
-            "nodes": nodes,
-            "edges": edges,
-            "stats": {
-                "node_count": len(nodes),
-                "edge_count": len(edges),
-                "total_themes": len(theme_stocks_map),
-                "min_stocks": min_stocks,
-                "min_shared": min_shared
-            }
-        }
-
-        _cooccurrence_cache = {"key": cache_key, "data": result}
-        return result
-
+        return _cooccurrence_network(min_stocks, min_shared, max_themes)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
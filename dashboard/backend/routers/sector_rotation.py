@@ -15,6 +15,7 @@ import json
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
 from config import DATA_DIR, REPORTS_DIR
+from cohesion.timeseries_store import open_fiedler_timeseries
 
 router = APIRouter()
 
@@ -160,21 +161,13 @@ async def get_fiedler_timeseries(
 ):
     """Get Fiedler value time series for a theme"""
     try:
-        # Load theme timeseries
-        theme_safe = theme.replace(' ', '_').replace('/', '_')
-        timeseries_file = DATA_DIR / f"theme_{theme_safe}_timeseries.csv"
+        # Load theme timeseries (consolidated table, cached per process)
+        table = open_fiedler_timeseries()
         
-        if not timeseries_file.exists():
+        if table is None or theme not in table:
             raise HTTPException(status_code=404, detail=f"Timeseries not found for theme: {theme}")
         
-        df = pd.read_csv(timeseries_file)
-        df['date'] = pd.to_datetime(df['date'])
-        
-        # Filter by date range
-        if start_date:
-            df = df[df['date'] >= pd.to_datetime(start_date)]
-        if end_date:
-            df = df[df['date'] <= pd.to_datetime(end_date)]
+        df = table.theme(theme, start_date, end_date)
         
         # Format for frontend
         timeseries = []
@@ -66,6 +66,18 @@ echo ""
 mkdir -p "${REPORT_DIR}"
 mkdir -p "${DATA_DIR}"
 
+# Step 0: Refresh the price store (only changed CSVs are re-parsed); a stale or
+# missing store makes every step read the CSVs, so a failure here is not fatal
+echo -e "${YELLOW}[0/13]${NC} Refreshing price store..."
+mkdir -p logs
+STORE_LOG="logs/build_price_store_${DATE}.log"
+if python3 Jobs/build_price_store.py > "${STORE_LOG}" 2>&1; then
+    echo -e "  ${GREEN}✓${NC}  Price store up to date"
+else
+    echo -e "  ${YELLOW}⚠${NC}  Price store build failed (see ${STORE_LOG}); steps read CSVs"
+fi
+echo ""
+
 # Step 1: Generate Naver theme cohesion analysis and report (optimized with incremental calculation)
 echo -e "${YELLOW}[1/13]${NC} Generating Naver theme cohesion analysis..."
 echo -e "  ${BLUE}→${NC}  Using optimized Fiedler calculation (sparse solver + incremental updates)"
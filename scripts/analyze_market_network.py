@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Market-Wide kNN Correlation Network Analysis
+
+Cohesion outside Naver theme boundaries: one sparse k-nearest-neighbour
+correlation graph over the whole universe per window (cohesion/knn_graph.py),
+its global Fiedler value and spectral clusters, and how those clusters line
+up with the Naver themes.
+
+Data Sources (configured via config.py):
+- Returns cube / price store (falls back to tail-reading PRICE_DATA_DIR CSVs)
+- Local data: data/theme_to_tickers.json
+
+Output:
+- data/market_network_{date}.csv: one row per window (global Fiedler, components, edges)
+- data/market_network_clusters_{date}.csv: per-ticker cluster, Fiedler loading and
+  degree in the latest window
+- data/market_network_theme_overlap_{date}.csv: best-matching themes per cluster
+- data/market_network_theme_concentration_{date}.csv: per-theme dominant cluster share
+
+Usage:
+    python scripts/analyze_market_network.py
+    python scripts/analyze_market_network.py --date 2025-10-27 --windows 12 --step 5
+    python scripts/analyze_market_network.py --k 15 --clusters 30
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config import PRICE_DATA_DIR, DATA_DIR, THEME_TO_TICKERS_FILE, LOOKBACK_DAYS
+from cohesion.price_store import open_price_store, read_price_tails
+from cohesion.returns_cube import open_returns_cube, _returns_from_close
+from cohesion.correlation import min_overlap_rows
+from cohesion.knn_graph import (knn_adjacency, market_spectrum, theme_overlap, theme_concentration,
+                                DEFAULT_K, DEFAULT_CLUSTERS)
+
+MIN_OVERLAP = 0.5  # Fraction of the window a ticker (and a pair) must cover
+STEP = 5           # Trading days between windows
+
+
+def load_returns(end_date, n_rows):
+    """
+    [dates x tickers] returns for the last n_rows trading days up to end_date.
+
+    Reads the returns cube when built, else the price store, else the tails
+    of the per-ticker CSVs.
+    """
+    start_date = end_date - timedelta(days=int(n_rows * 1.6) + 30)
+
+    cube = open_returns_cube()
+    if cube is not None:
+        returns = cube.panel('returns', start=start_date, end=end_date).astype(np.float64)
+        return returns.tail(n_rows)
+
+    store = open_price_store()
+    if store is not None:
+        close_panel = store.panel('close', start=start_date, end=end_date)
+    else:
+        frames = read_price_tails(sorted(PRICE_DATA_DIR.glob('*.csv')), n_rows + 1)
+        close_panel = pd.DataFrame({name: df['close'] for name, df in frames.items()}).sort_index()
+        close_panel = close_panel[close_panel.index <= end_date]
+
+    returns = _returns_from_close(close_panel.to_numpy(dtype=np.float64))
+    return pd.DataFrame(returns, index=close_panel.index, columns=close_panel.columns).tail(n_rows)
+
+
+def analyze_window(window_returns, k, n_clusters):
+    """kNN graph and spectrum of one window over the tickers with enough observations."""
+    need = min_overlap_rows(MIN_OVERLAP, len(window_returns))
+    window_returns = window_returns.loc[:, window_returns.notna().sum().to_numpy() >= need]
+
+    adj = knn_adjacency(window_returns.to_numpy(dtype=np.float64), k=k, min_periods=need)
+    spectrum = market_spectrum(adj, n_clusters)
+    return list(window_returns.columns), spectrum
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Market-wide kNN correlation network')
+    parser.add_argument('--date', type=str, default=None,
+                        help='Last window end date, YYYY-MM-DD (default: latest available)')
+    parser.add_argument('--k', type=int, default=DEFAULT_K,
+                        help=f'Neighbours per ticker (default: {DEFAULT_K})')
+    parser.add_argument('--clusters', type=int, default=DEFAULT_CLUSTERS,
+                        help=f'Spectral clusters (default: {DEFAULT_CLUSTERS})')
+    parser.add_argument('--window', type=int, default=LOOKBACK_DAYS,
+                        help=f'Trading days per window (default: {LOOKBACK_DAYS})')
+    parser.add_argument('--windows', type=int, default=1,
+                        help='Number of windows, ending every --step days back from --date (default: 1)')
+    parser.add_argument('--step', type=int, default=STEP,
+                        help=f'Trading days between windows (default: {STEP})')
+    args = parser.parse_args()
+
+    end_date = pd.Timestamp(args.date) if args.date else pd.Timestamp.now().normalize()
+
+    print("=" * 80)
+    print("MARKET-WIDE kNN CORRELATION NETWORK")
+    print("=" * 80)
+    print(f"End Date: {end_date.strftime('%Y-%m-%d')}")
+    print(f"Window: {args.window} days x {args.windows} (step {args.step})")
+    print(f"k: {args.k}, Clusters: {args.clusters}")
+    print("=" * 80)
+
+    with open(THEME_TO_TICKERS_FILE, 'r', encoding='utf-8') as f:
+        themes = json.load(f)
+    print(f"\nLoaded {len(themes)} Naver themes")
+
+    n_rows = args.window + (args.windows - 1) * args.step
+    returns = load_returns(end_date, n_rows)
+    if len(returns) < args.window:
+        print(f"ERROR: Only {len(returns)} trading days available (need {args.window})")
+        return
+    print(f"Loaded returns: {returns.shape[1]} tickers x {len(returns)} days "
+          f"({returns.index[0].strftime('%Y-%m-%d')} to {returns.index[-1].strftime('%Y-%m-%d')})")
+
+    print("\nBuilding kNN graphs...")
+    summary = []
+    latest = None
+    for end_pos in range(len(returns) - 1, args.window - 2, -args.step)[:args.windows][::-1]:
+        window_returns = returns.iloc[end_pos - args.window + 1:end_pos + 1]
+        started = time.time()
+        tickers, spectrum = analyze_window(window_returns, args.k, args.clusters)
+        window_end = window_returns.index[-1]
+        summary.append({
+            'date': window_end.strftime('%Y-%m-%d'),
+            'n_tickers': spectrum['n_nodes'],
+            'n_edges': spectrum['n_edges'],
+            'k': args.k,
+            'n_components': spectrum['n_components'],
+            'largest_component': spectrum['largest_component'],
+            'fiedler': spectrum['fiedler'],
+            'component_fiedler': spectrum['component_fiedler'],
+            'n_clusters': int(len(np.unique(spectrum['clusters'][spectrum['clusters'] >= 0]))),
+        })
+        print(f"  {window_end.strftime('%Y-%m-%d')}: {spectrum['n_nodes']} tickers, "
+              f"{spectrum['n_edges']} edges, {spectrum['n_components']} components, "
+              f"Fiedler {spectrum['fiedler']:.4f} (largest component {spectrum['component_fiedler']:.4f}) "
+              f"[{time.time() - started:.1f}s]")
+        latest = (window_end, tickers, spectrum)
+
+    window_end, tickers, spectrum = latest
+    clusters = pd.Series(spectrum['clusters'], index=tickers)
+    stock_themes = {}
+    for theme, members in themes.items():
+        for t in members:
+            stock_themes.setdefault(t, []).append(theme)
+    cluster_df = pd.DataFrame({
+        'ticker': tickers,
+        'cluster': spectrum['clusters'],
+        'fiedler_loading': spectrum['fiedler_vector'],
+        'degree': spectrum['degree'],
+        'themes': [', '.join(stock_themes.get(t, [])) for t in tickers],
+    }).sort_values(['cluster', 'degree'], ascending=[True, False])
+    overlap_df = theme_overlap(clusters, themes)
+    concentration_df = theme_concentration(clusters, themes).sort_values(
+        ['dominant_share', 'n_stocks'], ascending=False)
+
+    date_str = window_end.strftime('%Y%m%d')
+    outputs = {
+        DATA_DIR / f"market_network_{date_str}.csv": pd.DataFrame(summary),
+        DATA_DIR / f"market_network_clusters_{date_str}.csv": cluster_df,
+        DATA_DIR / f"market_network_theme_overlap_{date_str}.csv": overlap_df,
+        DATA_DIR / f"market_network_theme_concentration_{date_str}.csv": concentration_df,
+    }
+    print("\nSaving results...")
+    for path, df in outputs.items():
+        df.to_csv(path, index=False, encoding='utf-8-sig')
+        print(f"  {path}")
+
+    print("\n" + "=" * 80)
+    print(f"SPECTRAL CLUSTERS ({window_end.strftime('%Y-%m-%d')})")
+    print("=" * 80)
+    if len(overlap_df) > 0:
+        best = overlap_df.sort_values('jaccard', ascending=False).drop_duplicates('cluster')
+        for _, row in best.sort_values('cluster').iterrows():
+            print(f"  Cluster {row['cluster']:>3} ({row['cluster_size']:>4} stocks): "
+                  f"{row['theme']} (Jaccard {row['jaccard']:.2f}, "
+                  f"{row['overlap']}/{row['theme_size']} theme stocks)")
+    if len(concentration_df) > 0:
+        multi = concentration_df[concentration_df['n_stocks'] >= 5]
+        print(f"\nThemes with >= 5 stocks: {len(multi)}, "
+              f"median dominant-cluster share {multi['dominant_share'].median():.2f}")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
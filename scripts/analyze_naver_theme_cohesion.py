@@ -9,26 +9,32 @@ Data Sources (configured via config.py):
 - Local data: data/theme_to_tickers.json
 
 Output:
-- Rolling Fiedler values for each theme
+- Rolling Fiedler values and spectral features for each theme (data/fiedler_timeseries/, one table)
+- Per-stock cohesion roles (Fiedler loading, partition, degree centrality) from each theme's latest window
 - Themes with enhanced cohesion (increasing Fiedler)
 - Current cohesion ranking as of 2025-10-27
 """
 
 import pandas as pd
 import numpy as np
-import networkx as nx
 from pathlib import Path
 from datetime import datetime, timedelta
-import ast
 import warnings
-from scipy.sparse.linalg import eigsh
-from scipy.sparse import csr_matrix
 warnings.filterwarnings('ignore')
 
 # Configuration - use config module for self-contained project
 import sys
 sys.path.insert(0, str(Path(__file__).parent))
-from config import PRICE_DATA_DIR, DB_FILE, DATA_DIR, AUTOGLUON_BASE_DIR, REPORTS_DIR
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config import (PRICE_DATA_DIR, DB_FILE, DATA_DIR, AUTOGLUON_BASE_DIR, REPORTS_DIR,
+                    FIEDLER_TIMESERIES_DIR, CORRELATION_THRESHOLD)
+from cohesion.price_store import open_price_store, read_price_csv
+from cohesion.returns_cube import open_returns_cube
+from cohesion.fiedler import FiedlerTracker, compute_fiedler, SPECTRAL_FEATURE_K
+from cohesion.correlation import rolling_corr, rolling_nan_corr
+from cohesion.spectral_cache import SpectralCache
+from cohesion.timeseries_store import FiedlerTimeseriesStore, open_fiedler_timeseries
+from cohesion.theme_index import open_theme_index, THEMES_MISSING
 import argparse
 
 PRICE_DIR = PRICE_DATA_DIR
@@ -37,49 +43,25 @@ REPORTS_DIR.mkdir(parents=True, exist_ok=True)
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
 # Analysis parameters
-THRESHOLD = 0.25  # Correlation threshold for network edges
+THRESHOLD = CORRELATION_THRESHOLD  # Correlation threshold for network edges (config)
 WINDOW = 20       # Rolling window in days
-MIN_OVERLAP = 15  # Minimum overlapping data points
+MIN_OVERLAP = 0   # 0 = listwise dropna (published numbers); --min-overlap 15 opts into pairwise-complete
 STEP = 5          # Step size for rolling window
 MIN_STOCKS = 3    # Minimum stocks required per theme
 LOOKBACK_DAYS = 30  # Days to look back for cohesion change
 
 
 def load_naver_themes():
-    """Load and parse Naver theme database with ticker->name mapping"""
+    """Load Naver theme membership (parsed theme index of the DB) with ticker->name mapping"""
     print("Loading Naver theme database...")
 
-    df = pd.read_csv(DB_FILE)
+    index = open_theme_index(DB_FILE)
 
-    # Parse naverTheme column - use Korean name for CSV file matching
-    theme_stocks = {}
-    stock_themes = {}
-    ticker_map = {}
-
-    for _, row in df.iterrows():
-        ticker = row['tickers']
-        stock_name = row['name']  # Korean name to match CSV files
-        themes_str = row['naverTheme']
-
-        if pd.isna(themes_str) or pd.isna(stock_name):
-            continue
-
-        # Store ticker->name mapping
-        ticker_map[ticker] = stock_name
-
-        try:
-            themes = ast.literal_eval(themes_str)
-            if isinstance(themes, list):
-                for theme in themes:
-                    if theme not in theme_stocks:
-                        theme_stocks[theme] = []
-                    theme_stocks[theme].append(stock_name)  # Store name not ticker
-
-                    if stock_name not in stock_themes:
-                        stock_themes[stock_name] = []
-                    stock_themes[stock_name].append(theme)
-        except:
-            continue
+    # Rows with a name and a naverTheme value - use Korean name for CSV file matching
+    rows = index.has_name & (index.status != THEMES_MISSING)
+    ticker_map = {index.tickers[i]: index.names[i] for i in np.flatnonzero(rows)}
+    theme_stocks = index.theme_members(index.names, rows=rows)  # Store name not ticker
+    stock_themes = index.member_themes(index.names, rows=rows)
 
     # Filter themes with minimum stocks
     theme_stocks = {k: v for k, v in theme_stocks.items() if len(v) >= MIN_STOCKS}
@@ -97,19 +79,38 @@ def load_price_data(stock_names):
     data_dict = {}
     missing = []
 
+    cube = open_returns_cube()
+    if cube is not None:
+        data_dict = cube.frames(stock_names, start='2024-01-01', min_rows=50)
+        missing = [s for s in stock_names if s not in cube]
+        print(f"Loaded: {len(data_dict)}, Missing: {len(missing)} (returns cube)")
+        return data_dict
+
+    store = open_price_store()
+    if store is not None:
+        close_panel = store.panel('close', tickers=stock_names, start='2024-01-01')
+        for stock_name in close_panel.columns:
+            prices = close_panel[stock_name].dropna()
+            if len(prices) >= 50:
+                data_dict[stock_name] = prices
+        missing = [s for s in stock_names if s not in store]
+        print(f"Loaded: {len(data_dict)}, Missing: {len(missing)} (price store)")
+        return data_dict
+
     for stock_name in stock_names:
         csv_file = PRICE_DIR / f"{stock_name}.csv"
         if csv_file.exists():
             try:
-                df = pd.read_csv(csv_file, index_col=0, parse_dates=True)
-                close_col = 'Close' if 'Close' in df.columns else 'close'
-
-                if close_col in df.columns:
-                    df = df[df.index >= '2024-01-01']
-                    if len(df) >= 50:
-                        data_dict[stock_name] = df[close_col]
-            except:
+                df = read_price_csv(csv_file)
+            except Exception as e:
+                print(f"  Failed to parse {csv_file.name}: {type(e).__name__}: {e}")
+                df = None
+            if df is None:
                 missing.append(stock_name)
+                continue
+            df = df[df.index >= '2024-01-01']
+            if len(df) >= 50:
+                data_dict[stock_name] = df['close']
         else:
             missing.append(stock_name)
 
@@ -117,58 +118,71 @@ def load_price_data(stock_names):
     return data_dict
 
 
-def calculate_fiedler_value(returns_df, threshold=0.25):
-    """Calculate Fiedler value for correlation network (optimized with sparse solver)"""
-
-    if len(returns_df.columns) < 2:
-        return 0.0, 0, 0.0, 0.0, False
-
-    # Calculate correlation
-    corr_matrix = returns_df.corr()
-
-    # Build network
-    G = nx.Graph()
-    G.add_nodes_from(corr_matrix.index)
-
-    n_edges = 0
-    for i in range(len(corr_matrix)):
-        for j in range(i+1, len(corr_matrix)):
-            if abs(corr_matrix.iloc[i, j]) >= threshold:
-                G.add_edge(corr_matrix.index[i], corr_matrix.index[j],
-                          weight=abs(corr_matrix.iloc[i, j]))
-                n_edges += 1
-
-    # Calculate Fiedler
-    if n_edges == 0:
-        return 0.0, len(corr_matrix), 0, 0.0, False
-
-    try:
-        # Use sparse Laplacian and sparse eigenvalue solver (5-10x faster)
-        L_sparse = nx.laplacian_matrix(G, weight='weight')
-        n = L_sparse.shape[0]
-        
-        # Only calculate 2 smallest eigenvalues (we only need the 2nd one)
-        if n > 1:
-            eigenvalues = eigsh(L_sparse, k=min(2, n-1), which='SM', return_eigenvectors=False)
-            eigenvalues = np.sort(eigenvalues)
-            fiedler = float(eigenvalues[1]) if len(eigenvalues) >= 2 else 0.0
-        else:
-            fiedler = 0.0
-        
-        is_connected = nx.is_connected(G)
-        density = nx.density(G)
-
-        # Calculate mean correlation
-        corr_values = corr_matrix.values[np.triu_indices_from(corr_matrix.values, k=1)]
-        mean_corr = np.mean(corr_values)
-
-        return fiedler, len(corr_matrix), n_edges, mean_corr, is_connected
-    except:
-        return 0.0, len(corr_matrix), n_edges, 0.0, False
-
-
-def calculate_rolling_theme_fiedler(theme_name, stock_names, data_dict, target_date=None, incremental=True):
-    """Calculate rolling Fiedler values for a theme (with incremental update support)"""
+def spectral_fields(result):
+    """Scalar eigenvalue columns (lambda_3 .. lambda_k) of a return_features result."""
+    eigenvalues = result['eigenvalues']
+    return {f'lambda_{i}': float(eigenvalues[i - 1]) if len(eigenvalues) >= i else np.nan
+            for i in range(3, SPECTRAL_FEATURE_K + 1)}
+
+
+def stock_roles(date, tickers, result):
+    """Per-stock roles of one window: Fiedler loading, partition side, degree centrality."""
+    vector = result['fiedler_vector']
+    return pd.DataFrame({
+        'date': date,
+        'ticker': list(tickers),
+        'fiedler_loading': vector,
+        'partition': np.where(vector >= 0, 1, -1),
+        'degree_centrality': result['degree_centrality']
+    })
+
+
+def window_correlations(returns_df, step, min_overlap=MIN_OVERLAP):
+    """
+    (end_pos, tickers, corr) for every rolling window.
+
+    Complete panels (always the case listwise) use rolling_corr; ragged ones
+    (listings, halts) are correlated pairwise-complete, keeping the stocks
+    with at least min_overlap returns in the window.
+    """
+    values = returns_df.to_numpy()
+    columns = returns_df.columns
+    if not np.isnan(values).any():
+        for end_pos, corr in rolling_corr(values, WINDOW, step):
+            yield end_pos, columns, corr
+        return
+
+    for end_pos, corr, counts in rolling_nan_corr(values, WINDOW, step, min_overlap):
+        members = np.flatnonzero(np.diag(counts) >= min_overlap)
+        if len(members) >= MIN_STOCKS:
+            yield end_pos, columns[members], corr[np.ix_(members, members)]
+
+
+def calculate_rolling_theme_fiedler(theme_name, stock_names, data_dict, target_date=None, incremental=True,
+                                   step=STEP, tracker=None, stored=None, cache=None, roles=None,
+                                   min_overlap=MIN_OVERLAP):
+    """
+    Calculate rolling Fiedler values for a theme (with incremental update support).
+
+    Window correlations come from running sums updated as days enter and leave
+    the window, so step=1 (daily resolution) costs little more than step=5.
+    By default only days on which every stock has a return are kept
+    (listwise, as published). With min_overlap > 0 returns are outer-aligned
+    instead: a stock that listed or halted mid-year drops out of the windows
+    where it has fewer than min_overlap returns rather than truncating the
+    whole theme's history.
+    Each window's eigen solve is warm-started from the previous window's
+    Fiedler vector (tracker, keyed by theme). Previous results for the
+    incremental update come from the consolidated timeseries table (stored).
+    Windows already solved for the same stock set (another theme, or an
+    earlier run) are taken from the spectral cache.
+
+    Every window also carries spectral features (lambda_3, lambda_4,
+    spectral_gap) from the same decomposition; if roles is a dict, the
+    latest window's per-stock roles are stored in roles[theme_name].
+    """
+    if tracker is None:
+        tracker = FiedlerTracker(THRESHOLD, weighted=True, features=True)
 
     # Filter to stocks in this theme that have data
     available_stocks = [s for s in stock_names if s in data_dict]
@@ -186,7 +200,9 @@ def calculate_rolling_theme_fiedler(theme_name, stock_names, data_dict, target_d
     if len(returns_dict) < MIN_STOCKS:
         return pd.DataFrame()
 
-    returns_df = pd.DataFrame(returns_dict).dropna()
+    returns_df = pd.DataFrame(returns_dict)
+    if not min_overlap:
+        returns_df = returns_df.dropna()  # listwise: days every stock traded
 
     # Filter to 2025
     returns_df = returns_df[returns_df.index >= '2025-01-01']
@@ -196,13 +212,10 @@ def calculate_rolling_theme_fiedler(theme_name, stock_names, data_dict, target_d
 
     # Try to load previous results for incremental update
     prev_results = pd.DataFrame()
-    if incremental and target_date:
-        safe_name = theme_name.replace('/', '_').replace(' ', '_').replace('(', '').replace(')', '')[:50]
-        prev_file = OUTPUT_DIR / f'theme_{safe_name}_timeseries.csv'
-        if prev_file.exists():
+    if incremental and target_date and stored is not None:
+        if theme_name in stored:
             try:
-                prev_results = pd.read_csv(prev_file, parse_dates=['date'])
-                prev_results['date'] = pd.to_datetime(prev_results['date'])
+                prev_results = stored.theme(theme_name)
                 last_date = prev_results['date'].max()
                 target_dt = pd.to_datetime(target_date)
                 
@@ -219,25 +232,44 @@ def calculate_rolling_theme_fiedler(theme_name, stock_names, data_dict, target_d
     # Calculate rolling Fiedler
     results = []
 
-    for i in range(0, len(returns_df) - WINDOW + 1, STEP):
-        window_data = returns_df.iloc[i:i+WINDOW]
-
-        if len(window_data) < MIN_OVERLAP:
-            continue
-
-        date = window_data.index[-1]
-
-        fiedler, n_stocks, n_edges, mean_corr, is_connected = calculate_fiedler_value(window_data, THRESHOLD)
+    cache_params = {'window': WINDOW, 'threshold': THRESHOLD, 'weighted': True,
+                    'features': SPECTRAL_FEATURE_K, 'min_overlap': min_overlap}
+    last = None
+    for end_pos, tickers, corr in window_correlations(returns_df, step, min_overlap):
+        key = None
+        result = None
+        if cache is not None:
+            window_returns = returns_df.iloc[end_pos - WINDOW + 1:end_pos + 1][tickers]
+            key = cache.key('rolling', tickers, window_returns.index[0], window_returns.index[-1],
+                            cache_params, cache.fingerprint(window_returns))
+            result = cache.get(key)
+        if result is None:
+            result = tracker.compute(theme_name, corr, tickers)
+            result.update(spectral_fields(result))
+            if key is not None:
+                cache.put(key, result)
+        last = (end_pos, tickers, corr, result)
 
         results.append({
-            'date': date,
-            'fiedler': fiedler,
-            'n_stocks': n_stocks,
-            'n_edges': n_edges,
-            'mean_correlation': mean_corr,
-            'is_connected': is_connected
+            'date': returns_df.index[end_pos],
+            'fiedler': result['fiedler'],
+            'n_stocks': result['n_stocks'],
+            'n_edges': result['n_edges'],
+            'mean_correlation': result['mean_correlation'],
+            'is_connected': result['is_connected'],
+            'lambda_3': result['lambda_3'],
+            'lambda_4': result['lambda_4'],
+            'spectral_gap': result['spectral_gap']
         })
 
+    if roles is not None and last is not None:
+        end_pos, tickers, corr, result = last
+        if result.get('fiedler_vector') is None:
+            # Cached window (scalars only): one more solve for the vectors
+            result = compute_fiedler(corr, THRESHOLD, weighted=True, return_features=True)
+        if result['fiedler_vector'] is not None:
+            roles[theme_name] = stock_roles(returns_df.index[end_pos], tickers, result)
+
     new_results = pd.DataFrame(results)
     
     # Combine with previous results if available
@@ -380,6 +412,14 @@ def main():
     parser = argparse.ArgumentParser(description='Naver Theme Cohesion Analysis')
     parser.add_argument('--date', type=str, default=None,
                        help='Target date in YYYY-MM-DD format (default: from libPath.txt or today)')
+    parser.add_argument('--step', type=int, default=STEP,
+                       help=f'Trading days between rolling windows (default: {STEP}; 1 = daily resolution)')
+    parser.add_argument('--min-overlap', type=int, default=MIN_OVERLAP,
+                       help=f'Minimum returns per stock and pair in a {WINDOW}-day window '
+                            f'(default: {MIN_OVERLAP} = listwise dropna, as published). Opt-in, '
+                            'e.g. --min-overlap 15: ragged histories are correlated pairwise-complete, '
+                            'which changes the Fiedler values; stored series from the other mode '
+                            'are recomputed')
     args = parser.parse_args()
     
     # Set target date - priority: 1) command line arg, 2) libPath.txt, 3) today
@@ -431,13 +471,30 @@ def main():
 
     theme_timeseries = {}
     theme_changes = {}
+    theme_roles = {}
+    tracker = FiedlerTracker(THRESHOLD, weighted=True, features=True)
+    spectral_cache = SpectralCache()
+    stored = open_fiedler_timeseries(theme_names=theme_stocks.keys())
+    run_params = {'min_overlap': args.min_overlap}
+    stale_mode = None
+    if stored is not None:
+        # Legacy per-theme files were always listwise; a table without params is unknown
+        stored_params = stored.params if FiedlerTimeseriesStore(FIEDLER_TIMESERIES_DIR).exists() \
+            else {'min_overlap': 0}
+        if stored_params != run_params:
+            print(f"Stored timeseries params {stored_params} differ from {run_params}: "
+                  f"recomputing every theme instead of appending")
+            stale_mode, stored = stored, None
 
     for i, (theme, tickers) in enumerate(theme_stocks.items(), 1):
         if i % 20 == 0:
             print(f"Progress: {i}/{len(theme_stocks)} themes...")
 
         # Use incremental calculation (only calculate new windows)
-        ts_df = calculate_rolling_theme_fiedler(theme, tickers, data_dict, TARGET_DATE, incremental=True)
+        ts_df = calculate_rolling_theme_fiedler(theme, tickers, data_dict, TARGET_DATE, incremental=True,
+                                                step=args.step, tracker=tracker, stored=stored,
+                                                cache=spectral_cache, roles=theme_roles,
+                                                min_overlap=args.min_overlap)
 
         if len(ts_df) > 0:
             theme_timeseries[theme] = ts_df
@@ -448,17 +505,29 @@ def main():
                 theme_changes[theme] = change_info
 
     print(f"\nAnalyzed {len(theme_timeseries)} themes with sufficient data")
+    spectral_cache.flush()
+    print(f"Eigen solves: {tracker.summary()}")
+    print(f"Spectral cache: {spectral_cache.summary()}")
 
-    # Save individual theme timeseries
+    # Save theme timeseries to the consolidated (theme_id, date) table
     print("\n" + "="*80)
     print("Saving Theme Timeseries Data")
     print("="*80)
 
-    for theme, ts_df in theme_timeseries.items():
-        safe_name = theme.replace('/', '_').replace(' ', '_').replace('(', '').replace(')', '')[:50]
-        ts_df.to_csv(OUTPUT_DIR / f'theme_{safe_name}_timeseries.csv', index=False)
-
-    print(f"Saved {len(theme_timeseries)} theme timeseries files")
+    ts_store = FiedlerTimeseriesStore(FIEDLER_TIMESERIES_DIR)
+    to_write = theme_timeseries
+    if stale_mode is not None:
+        # Drop rows computed under the other params rather than mixing modes
+        to_write = {**{theme: None for theme in stale_mode.themes}, **theme_timeseries}
+    elif not ts_store.exists() and stored is not None:
+        # First run on the table: carry over legacy-file themes not recomputed here
+        to_write = {**stored.by_theme(), **theme_timeseries}
+
+    summary = ts_store.write(to_write, params=run_params)
+    print(f"Saved {summary['themes']} theme timeseries ({summary['rows']} rows, "
+          f"{summary['new_themes']} new themes) to {FIEDLER_TIMESERIES_DIR}")
+    n_roles = ts_store.write_roles(theme_roles)
+    print(f"Saved stock roles for {len(theme_roles)} themes ({n_roles} rows)")
 
     # Create summary report
     print("\n" + "="*80)
@@ -582,7 +651,7 @@ def main():
     print(f"\nOutput Files:")
     print(f"  {OUTPUT_DIR}/enhanced_cohesion_themes_{TARGET_DATE.replace('-', '')}.csv")
     print(f"  {OUTPUT_DIR}/theme_cohesion_ranking_{TARGET_DATE.replace('-', '')}.csv")
-    print(f"  {OUTPUT_DIR}/theme_*_timeseries.csv (individual theme files)")
+    print(f"  {FIEDLER_TIMESERIES_DIR}/ (consolidated theme timeseries table + stock_roles.csv)")
     print(f"  {report_file}")
 
 
@@ -7,52 +7,36 @@ Ranks themes by increase in cohesion.
 """
 
 import pandas as pd
-import numpy as np
 from pathlib import Path
-import ast
-from scipy.linalg import eigh
 import warnings
 warnings.filterwarnings('ignore')
 
 # Paths - use config module for self-contained project
 import sys
 sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent.parent))
 from config import PRICE_DATA_DIR, DB_FILE, DATA_DIR, AUTOGLUON_BASE_DIR
+from cohesion.price_store import open_price_store, read_price_csv
+from cohesion.fiedler import compute_fiedler, FiedlerTracker
+from cohesion.correlation import pairwise_corr
+from cohesion.trading_calendar import TradingCalendar
+from cohesion.theme_index import open_theme_index
 
 BASE_DIR = AUTOGLUON_BASE_DIR
 PRICE_DIR = PRICE_DATA_DIR
 OUTPUT_DIR = DATA_DIR
 OUTPUT_DIR.mkdir(exist_ok=True)
 
+MIN_OVERLAP = 0.5  # Stocks and pairs need returns on half the period's rows
+
 def load_naver_themes():
-    """Load and parse Naver theme database"""
+    """Load Naver theme membership from the parsed theme index of the DB"""
     print("Loading Naver themes from database...")
-    df = pd.read_csv(DB_FILE)
-
-    theme_stocks = {}
-    stock_themes = {}
-    ticker_map = {}
-
-    for _, row in df.iterrows():
-        ticker = row['tickers']
-        stock_name = row['name']
-        themes_str = row['naverTheme']
+    index = open_theme_index(DB_FILE)
 
-        ticker_map[ticker] = stock_name
-
-        try:
-            themes = ast.literal_eval(themes_str)
-            if isinstance(themes, list):
-                for theme in themes:
-                    if theme not in theme_stocks:
-                        theme_stocks[theme] = []
-                    theme_stocks[theme].append(stock_name)
-
-                    if stock_name not in stock_themes:
-                        stock_themes[stock_name] = []
-                    stock_themes[stock_name].append(theme)
-        except:
-            continue
+    ticker_map = dict(zip(index.tickers, index.names))
+    theme_stocks = index.theme_members(index.names, rows=index.has_name)
+    stock_themes = index.member_themes(index.names, rows=index.has_name)
 
     print(f"Loaded {len(theme_stocks)} themes")
     print(f"Loaded {len(stock_themes)} stocks with theme assignments")
@@ -65,6 +49,15 @@ def load_price_data(stock_names):
     missing = []
     loaded_count = 0
 
+    store = open_price_store()
+    if store is not None:
+        frames = store.frames(stock_names, fields=('close',))
+        for stock_name, df in frames.items():
+            price_data[stock_name] = df.rename(columns={'close': 'Close'})
+        missing = [s for s in stock_names if s not in price_data]
+        print(f"Loaded: {len(price_data)}, Missing: {len(missing)} (price store)")
+        return price_data
+
     for stock_name in stock_names:
         file_path = PRICE_DIR / f"{stock_name}.csv"
 
@@ -73,32 +66,28 @@ def load_price_data(stock_names):
             continue
 
         try:
-            df = pd.read_csv(file_path, index_col=0)
-            df.index = pd.to_datetime(df.index)
-            df.index.name = 'Date'
-
-            # Column might be 'close' or 'Close'
-            close_col = None
-            if 'close' in df.columns:
-                close_col = 'close'
-            elif 'Close' in df.columns:
-                close_col = 'Close'
-
-            if close_col is not None:
-                df = df.sort_index()
-                price_data[stock_name] = df[[close_col]].rename(columns={close_col: 'Close'})
-                loaded_count += 1
-                if loaded_count % 500 == 0:
-                    print(f"  Loaded {loaded_count} files...")
+            df = read_price_csv(file_path)
         except Exception as e:
+            print(f"  Failed to parse {file_path.name}: {type(e).__name__}: {e}")
+            df = None
+        if df is None:
             missing.append(stock_name)
             continue
 
+        price_data[stock_name] = df[['close']].rename(columns={'close': 'Close'})
+        loaded_count += 1
+        if loaded_count % 500 == 0:
+            print(f"  Loaded {loaded_count} files...")
+
     print(f"Loaded: {len(price_data)}, Missing: {len(missing)}")
     return price_data
 
-def calculate_fiedler_for_period(price_data, stocks, start_date, end_date):
-    """Calculate Fiedler value for a specific time period"""
+def calculate_fiedler_for_period(price_data, stocks, start_date, end_date, tracker=None, key=None):
+    """Calculate Fiedler value for a specific time period
+
+    With a FiedlerTracker the solve is warm-started from the same key's
+    previous period (week before -> last week).
+    """
     # Get price data for the period
     returns_dict = {}
 
@@ -119,66 +108,37 @@ def calculate_fiedler_for_period(price_data, stocks, start_date, end_date):
     if len(returns_dict) < 3:
         return None
 
-    # Align returns by date
-    returns_df = pd.DataFrame(returns_dict)
-    returns_df = returns_df.dropna(axis=1, thresh=len(returns_df)*0.5)
+    # Pairwise-complete correlation over the union of dates (min-overlap rule)
+    corr, _ = pairwise_corr(pd.DataFrame(returns_dict), MIN_OVERLAP)
 
-    if len(returns_df.columns) < 3:
+    if len(corr.columns) < 3:
         return None
 
-    # Calculate correlation matrix
-    corr_matrix = returns_df.corr()
-
-    # Build adjacency matrix (correlation > 0.25)
-    threshold = 0.25
-    adj_matrix = (corr_matrix.abs() > threshold).astype(float)
-    np.fill_diagonal(adj_matrix.values, 0)
-
-    # Calculate degree matrix
-    degree = adj_matrix.sum(axis=1)
-    if degree.sum() == 0:
+    # Build thresholded correlation graph and solve its Laplacian (shared kernel)
+    if tracker is not None:
+        result = tracker.compute(key, corr, corr.columns)
+    else:
+        result = compute_fiedler(corr, threshold=0.25)
+    if result['n_edges'] == 0:
         return None
 
-    # Laplacian matrix
-    D = np.diag(degree)
-    L = D - adj_matrix.values
-
-    # Calculate eigenvalues
-    try:
-        eigenvalues = eigh(L, eigvals_only=True)
-        eigenvalues = np.sort(eigenvalues)
-
-        # Fiedler value is second smallest eigenvalue
-        if len(eigenvalues) > 1:
-            fiedler = eigenvalues[1]
-            return fiedler
-    except:
-        return None
-
-    return None
+    return result['fiedler']
 
 def get_week_dates(price_data):
     """Get date ranges for last week and week before"""
-    # Get all available dates
-    all_dates = set()
-    for stock_data in price_data.values():
-        all_dates.update(stock_data.index)
-
-    all_dates = sorted(list(all_dates))
+    # Trading calendar over all loaded stocks
+    calendar = TradingCalendar.from_frames(price_data.values())
 
-    if len(all_dates) < 10:
+    if len(calendar) < 10:
         return None, None, None, None
 
-    # Get most recent date
-    most_recent = all_dates[-1]
-
     # Find last complete week (last 5 trading days)
-    last_week_end = most_recent
-    last_week_dates = [d for d in all_dates if d <= last_week_end][-5:]
+    last_week_dates = calendar.last_n(5)
     last_week_start = last_week_dates[0]
+    last_week_end = last_week_dates[-1]
 
     # Find week before (5 trading days before last week)
-    week_before_dates = [d for d in all_dates if d < last_week_start][-5:]
+    week_before_dates = calendar.before(last_week_start, 5)
     if len(week_before_dates) < 5:
         return None, None, None, None
 
@@ -224,6 +184,7 @@ def main():
 
     # Calculate Fiedler for each theme for both weeks
     results = []
+    tracker = FiedlerTracker(threshold=0.25)
 
     print("\nAnalyzing themes...")
     for theme_name, stocks in theme_stocks.items():
@@ -232,12 +193,12 @@ def main():
 
         # Calculate Fiedler for week before
         fiedler_before = calculate_fiedler_for_period(
-            price_data, stocks, week_before_start, week_before_end
+            price_data, stocks, week_before_start, week_before_end, tracker, theme_name
         )
 
         # Calculate Fiedler for last week
         fiedler_last = calculate_fiedler_for_period(
-            price_data, stocks, last_week_start, last_week_end
+            price_data, stocks, last_week_start, last_week_end, tracker, theme_name
         )
 
         if fiedler_before is not None and fiedler_last is not None:
@@ -253,6 +214,8 @@ def main():
                 'Pct_Change': pct_change
             })
 
+    print(f"Eigen solves: {tracker.summary()}")
+
     # Sort by change (descending)
     results.sort(key=lambda x: x['Change'], reverse=True)
 
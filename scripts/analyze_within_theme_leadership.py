@@ -4,17 +4,22 @@ Analyze within-theme large-cap leadership as a signal for regime shifts.
 
 Hypothesis: If top 2-3 large-caps within a Naver theme have significantly better
 regime probabilities than smaller-cap members, the theme may be next to turn investable.
+
+Stock-level cohesion roles (degree centrality, Fiedler partition side) come from
+the stock_roles table written by analyze_naver_theme_cohesion.py, when present.
 """
 
 import pandas as pd
 import numpy as np
 from pathlib import Path
-import ast
 
 # Paths - use config module for self-contained project
 import sys
 sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent.parent))
 from config import AUTOGLUON_BASE_DIR, DB_FILE, REGIME_DIR, DATA_DIR, REPORTS_DIR
+from cohesion.timeseries_store import open_stock_roles
+from cohesion.theme_index import open_theme_index
 from datetime import datetime
 import argparse
 import glob
@@ -76,7 +81,8 @@ def load_data():
 
     return db_df, regime_summary, enhanced_themes
 
-def analyze_theme_leadership(theme_name, theme_stocks, db_df, regime_summary, theme_count_map=None, max_themes_per_stock=10, debug=False):
+def analyze_theme_leadership(theme_name, theme_stocks, db_df, regime_summary, theme_count_map=None, max_themes_per_stock=10, debug=False,
+                             theme_roles=None):
     """
     Analyze large-cap leadership within a theme.
     
@@ -88,6 +94,7 @@ def analyze_theme_leadership(theme_name, theme_stocks, db_df, regime_summary, th
         theme_count_map: Dict mapping ticker -> number of themes it's in (for filtering)
         max_themes_per_stock: Maximum themes a stock can be in to be included (default: 10)
         debug: Enable debug output
+        theme_roles: This theme's stock roles indexed by stock name (optional)
     
     Returns:
     - top_large_caps: Top 2-3 stocks by market cap with their regime data
@@ -128,6 +135,11 @@ def analyze_theme_leadership(theme_name, theme_stocks, db_df, regime_summary, th
 
         # Get theme count for this stock
         theme_count = theme_count_map.get(ticker, 0) if theme_count_map else 0
+
+        # Cohesion role within the theme's correlation network
+        has_role = theme_roles is not None and stock_name in theme_roles.index
+        centrality = theme_roles.at[stock_name, 'degree_centrality'] if has_role else np.nan
+        partition = theme_roles.at[stock_name, 'partition'] if has_role else np.nan
         
         theme_data.append({
             'Ticker': ticker,
@@ -139,7 +151,9 @@ def analyze_theme_leadership(theme_name, theme_stocks, db_df, regime_summary, th
             'Trend_Strength': regime_row.iloc[0]['Trend_Strength'],
             'Momentum_Score': regime_row.iloc[0]['Momentum_Score'],
             'Regime': regime_row.iloc[0]['Regime'],
-            'Theme_Count': theme_count  # Number of themes this stock is in
+            'Theme_Count': theme_count,  # Number of themes this stock is in
+            'Centrality': centrality,
+            'Partition': partition
         })
 
     if debug and len(theme_data) < 4:
@@ -187,6 +201,12 @@ def analyze_theme_leadership(theme_name, theme_stocks, db_df, regime_summary, th
     
     # Flag if any large-cap leader is in many themes (potential false signal)
     has_multi_theme_leader = max_theme_count_large_caps > 5 if large_cap_theme_counts else False
+
+    # Cohesion roles: are the leaders central, and do they move as one block?
+    large_cap_centrality_avg = top_large_caps['Centrality'].mean()
+    rest_centrality_avg = rest_of_theme['Centrality'].mean()
+    leader_sides = top_large_caps['Partition'].dropna()
+    leaders_same_partition = leader_sides.nunique() == 1 if len(leader_sides) > 1 else None
     
     return {
         'Theme': theme_name,
@@ -206,7 +226,11 @@ def analyze_theme_leadership(theme_name, theme_stocks, db_df, regime_summary, th
         'Theme_Market_Cap_Total': theme_df['Market_Cap'].sum(),
         'Avg_Theme_Count_Large_Caps': avg_theme_count_large_caps,
         'Max_Theme_Count_Large_Caps': max_theme_count_large_caps,
-        'Has_Multi_Theme_Leader': has_multi_theme_leader
+        'Has_Multi_Theme_Leader': has_multi_theme_leader,
+        'Large_Cap_Centrality_Avg': large_cap_centrality_avg,
+        'Rest_Centrality_Avg': rest_centrality_avg,
+        'Centrality_Gap': large_cap_centrality_avg - rest_centrality_avg,
+        'Leaders_Same_Partition': leaders_same_partition
     }
 
 def generate_markdown_report(leadership_results, turning_themes, summary_df, report_date):
@@ -313,42 +337,28 @@ def main():
     if db_df is None:
         return
 
-    # Parse Naver themes from database
-    theme_stocks = {}
-    for _, row in db_df.iterrows():
-        ticker = row['tickers']
-        themes_str = row['naverTheme']
-
-        try:
-            themes = ast.literal_eval(themes_str)
-            if isinstance(themes, list):
-                for theme in themes:
-                    if theme not in theme_stocks:
-                        theme_stocks[theme] = []
-                    theme_stocks[theme].append(ticker)
-        except:
-            continue
+    # Naver themes from the database's parsed theme index
+    theme_index = open_theme_index(DB_FILE)
+    theme_stocks = theme_index.theme_members(theme_index.tickers)
 
     print(f"\nTotal Naver themes: {len(theme_stocks)}")
 
     # Build theme count map (ticker -> number of themes)
     print("\nBuilding theme count map (for filtering multi-category stocks)...")
-    theme_count_map = {}
-    for _, row in db_df.iterrows():
-        ticker = row['tickers']
-        themes_str = row['naverTheme']
-        try:
-            themes = ast.literal_eval(themes_str)
-            if isinstance(themes, list):
-                theme_count_map[ticker] = len(themes)
-        except:
-            theme_count_map[ticker] = 0
+    theme_count_map = dict(zip(theme_index.tickers, theme_index.theme_counts().tolist()))
     
     # Statistics
     multi_theme_stocks = [t for t, count in theme_count_map.items() if count > 10]
     print(f"  Stocks in >10 themes (will be filtered): {len(multi_theme_stocks)}")
     print(f"  Average themes per stock: {sum(theme_count_map.values()) / len(theme_count_map):.1f}")
 
+    # Stock-level cohesion roles from the latest rolling window of each theme
+    roles = open_stock_roles()
+    roles_by_theme = {}
+    if roles is not None:
+        roles_by_theme = {theme: df.set_index('ticker') for theme, df in roles.groupby('theme')}
+        print(f"  Stock roles available for {len(roles_by_theme)} themes")
+
     # Analyze leadership for each enhanced cohesion theme
     leadership_results = []
     themes_processed = 0
@@ -375,7 +385,8 @@ def main():
             theme_name, stocks, db_df, regime_summary, 
             theme_count_map=theme_count_map,
             max_themes_per_stock=10,  # Filter out stocks in >10 themes
-            debug=do_debug
+            debug=do_debug,
+            theme_roles=roles_by_theme.get(theme_name)
         )
 
         if result is not None:
@@ -409,7 +420,10 @@ def main():
             'Rest_Momentum': f"{result['Rest_Momentum_Avg']:.3f}",
             'Momentum_Gap': f"{result['Momentum_Gap']:.3f}",
             'Large_Cap_Total_Cap': f"{result['Large_Cap_Market_Cap_Total']/1e12:.1f}T",
-            'Theme_Total_Cap': f"{result['Theme_Market_Cap_Total']/1e12:.1f}T"
+            'Theme_Total_Cap': f"{result['Theme_Market_Cap_Total']/1e12:.1f}T",
+            'Large_Cap_Centrality': f"{result['Large_Cap_Centrality_Avg']:.3f}",
+            'Rest_Centrality': f"{result['Rest_Centrality_Avg']:.3f}",
+            'Leaders_Same_Partition': result['Leaders_Same_Partition']
         })
 
     summary_df = pd.DataFrame(summary_data)
@@ -445,6 +459,10 @@ def main():
         print(f"  Leadership Gap: {result['Leadership_Gap']:.1f}% (Large-caps lead by this much)")
         print(f"  Trend Gap: {result['Trend_Gap']:.3f}")
         print(f"  Momentum Gap: {result['Momentum_Gap']:.3f}")
+        if pd.notna(result['Centrality_Gap']):
+            same_side = {True: "same partition", False: "split across partitions", None: "n/a"}
+            print(f"  Centrality Gap: {result['Centrality_Gap']:.3f} "
+                  f"(leaders: {same_side[result['Leaders_Same_Partition']]})")
 
         print(f"\n🏆 TOP LARGE-CAPS (Leading the shift):")
         top_caps = result['Top_Large_Caps']
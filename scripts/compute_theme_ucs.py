@@ -11,7 +11,6 @@ Outputs:
 """
 
 import json
-import ast
 import os
 import sys
 import tempfile
@@ -26,6 +25,9 @@ UCS_LRS_DIR = Path("/mnt/nas/AutoGluon/AutoML_Krx/Filter/UCS_LRS")
 THEME_CSV = DATA_DIR / "network_theme_data.csv"
 OUTPUT_FILE = DATA_DIR / "theme_ucs_scores.json"
 
+sys.path.insert(0, str(PROJECT_ROOT))
+from cohesion.theme_index import open_theme_index
+
 
 def find_latest_ucs_file():
     """Find the most recent complete_situation_results file."""
@@ -37,23 +39,13 @@ def find_latest_ucs_file():
 
 
 def load_theme_mapping():
-    """Load stock→themes mapping from network_theme_data.csv."""
-    import csv
+    """Load stock→themes mapping from the theme index of network_theme_data.csv."""
+    index = open_theme_index(THEME_CSV)
 
+    names = [name.strip() for name in index.names]
     theme_to_stocks = defaultdict(set)
-    with open(THEME_CSV, "r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            name = row.get("name", "").strip()
-            themes_str = row.get("naverTheme", "[]")
-            if not name or not themes_str or themes_str == "[]":
-                continue
-            try:
-                themes = ast.literal_eval(themes_str)
-            except Exception:
-                continue
-            for theme in themes:
-                theme_to_stocks[theme].add(name)
+    for theme, stock_names in index.theme_members(names, rows=[bool(n) for n in names]).items():
+        theme_to_stocks[theme].update(stock_names)
     return theme_to_stocks
 
 
@@ -17,7 +17,6 @@ Usage:
 import pandas as pd
 import numpy as np
 import json
-import ast
 from pathlib import Path
 from datetime import datetime, timedelta
 import argparse
@@ -50,33 +49,20 @@ class SectorRankingGenerator:
         print(f"Loaded {len(self.ticker_to_themes)} tickers with theme assignments")
 
     def _parse_themes(self):
-        """Parse Naver themes from database"""
-        for _, row in self.db_df.iterrows():
-            ticker = str(row['tickers']).zfill(6)  # Convert to 6-digit string with leading zeros
-            name = row['name']
-            themes_str = row['naverTheme']
-            market_cap = row['시가총액']
+        """Parse Naver themes from the database's theme index (rows align with db_df)"""
+        from cohesion.theme_index import open_theme_index
 
+        index = open_theme_index(self.db_file)
+        tickers = [str(t).zfill(6) for t in index.tickers]  # 6-digit strings with leading zeros
+
+        for ticker, name, market_cap in zip(tickers, self.db_df['name'], self.db_df['시가총액']):
             self.ticker_to_name[ticker] = {
                 'name': name,
                 'market_cap': market_cap
             }
 
-            try:
-                themes = ast.literal_eval(themes_str)
-                if isinstance(themes, list):
-                    for theme in themes:
-                        # Store theme -> tickers
-                        if theme not in self.theme_to_tickers:
-                            self.theme_to_tickers[theme] = []
-                        self.theme_to_tickers[theme].append(ticker)
-
-                        # Store ticker -> themes
-                        if ticker not in self.ticker_to_themes:
-                            self.ticker_to_themes[ticker] = []
-                        self.ticker_to_themes[ticker].append(theme)
-            except:
-                continue
+        self.theme_to_tickers = index.theme_members(tickers)
+        self.ticker_to_themes = index.member_themes(tickers)
 
     def load_regime_data(self, date_str=None):
         """Load latest regime data"""
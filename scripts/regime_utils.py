@@ -15,14 +15,21 @@ Investment Criteria:
 """
 
 import pandas as pd
-import ast
+import numpy as np
 import glob
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 
 import sys
 sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent.parent))
 from config import DATA_DIR, REGIME_DIR, DB_FILE
+from cohesion.theme_index import _parse_theme_list
+
+LARGE_CAP_THRESHOLD = 50  # 5T KRW (50 * 100B)
+
+# Last all-themes result, reused while the same db_df / regime_summary objects are passed
+_all_stats_cache = {'inputs': None, 'stats': None}
 
 
 def load_regime_data() -> Tuple[Optional[pd.DataFrame], Optional[str]]:
@@ -78,11 +85,108 @@ def load_db_data() -> pd.DataFrame:
     return pd.read_csv(DB_FILE)
 
 
+def _theme_members(db_df: pd.DataFrame) -> pd.DataFrame:
+    """One row per (theme, stock) membership: theme, name, ticker, market_cap (db_df row order)."""
+    cells = db_df['naverTheme'] if 'naverTheme' in db_df.columns else pd.Series('[]', index=db_df.index)
+    parsed = {}
+    theme_lists = []
+    for cell in cells.tolist():
+        key = cell if isinstance(cell, str) else None
+        if key is None or key not in parsed:
+            themes = list(dict.fromkeys(_parse_theme_list(cell)[1]))  # a theme counts a stock once
+            if key is None:
+                theme_lists.append(themes)
+                continue
+            parsed[key] = themes
+        theme_lists.append(parsed[key])
+
+    counts = np.array([len(t) for t in theme_lists], dtype=np.int64)
+    rows = np.repeat(np.arange(len(db_df)), counts)
+    return pd.DataFrame({
+        'theme': [t for themes in theme_lists for t in themes],
+        'name': db_df['name'].to_numpy()[rows],
+        'ticker': db_df['tickers'].astype(str).str.zfill(6).to_numpy()[rows],
+        'market_cap': db_df['시가총액'].to_numpy()[rows],
+    })
+
+
+def calculate_all_theme_regime_stats(db_df: pd.DataFrame,
+                                     regime_summary: pd.DataFrame) -> Dict[str, Dict]:
+    """
+    Regime statistics of every theme in one grouped pass.
+
+    Theme membership is exploded once and joined to the regime summary by
+    stock name; the per-theme aggregates are then a single groupby.
+
+    Returns:
+        dict: {theme: stats} with the calculate_theme_regime_stats() dict for
+        every theme that has at least one stock with regime data
+    """
+    inputs = _all_stats_cache['inputs']
+    if inputs is not None and inputs[0] is db_df and inputs[1] is regime_summary:
+        return _all_stats_cache['stats']
+
+    regime = regime_summary.drop_duplicates('Stock_Name')[
+        ['Stock_Name', 'Bull_Pct', 'Bear_Pct', 'Trend_Strength', 'Momentum_Score']]
+    joined = _theme_members(db_df).merge(regime, left_on='name', right_on='Stock_Name', how='inner')
+    joined['is_large'] = joined['market_cap'] >= LARGE_CAP_THRESHOLD
+
+    grouped = joined.groupby('theme', sort=False)
+    summary = grouped.agg(
+        avg_bull_pct=('Bull_Pct', 'mean'),
+        avg_bear_pct=('Bear_Pct', 'mean'),
+        avg_trend=('Trend_Strength', 'mean'),
+        avg_momentum=('Momentum_Score', 'mean'),
+        stock_count=('Bull_Pct', 'size'),
+        large_cap_count=('is_large', 'sum'),
+    )
+    large = joined[joined['is_large']]
+    summary['large_cap_bull'] = large.groupby('theme', sort=False)['Bull_Pct'].mean()
+
+    large_cap_stocks = {}
+    for theme, group in large.groupby('theme', sort=False):
+        stocks = [{
+            'name': name,
+            'ticker': ticker,
+            'market_cap': market_cap * 0.1,  # Convert to T
+            'bull_pct': bull_pct,
+            'trend': trend,
+            'momentum': momentum
+        } for name, ticker, market_cap, bull_pct, trend, momentum in zip(
+            group['name'], group['ticker'], group['market_cap'], group['Bull_Pct'],
+            group['Trend_Strength'], group['Momentum_Score'])]
+        stocks.sort(key=lambda x: x['market_cap'], reverse=True)
+        large_cap_stocks[theme] = stocks
+
+    all_stats = {}
+    for theme, row in zip(summary.index, summary.itertuples(index=False)):
+        has_large = row.large_cap_count > 0
+        all_stats[theme] = {
+            'theme': theme,
+            'avg_bull_pct': row.avg_bull_pct,
+            'avg_bear_pct': row.avg_bear_pct,
+            'avg_trend': row.avg_trend,
+            'avg_momentum': row.avg_momentum,
+            'stock_count': int(row.stock_count),
+            'large_cap_bull': row.large_cap_bull if has_large else 0,
+            'large_cap_count': int(row.large_cap_count),
+            'large_cap_stocks': large_cap_stocks.get(theme, []),
+            'leadership_gap': (row.large_cap_bull - row.avg_bull_pct) if has_large else 0
+        }
+
+    _all_stats_cache['inputs'] = (db_df, regime_summary)
+    _all_stats_cache['stats'] = all_stats
+    return all_stats
+
+
 def calculate_theme_regime_stats(theme_name: str, db_df: pd.DataFrame,
                                   regime_summary: pd.DataFrame) -> Optional[Dict]:
     """
     Calculate regime statistics for a theme by aggregating stock-level data.
 
+    Looks the theme up in calculate_all_theme_regime_stats(), which is
+    computed once per (db_df, regime_summary) pair.
+
     Returns dict with:
     - avg_bull_pct: Average bull regime percentage
     - avg_bear_pct: Average bear regime percentage
@@ -91,74 +195,11 @@ def calculate_theme_regime_stats(theme_name: str, db_df: pd.DataFrame,
     - large_cap_bull: Bull % for large-caps (≥5T)
     - large_cap_stocks: List of large-cap stock details
     """
-    theme_stocks = []
-    for _, row in db_df.iterrows():
-        themes_str = row.get('naverTheme', '[]')
-        try:
-            themes = ast.literal_eval(themes_str) if isinstance(themes_str, str) else themes_str
-            if isinstance(themes, list) and theme_name in themes:
-                theme_stocks.append({
-                    'name': row['name'],
-                    'ticker': str(row['tickers']).zfill(6),
-                    'market_cap': row['시가총액']
-                })
-        except:
-            continue
-
-    if not theme_stocks:
-        return None
-
-    regime_stats = []
-    large_cap_stocks = []
-    large_cap_threshold = 50  # 5T KRW (50 * 100B)
-
-    for stock in theme_stocks:
-        regime_row = regime_summary[regime_summary['Stock_Name'] == stock['name']]
-        if not regime_row.empty:
-            bull_pct = regime_row.iloc[0]['Bull_Pct']
-            bear_pct = regime_row.iloc[0]['Bear_Pct']
-            trend = regime_row.iloc[0]['Trend_Strength']
-            momentum = regime_row.iloc[0]['Momentum_Score']
-
-            regime_stats.append({
-                'bull_pct': bull_pct,
-                'bear_pct': bear_pct,
-                'trend': trend,
-                'momentum': momentum,
-                'market_cap': stock['market_cap']
-            })
-
-            if stock['market_cap'] >= large_cap_threshold:
-                large_cap_stocks.append({
-                    'name': stock['name'],
-                    'ticker': stock['ticker'],
-                    'market_cap': stock['market_cap'] * 0.1,  # Convert to T
-                    'bull_pct': bull_pct,
-                    'trend': trend,
-                    'momentum': momentum
-                })
-
-    if not regime_stats:
+    stats = calculate_all_theme_regime_stats(db_df, regime_summary).get(theme_name)
+    if stats is None:
         return None
-
-    stats_df = pd.DataFrame(regime_stats)
-    large_cap_df = stats_df[stats_df['market_cap'] >= large_cap_threshold]
-
-    # Sort large caps by market cap
-    large_cap_stocks.sort(key=lambda x: x['market_cap'], reverse=True)
-
-    return {
-        'theme': theme_name,
-        'avg_bull_pct': stats_df['bull_pct'].mean(),
-        'avg_bear_pct': stats_df['bear_pct'].mean(),
-        'avg_trend': stats_df['trend'].mean(),
-        'avg_momentum': stats_df['momentum'].mean(),
-        'stock_count': len(stats_df),
-        'large_cap_bull': large_cap_df['bull_pct'].mean() if len(large_cap_df) > 0 else 0,
-        'large_cap_count': len(large_cap_df),
-        'large_cap_stocks': large_cap_stocks,
-        'leadership_gap': (large_cap_df['bull_pct'].mean() - stats_df['bull_pct'].mean()) if len(large_cap_df) > 0 else 0
-    }
+    # Callers annotate the dict; keep the cached one untouched
+    return dict(stats, large_cap_stocks=list(stats['large_cap_stocks']))
 
 
 def classify_themes_with_regime(cohesion_df: pd.DataFrame,